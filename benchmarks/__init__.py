@@ -0,0 +1 @@
+"""Offline benchmarks for template matching (no display needed)."""
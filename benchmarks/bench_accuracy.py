@@ -0,0 +1,294 @@
+"""Accuracy + latency suite for the three matchers on synthetic screens.
+
+Composites the real templates onto generated backgrounds at known
+positions (clean, noisy, slightly rescaled and partially occluded) for
+each screen size, runs find_template, find_all_templates and
+find_button_in_row in full and pyramid mode, and reports latency and
+precision/recall as JSON. Runs headless — no display, no browser.
+
+Usage:
+    python -m benchmarks.bench_accuracy [--out FILE] [--baseline FILE]
+        [--sizes 1080p,1440p,4k] [--trials N] [--threshold T]
+        [--backend auto|spatial|fft]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import cv2
+import numpy as np
+
+from src.template_match import (
+    BUTTON_OFFSET_X,
+    MODAL_ROWS,
+    find_all_templates,
+    find_button_in_row,
+    find_template,
+    get_scale,
+    set_backend,
+)
+
+from .synthetic import (
+    DISTORTIONS,
+    SCREEN_SIZES,
+    compose,
+    make_background,
+    random_position,
+    spread_positions,
+    template_names,
+    template_size,
+)
+
+# Repeated icons for find_all_templates, instances per screen
+MULTI_TEMPLATES = ("download_button.png", "play_button.png", "three_dots.png")
+MULTI_COUNT = 6
+BUTTON_TEMPLATE = "download_button.png"
+
+
+@dataclass
+class Tally:
+    """Detections and timings of one (matcher, mode, screen, distortion) group."""
+
+    matcher: str
+    mode: str
+    screen: str
+    distortion: str
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+    times: list[float] = field(default_factory=list)
+
+    def timed(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.times.append((time.perf_counter() - t0) * 1000)
+        return result
+
+    def score(
+        self,
+        found: list[tuple[int, int]],
+        expected: list[tuple[int, int]],
+        tolerance: int,
+    ) -> None:
+        """Greedily pair detections with expected centers within tolerance."""
+        left = list(expected)
+        for fx, fy in found:
+            hit = next(
+                (
+                    e
+                    for e in left
+                    if abs(e[0] - fx) <= tolerance and abs(e[1] - fy) <= tolerance
+                ),
+                None,
+            )
+            if hit is None:
+                self.fp += 1
+            else:
+                self.tp += 1
+                left.remove(hit)
+        self.fn += len(left)
+
+    def summary(self) -> dict:
+        times = sorted(self.times)
+        found = self.tp + self.fp
+        present = self.tp + self.fn
+        return {
+            "matcher": self.matcher,
+            "mode": self.mode,
+            "screen": self.screen,
+            "distortion": self.distortion,
+            "calls": len(times),
+            "latency_ms_median": round(statistics.median(times), 2),
+            "latency_ms_p95": round(times[int(0.95 * (len(times) - 1))], 2),
+            "precision": round(self.tp / found, 4) if found else 1.0,
+            "recall": round(self.tp / present, 4) if present else 1.0,
+            **{k: v for k, v in asdict(self).items() if k in ("tp", "fp", "fn")},
+        }
+
+
+def _tolerance(name: str, scale: float) -> int:
+    """Allowed center error: 15% of the template's smaller side, at least 3px."""
+    return max(3, round(0.15 * min(template_size(name, scale))))
+
+
+def _run_find_template(background, rng, params, threshold, pyramid, tally):
+    scale = params.get("scale", 1.0)
+    for name in template_names():
+        x, y = random_position(background, name, rng)
+        frame, centers = compose(background, [(name, x, y)], rng, **params)
+        hit = tally.timed(find_template, frame, name, threshold, pyramid)
+        tally.score([hit] if hit else [], centers, _tolerance(name, scale))
+
+        # Negative: the same screen without the template
+        empty, _ = compose(background, [], rng, **params)
+        miss = tally.timed(find_template, empty, name, threshold, pyramid)
+        tally.score([miss] if miss else [], [], 0)
+
+
+def _run_find_all(background, rng, params, threshold, pyramid, tally):
+    scale = params.get("scale", 1.0)
+    for name in MULTI_TEMPLATES:
+        size = template_size(name, scale)
+        positions = spread_positions(background, size, MULTI_COUNT, rng)
+        placements = [(name, x, y) for x, y in positions]
+        frame, centers = compose(background, placements, rng, **params)
+        hits = tally.timed(find_all_templates, frame, name, threshold, pyramid=pyramid)
+        tally.score([(x, y) for x, y, _ in hits], centers, _tolerance(name, scale))
+
+
+def _run_button_in_row(background, rng, params, threshold, pyramid, tally):
+    scale = params.get("scale", 1.0)
+    offset = round(BUTTON_OFFSET_X * get_scale() * scale)
+    for row, _ in MODAL_ROWS.values():
+        tw, th = template_size(row, scale)
+        bw, bh = template_size(BUTTON_TEMPLATE, scale)
+        x = int(rng.integers(0, background.shape[1] - offset - tw // 2 - bw))
+        y = int(rng.integers(bh, background.shape[0] - th - bh))
+        cx, cy = x + tw // 2, y + th // 2
+        placements = [
+            (row, x, y),
+            (BUTTON_TEMPLATE, cx + offset - bw // 2, cy - bh // 2),
+        ]
+        frame, _ = compose(background, placements, rng, **params)
+        point = tally.timed(
+            find_button_in_row, frame, row, row_threshold=threshold, pyramid=pyramid
+        )
+        tally.score(
+            [point] if point else [], [(cx + offset, cy)], _tolerance(row, scale)
+        )
+
+
+MATCHERS = {
+    "find_template": _run_find_template,
+    "find_all_templates": _run_find_all,
+    "find_button_in_row": _run_button_in_row,
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=False,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def _compare(results: list[dict], baseline_path: str) -> None:
+    """Print latency/recall/precision deltas against an earlier JSON run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(r: dict) -> tuple:
+        return (r["matcher"], r["mode"], r["screen"], r["distortion"])
+
+    old = {key(r): r for r in baseline["results"]}
+    print(
+        f"\n{'matcher':<19} {'mode':<8} {'screen':<6} {'distortion':<9} "
+        f"{'Δ median ms':>12} {'Δ recall':>9} {'Δ precision':>12}",
+        file=sys.stderr,
+    )
+    for r in results:
+        o = old.get(key(r))
+        if o is None:
+            continue
+        print(
+            f"{r['matcher']:<19} {r['mode']:<8} {r['screen']:<6} "
+            f"{r['distortion']:<9} "
+            f"{r['latency_ms_median'] - o['latency_ms_median']:+12.1f} "
+            f"{r['recall'] - o['recall']:+9.3f} "
+            f"{r['precision'] - o['precision']:+12.3f}",
+            file=sys.stderr,
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON run to compare against")
+    parser.add_argument("--sizes", default=",".join(SCREEN_SIZES))
+    parser.add_argument("--trials", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backend", choices=("auto", "spatial", "fft"), default="auto")
+    args = parser.parse_args()
+    set_backend(args.backend)
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SCREEN_SIZES]
+    if unknown:
+        parser.error(f"unknown screen size(s): {', '.join(unknown)}")
+
+    rng = np.random.default_rng(args.seed)
+    tallies: list[Tally] = []
+    for screen in sizes:
+        w, h = SCREEN_SIZES[screen]
+        backgrounds = [make_background(w, h, rng) for _ in range(args.trials)]
+        for distortion, params in DISTORTIONS.items():
+            for matcher, run in MATCHERS.items():
+                for mode in ("full", "pyramid"):
+                    tally = Tally(matcher, mode, screen, distortion)
+                    for background in backgrounds:
+                        run(
+                            background,
+                            rng,
+                            params,
+                            args.threshold,
+                            mode == "pyramid",
+                            tally,
+                        )
+                    tallies.append(tally)
+                    s = tally.summary()
+                    print(
+                        f"{screen:<6} {distortion:<9} {matcher:<19} {mode:<8} "
+                        f"{s['latency_ms_median']:8.1f} ms  "
+                        f"P={s['precision']:.3f} R={s['recall']:.3f}",
+                        file=sys.stderr,
+                    )
+
+    results = [t.summary() for t in tallies]
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "trials": args.trials,
+            "threshold": args.threshold,
+            "backend": args.backend,
+            "distortions": DISTORTIONS,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        _compare(results, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
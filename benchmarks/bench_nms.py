@@ -0,0 +1,117 @@
+"""Regression benchmark: peak extraction + NMS in find_all_templates.
+
+Fills synthetic screens with hundreds of download icons, optionally blurs
+them and lowers the threshold (tens of thousands of raw hits), and times
+the current find_all_templates against the legacy np.where + O(n²) dedup.
+
+Usage:
+    python -m benchmarks.bench_nms [--icons N] [--skip-legacy]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from src.template_match import _load, find_all_templates
+
+from .synthetic import SCREEN_SIZES, make_background, paste
+
+ICON = "download_button.png"
+
+
+def _legacy_find_all(
+    screenshot_bgr: np.ndarray, template_name: str, threshold: float
+) -> list[tuple[int, int, float]]:
+    """find_all_templates as it was before peak extraction (reference)."""
+    gray = cv2.cvtColor(screenshot_bgr, cv2.COLOR_BGR2GRAY)
+    tmpl = _load(template_name)
+    th, tw = tmpl.shape[:2]
+    result = cv2.matchTemplate(gray, tmpl, cv2.TM_CCOEFF_NORMED)
+    matches = [
+        (x + tw // 2, y + th // 2, float(result[y, x]))
+        for y, x in zip(*np.where(result >= threshold))
+    ]
+    matches.sort(key=lambda m: -m[2])
+    filtered: list[tuple[int, int, float]] = []
+    for m in matches:
+        if all(abs(m[0] - f[0]) > 20 or abs(m[1] - f[1]) > 20 for f in filtered):
+            filtered.append(m)
+    return filtered
+
+
+def _icon_grid(
+    width: int, height: int, count: int, rng: np.random.Generator
+) -> tuple[np.ndarray, set[tuple[int, int]]]:
+    """Background with `count` icons on a jittered grid. Returns (frame, centers)."""
+    frame = make_background(width, height, rng)
+    th, tw = _load(ICON).shape[:2]
+    cols = max(1, int(np.sqrt(count * width / height)))
+    step_x = width // cols
+    step_y = height // -(-count // cols)
+    centers = set()
+    for i in range(count):
+        gx, gy = (i % cols) * step_x, (i // cols) * step_y
+        x = gx + int(rng.integers(0, max(1, step_x - tw)))
+        y = gy + int(rng.integers(0, max(1, step_y - th)))
+        centers.add(paste(frame, ICON, x, y))
+    return frame, centers
+
+
+def _recall(found: list[tuple[int, int, float]], centers: set) -> float:
+    hit = {
+        c
+        for c in centers
+        if any(abs(c[0] - x) <= 2 and abs(c[1] - y) <= 2 for x, y, _ in found)
+    }
+    return len(hit) / len(centers)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--icons", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="don't time the O(n²) reference"
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    failed = False
+    print(
+        f"{'screen':<6} {'case':<12} {'thr':>4} {'found':>6} {'recall':>7} "
+        f"{'new ms':>8} {'legacy ms':>10}"
+    )
+    for label, (w, h) in SCREEN_SIZES.items():
+        clean, centers = _icon_grid(w, h, args.icons, rng)
+        blurry = cv2.GaussianBlur(clean, (9, 9), 3)
+        for case, frame, thr in (
+            ("clean", clean, 0.7),
+            ("blurry", blurry, 0.7),
+            ("blurry-low", blurry, 0.4),
+        ):
+            t0 = time.perf_counter()
+            found = find_all_templates(frame, ICON, threshold=thr)
+            t_new = (time.perf_counter() - t0) * 1000
+
+            t_legacy = "-"
+            if not args.skip_legacy:
+                t0 = time.perf_counter()
+                _legacy_find_all(frame, ICON, thr)
+                t_legacy = f"{(time.perf_counter() - t0) * 1000:.0f}"
+
+            recall = _recall(found, centers)
+            failed |= recall < 1.0 or len(found) < len(centers)
+            print(
+                f"{label:<6} {case:<12} {thr:>4} {len(found):>6} {recall:>7.2f} "
+                f"{t_new:>8.0f} {t_legacy:>10}"
+            )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
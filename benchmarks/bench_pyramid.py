@@ -0,0 +1,79 @@
+"""Benchmark: full-resolution vs pyramid search for every template.
+
+Usage:
+    python -m benchmarks.bench_pyramid [--repeat N] [--backend auto|spatial|fft]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from src.template_match import find_template, set_backend
+
+from .synthetic import (
+    SCREEN_SIZES,
+    make_background,
+    paste,
+    random_position,
+    template_names,
+)
+
+
+def _median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backend", choices=("auto", "spatial", "fft"), default="auto")
+    args = parser.parse_args()
+    set_backend(args.backend)
+
+    rng = np.random.default_rng(args.seed)
+    mismatches = 0
+
+    print(f"{'screen':<7} {'template':<26} {'full ms':>9} {'pyr ms':>9} {'speedup':>8}")
+    for label, (w, h) in SCREEN_SIZES.items():
+        background = make_background(w, h, rng)
+        for name in template_names():
+            frame = background.copy()
+            x, y = random_position(frame, name, rng)
+            paste(frame, name, x, y)
+
+            full = find_template(frame, name, threshold=0.7)
+            pyr = find_template(frame, name, threshold=0.7, pyramid=True)
+            ok = full == pyr
+            mismatches += not ok
+
+            t_full = _median_ms(
+                lambda f=frame, n=name: find_template(f, n, threshold=0.7),
+                args.repeat,
+            )
+            t_pyr = _median_ms(
+                lambda f=frame, n=name: find_template(
+                    f, n, threshold=0.7, pyramid=True
+                ),
+                args.repeat,
+            )
+            flag = "" if ok else f"  MISMATCH {full} != {pyr}"
+            print(
+                f"{label:<7} {name:<26} {t_full:9.1f} {t_pyr:9.1f} "
+                f"{t_full / t_pyr:7.1f}x{flag}"
+            )
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
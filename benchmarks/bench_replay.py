@@ -0,0 +1,126 @@
+"""Replay a recorded session through the template matching of run_task.
+
+Every frame of a session file (recorded with main.py --record-session)
+is matched against all templates with find_many and resolve_modal, as
+the orchestrators do on a live screen. Reports matching latency per
+frame and whether the click that followed each frame lies on one of
+the positions found — i.e. whether the matcher settings under test
+would still have clicked the same spot.
+
+Usage:
+    python -m benchmarks.bench_replay SESSION [--repeat N]
+        [--backend auto|spatial|fft] [--pyramid] [--prior] [--out FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from src.frame import ScreenFrame
+from src.recording import Replayer
+from src.template_match import (
+    find_all_templates,
+    find_many,
+    reset_priors,
+    resolve_modal,
+    set_backend,
+)
+
+from .synthetic import template_names
+
+CLICK_TOLERANCE = 6  # px between a found position and the recorded click
+
+
+def _candidates(frame: ScreenFrame, pyramid: bool, prior: bool) -> dict:
+    """{label: (x, y)} of every template and modal button found in `frame`.
+
+    run_task clicks every download icon in the song list, not just the
+    best one, so all download_button.png hits are candidates.
+    """
+    hits = find_many(frame, template_names(), pyramid=pyramid, prior=prior)
+    found = {name: pos for name, pos in hits.items() if pos is not None}
+    icons = find_all_templates(frame, "download_button.png", pyramid=pyramid)
+    for i, (x, y, _) in enumerate(icons, 1):
+        found[f"download_button.png#{i}"] = (x, y)
+    for fmt, pos in resolve_modal(frame, prior=prior).items():
+        found[f"modal:{fmt}"] = pos
+    return found
+
+
+def replay(session: Replayer, repeat: int, pyramid: bool, prior: bool) -> dict:
+    """Match every frame of `session`; returns per-frame results and totals."""
+    reset_priors()
+    rows = []
+    for i, rec in enumerate(session.frames):
+        frame = ScreenFrame(session.load(i))
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            found = _candidates(frame, pyramid, prior)
+            times.append((time.perf_counter() - t0) * 1000)
+
+        row = {"frame": i, "t": rec.t, "ms": statistics.median(times)}
+        row["found"] = sorted(found)
+        if rec.click is not None:
+            # Frames of a region capture are relative to the region's corner
+            ox, oy = rec.region[:2] if rec.region else (0, 0)
+            cx, cy = rec.click[0] - ox, rec.click[1] - oy
+            row["click"] = rec.label
+            row["explained"] = any(
+                abs(x - cx) <= CLICK_TOLERANCE and abs(y - cy) <= CLICK_TOLERANCE
+                for x, y in found.values()
+            )
+        rows.append(row)
+
+    clicks = [r for r in rows if "click" in r]
+    ms = [r["ms"] for r in rows]
+    return {
+        "frames": len(rows),
+        "ms_total": round(sum(ms), 1),
+        "ms_median": round(statistics.median(ms), 2) if ms else None,
+        "clicks": len(clicks),
+        "clicks_explained": sum(r["explained"] for r in clicks),
+        "rows": rows,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("session")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=("auto", "spatial", "fft"), default="auto")
+    parser.add_argument("--pyramid", action="store_true")
+    parser.add_argument("--prior", action="store_true")
+    parser.add_argument("--out", help="write the full results as JSON")
+    args = parser.parse_args()
+    set_backend(args.backend)
+
+    session = Replayer(args.session)
+    try:
+        result = replay(session, args.repeat, args.pyramid, args.prior)
+    finally:
+        session.close()
+
+    print(f"{'frame':>5} {'t s':>8} {'ms':>8}  click")
+    for r in result["rows"]:
+        click = ""
+        if "click" in r:
+            click = f"{r['click']} {'ok' if r['explained'] else 'MISSED'}"
+        print(f"{r['frame']:5d} {r['t']:8.2f} {r['ms']:8.1f}  {click}")
+    print(
+        f"{result['frames']} frames, {result['ms_total']:.0f} ms matching "
+        f"(median {result['ms_median']} ms/frame), "
+        f"{result['clicks_explained']}/{result['clicks']} clicks reproduced"
+    )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=1)
+
+    return 0 if result["clicks_explained"] == result["clicks"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+"""Synthetic screen generator — composites real templates onto fake UIs."""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+from src.template_bundle import rescale
+from src.template_match import TEMPLATES_DIR, _load
+
+SCREEN_SIZES = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+}
+
+# Distortions applied by compose(): keyword arguments per scenario
+DISTORTIONS = {
+    "clean": {},
+    "noise": {"noise": 6.0},
+    "scaled": {"scale": 0.95},
+    "occluded": {"occlusion": 0.2},
+}
+
+
+def template_names() -> list[str]:
+    """All template filenames shipped in old_code/templates."""
+    return sorted(p.name for p in TEMPLATES_DIR.glob("*.png"))
+
+
+def make_background(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Light UI-like BGR background: flat panels, boxes and mild noise."""
+    bg = np.full((height, width, 3), 245, np.uint8)
+    for _ in range(60):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        w, h = int(rng.integers(40, 600)), int(rng.integers(20, 200))
+        shade = int(rng.integers(200, 255))
+        cv2.rectangle(bg, (x, y), (x + w, y + h), (shade, shade, shade), -1)
+    for _ in range(80):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        cv2.putText(
+            bg, "Lorem ipsum", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (90, 90, 90), 1
+        )
+    noise = rng.normal(0, 2, bg.shape)
+    return np.clip(bg + noise, 0, 255).astype(np.uint8)
+
+
+def template_size(name: str, scale: float = 1.0) -> tuple[int, int]:
+    """(width, height) of a template pasted at `scale`."""
+    th, tw = rescale(_load(name), scale).shape[:2]
+    return tw, th
+
+
+def paste(
+    frame: np.ndarray, name: str, x: int, y: int, scale: float = 1.0
+) -> tuple[int, int]:
+    """Paste a template at top-left (x, y). Returns its expected center."""
+    tmpl = rescale(_load(name), scale)
+    th, tw = tmpl.shape[:2]
+    frame[y : y + th, x : x + tw] = cv2.cvtColor(tmpl, cv2.COLOR_GRAY2BGR)
+    return x + tw // 2, y + th // 2
+
+
+def random_position(
+    frame: np.ndarray, name: str, rng: np.random.Generator
+) -> tuple[int, int]:
+    """Random top-left position where the template fits inside the frame."""
+    th, tw = _load(name).shape[:2]
+    h, w = frame.shape[:2]
+    return int(rng.integers(0, w - tw)), int(rng.integers(0, h - th))
+
+
+def spread_positions(
+    frame: np.ndarray,
+    size: tuple[int, int],
+    count: int,
+    rng: np.random.Generator,
+) -> list[tuple[int, int]]:
+    """`count` non-overlapping top-left positions on a jittered grid."""
+    h, w = frame.shape[:2]
+    tw, th = size
+    cols = max(1, min(count, w // (2 * tw)))
+    rows = -(-count // cols)
+    step_x, step_y = w // cols, h // rows
+    positions = []
+    for i in range(count):
+        gx, gy = (i % cols) * step_x, (i // cols) * step_y
+        x = gx + int(rng.integers(0, max(1, step_x - tw)))
+        y = gy + int(rng.integers(0, max(1, step_y - th)))
+        positions.append((min(x, w - tw), min(y, h - th)))
+    return positions
+
+
+def occlude(
+    frame: np.ndarray,
+    box: tuple[int, int, int, int],
+    fraction: float,
+    rng: np.random.Generator,
+) -> None:
+    """Cover `fraction` of a box (x, y, w, h) with a flat panel from one corner."""
+    x, y, w, h = box
+    side = float(np.sqrt(fraction))
+    ow, oh = max(1, round(w * side)), max(1, round(h * side))
+    ox = x if rng.random() < 0.5 else x + w - ow
+    oy = y if rng.random() < 0.5 else y + h - oh
+    shade = int(rng.integers(200, 255))
+    frame[oy : oy + oh, ox : ox + ow] = shade
+
+
+def compose(
+    background: np.ndarray,
+    placements: list[tuple[str, int, int]],
+    rng: np.random.Generator,
+    noise: float = 0.0,
+    scale: float = 1.0,
+    occlusion: float = 0.0,
+) -> tuple[np.ndarray, list[tuple[int, int]]]:
+    """Paste templates (name, x, y) onto a copy of `background`.
+
+    Each template is resized by `scale` and has `occlusion` of its area
+    covered; Gaussian noise of std `noise` is added to the whole frame.
+    Returns (frame, expected centers).
+    """
+    frame = background.copy()
+    centers = []
+    for name, x, y in placements:
+        centers.append(paste(frame, name, x, y, scale))
+        if occlusion:
+            occlude(frame, (x, y, *template_size(name, scale)), occlusion, rng)
+    if noise:
+        noisy = frame + rng.normal(0, noise, frame.shape)
+        frame = np.clip(noisy, 0, 255).astype(np.uint8)
+    return frame, centers
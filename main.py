@@ -34,9 +34,22 @@ def launch_chrome(url: str) -> subprocess.Popen:
     return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 
+def parse_size(text: str) -> tuple[int, int]:
+    """Parse a WIDTHxHEIGHT size such as 1280x720."""
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected WIDTHxHEIGHT, got {text!r}"
+        ) from None
+    return width, height
+
+
 def run_cert_cli(args) -> int:
     """CLI mode for certificate downloads."""
     from src.cert_orchestrator import run_cert_task
+    from src.grabber import start_grabber, stop_grabber
+    from src.recording import start_recording, stop_recording
     from src.screenshot import set_monitor, list_monitors
 
     set_monitor(args.monitor)
@@ -62,13 +75,28 @@ def run_cert_cli(args) -> int:
         return 0
 
     print()
-    success = run_cert_task(max_songs=args.songs, max_scrolls=args.scrolls)
+    if args.record_session:
+        start_recording(args.record_session)
+        print(f"[INFO] Recording captures to {args.record_session}")
+    if args.capture_rate > 0:
+        start_grabber(args.capture_rate)
+    try:
+        success = run_cert_task(
+            max_songs=args.songs,
+            max_scrolls=args.scrolls,
+            calibrate_thresholds=args.calibrate_thresholds,
+        )
+    finally:
+        stop_grabber()
+        stop_recording()
     return 0 if success else 1
 
 
 def run_cli(args) -> int:
     """Original CLI mode."""
+    from src.grabber import start_grabber, stop_grabber
     from src.orchestrator import run_task
+    from src.recording import start_recording, stop_recording
     from src.screenshot import set_monitor, list_monitors
 
     # List monitors mode
@@ -122,7 +150,18 @@ def run_cli(args) -> int:
         return 0
 
     print()
-    success = run_task(max_songs=args.songs)
+    if args.record_session:
+        start_recording(args.record_session)
+        print(f"[INFO] Recording captures to {args.record_session}")
+    if args.capture_rate > 0:
+        start_grabber(args.capture_rate)
+    try:
+        success = run_task(
+            max_songs=args.songs, calibrate_thresholds=args.calibrate_thresholds
+        )
+    finally:
+        stop_grabber()
+        stop_recording()
 
     if chrome_proc:
         print("[INFO] Chrome is still running — close manually when done.")
@@ -160,6 +199,50 @@ def main():
     parser.add_argument(
         "--scrolls", type=int, default=15, help="[CLI] Max scroll rounds (default: 15)"
     )
+    parser.add_argument(
+        "--calibrate-thresholds",
+        action="store_true",
+        help="[CLI] Recalibrate per-template thresholds from this run "
+        "(writes data/thresholds.json)",
+    )
+    parser.add_argument(
+        "--capture-rate",
+        type=float,
+        default=0.0,
+        metavar="HZ",
+        help="[CLI] Capture frames in a background thread at this rate "
+        "(default: 0 = capture on demand)",
+    )
+    parser.add_argument(
+        "--record-session",
+        metavar="PATH",
+        help="[CLI] Record every captured frame and click to a session file "
+        "for offline replay (benchmarks/bench_replay.py)",
+    )
+    parser.add_argument(
+        "--vlm-format",
+        choices=["png", "jpeg", "webp"],
+        default="png",
+        help="Image format of screenshots sent to the VLM (default: png)",
+    )
+    parser.add_argument(
+        "--vlm-quality",
+        type=int,
+        default=85,
+        help="JPEG/WebP quality of VLM screenshots, 1-100 (default: 85)",
+    )
+    parser.add_argument(
+        "--vlm-max-size",
+        type=parse_size,
+        default=(1920, 1080),
+        metavar="WxH",
+        help="Downscale VLM screenshots to fit this size (default: 1920x1080)",
+    )
+    parser.add_argument(
+        "--vlm-patch-grid",
+        action="store_true",
+        help="Round VLM screenshot sizes down to the model's 28px patch grid",
+    )
     parser.add_argument(
         "--url",
         type=str,
@@ -179,6 +262,15 @@ def main():
     )
     args = parser.parse_args()
 
+    from src.screenshot import set_vlm_encoding
+
+    try:
+        set_vlm_encoding(
+            args.vlm_format, args.vlm_quality, args.vlm_max_size, args.vlm_patch_grid
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
     if args.cli and args.cert:
         sys.exit(run_cert_cli(args))
     elif args.cli:
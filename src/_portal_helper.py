@@ -4,20 +4,33 @@
 Keeps the D-Bus connection alive between calls to avoid repeated
 gi import and bus setup overhead. Runs with system python3 for gi access.
 
-Protocol: read output path from stdin, take screenshot, write "OK" or "FAIL" to stdout.
+Protocol (one line per message):
+    started as  _portal_helper.py --shm-fd N   (N: a memfd shared with the parent)
+    helper:     READY 2
+    parent:     GRAB | QUIT
+    helper:     OK <width> <height> <stride> <channels> | FAIL[:reason]
+
+On OK the RGB (3) or RGBA (4) pixels are in the shared memfd, rows
+`stride` bytes apart, starting at offset 0. The helper grows the memfd
+when a frame does not fit; the parent maps it and wraps the pixels
+without decoding anything. The pixels stay valid until the next GRAB.
 """
 
+import mmap
 import os
 import sys
+import tempfile
 
-import gi
-
-gi.require_version("Gtk", "3.0")
-from gi.repository import Gio, GLib  # noqa: E402
+PROTOCOL = 2
 
 
 def take_screenshot(dest_path: str) -> bool:
     """Take a screenshot via XDG Portal, save to dest_path. Returns True on success."""
+    import gi
+
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gio, GLib
+
     result_uri = [None]
     loop = GLib.MainLoop()
 
@@ -75,21 +88,78 @@ def take_screenshot(dest_path: str) -> bool:
     return False
 
 
-def main():
-    # Signal readiness
-    sys.stdout.write("READY\n")
-    sys.stdout.flush()
+def grab_portal() -> tuple[int, int, int, int, bytes] | None:
+    """Portal screenshot decoded to (width, height, stride, channels, pixels)."""
+    import gi
+
+    gi.require_version("GdkPixbuf", "2.0")
+    from gi.repository import GdkPixbuf
+
+    fd, path = tempfile.mkstemp(suffix=".png")
+    os.close(fd)
+    try:
+        if not take_screenshot(path):
+            return None
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file(path)
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return (
+        pixbuf.get_width(),
+        pixbuf.get_height(),
+        pixbuf.get_rowstride(),
+        pixbuf.get_n_channels(),
+        pixbuf.read_pixel_bytes().get_data(),
+    )
 
-    for line in sys.stdin:
-        dest_path = line.strip()
-        if not dest_path or dest_path == "QUIT":
+
+class SharedFrame:
+    """Writer side of the shared memfd."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+        self.mm: mmap.mmap | None = None
+
+    def write(self, pixels: bytes) -> None:
+        size = len(pixels)
+        if self.mm is None or len(self.mm) < size:
+            if self.mm is not None:
+                self.mm.close()
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+            self.mm = mmap.mmap(self.fd, os.fstat(self.fd).st_size)
+        self.mm[:size] = pixels
+
+
+def serve(grab, shm_fd: int, stdin=sys.stdin, stdout=sys.stdout) -> None:
+    """Answer GRAB requests with frames from `grab()` until QUIT or EOF."""
+    shared = SharedFrame(shm_fd)
+    stdout.write(f"READY {PROTOCOL}\n")
+    stdout.flush()
+
+    for line in stdin:
+        cmd = line.strip()
+        if not cmd or cmd == "QUIT":
             break
         try:
-            ok = take_screenshot(dest_path)
-            sys.stdout.write("OK\n" if ok else "FAIL\n")
+            frame = grab()
+            if frame is None:
+                stdout.write("FAIL\n")
+            else:
+                width, height, stride, channels, pixels = frame
+                shared.write(pixels)
+                stdout.write(f"OK {width} {height} {stride} {channels}\n")
         except Exception as e:
-            sys.stdout.write(f"FAIL:{e}\n")
-        sys.stdout.flush()
+            stdout.write(f"FAIL:{e}\n")
+        stdout.flush()
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] != "--shm-fd":
+        sys.exit("usage: _portal_helper.py --shm-fd N")
+    serve(grab_portal, int(sys.argv[2]))
 
 
 if __name__ == "__main__":
@@ -29,9 +29,11 @@ def _extract_coords(
 ) -> tuple[int, int]:
     """Extract (x, y) from '<|box_start|>(x,y)<|box_end|>' and scale to absolute desktop pixels.
 
-    UI-TARS outputs coordinates in the pixel space of the image it processed.
-    We scale from image coords → monitor coords, then add the monitor's
-    offset in the virtual desktop so PyAutoGUI hits the right spot.
+    UI-TARS outputs coordinates in the pixel space of the image it processed
+    (the encoded image's own size when take_screenshot() sends images on
+    the model's patch grid, see set_vlm_encoding). We scale from image coords → monitor coords,
+    per axis and pixel center to pixel center, then add the monitor's offset
+    in the virtual desktop so PyAutoGUI hits the right spot.
     """
     m = re.search(r"\((\d+)\s*,\s*(\d+)\)", box_str)
     if not m:
@@ -42,8 +44,9 @@ def _extract_coords(
 
     if img_size:
         iw, ih = img_size
-        mon_x = round(img_x * sw / iw)
-        mon_y = round(img_y * sh / ih)
+        # Image pixel i covers monitor pixels [i * sw/iw, (i+1) * sw/iw)
+        mon_x = int((img_x + 0.5) * sw / iw)
+        mon_y = int((img_y + 0.5) * sh / ih)
     else:
         mon_x, mon_y = img_x, img_y
 
@@ -0,0 +1,218 @@
+"""Audio duration from the MP3 header, without spawning ffprobe.
+
+Every downloaded song used to cost two ffprobe launches (duplicate check
+in _download_song, folder name in _move_to_subfolder). The duration is
+in the file's first frame: VBR files carry a Xing/Info or VBRI header
+with the frame count; for CBR files the audio size divided by the
+bitrate gives it. Only files that parse as neither (other formats,
+broken headers) go to ffprobe.
+
+Results are cached by (path, size, mtime), so no file is read twice.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import subprocess
+
+# MPEG version bits → version: 0 = MPEG 2.5, 2 = MPEG 2, 3 = MPEG 1
+_MPEG1, _MPEG2, _MPEG25 = 3, 2, 0
+
+# Bitrates in kbit/s by (MPEG 1?, layer) and index 1..14
+_BITRATES = {
+    (True, 1): (32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_BITRATES[(False, 3)] = _BITRATES[(False, 2)]
+_SAMPLE_RATES = {
+    _MPEG1: (44100, 48000, 32000),
+    _MPEG2: (22050, 24000, 16000),
+    _MPEG25: (11025, 12000, 8000),
+}
+
+HEAD_BYTES = 64 * 1024  # read after the ID3v2 tag to find the first frame
+
+
+class FrameHeader:
+    """A decoded 4-byte MPEG audio frame header."""
+
+    __slots__ = ("bitrate", "layer", "length", "mono", "sample_rate", "version")
+
+    def __init__(self, word: int) -> None:
+        if word >> 21 != 0x7FF:
+            raise ValueError("no frame sync")
+        self.version = (word >> 19) & 3
+        self.layer = 4 - ((word >> 17) & 3)
+        br_index = (word >> 12) & 15
+        sr_index = (word >> 10) & 3
+        if self.version == 1 or self.layer == 4 or br_index in (0, 15):
+            raise ValueError("reserved or free-format header")
+        if sr_index == 3:
+            raise ValueError("reserved sample rate")
+        mpeg1 = self.version == _MPEG1
+        self.bitrate = _BITRATES[(mpeg1, self.layer)][br_index - 1] * 1000
+        self.sample_rate = _SAMPLE_RATES[self.version][sr_index]
+        self.mono = (word >> 6) & 3 == 3
+        padding = (word >> 9) & 1
+        if self.layer == 1:
+            self.length = (12 * self.bitrate // self.sample_rate + padding) * 4
+        else:
+            factor = 144 if mpeg1 or self.layer == 2 else 72
+            self.length = factor * self.bitrate // self.sample_rate + padding
+
+    @property
+    def samples(self) -> int:
+        """Samples per frame."""
+        if self.layer == 1:
+            return 384
+        if self.layer == 3 and self.version != _MPEG1:
+            return 576
+        return 1152
+
+    @property
+    def xing_offset(self) -> int:
+        """Offset of a Xing/Info header from the frame start (after side info)."""
+        if self.version == _MPEG1:
+            return 4 + (17 if self.mono else 32)
+        return 4 + (9 if self.mono else 17)
+
+
+def _id3v2_size(head: bytes) -> int:
+    """Bytes taken by an ID3v2 tag at the start of `head` (0 if none)."""
+    if len(head) < 10 or head[:3] != b"ID3":
+        return 0
+    size = 0
+    for b in head[6:10]:  # syncsafe integer
+        size = (size << 7) | (b & 0x7F)
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _first_frame(head: bytes) -> tuple[int, FrameHeader] | None:
+    """Offset and header of the first frame in `head`.
+
+    A sync word counts only if another frame header follows right after
+    it (or the data ends exactly there), which rules out false syncs in
+    tag data. A candidate whose next header lies beyond `head` is skipped.
+    """
+    pos = head.find(b"\xff")
+    while 0 <= pos <= len(head) - 4:
+        try:
+            frame = FrameHeader(struct.unpack_from(">I", head, pos)[0])
+        except ValueError:
+            pos = head.find(b"\xff", pos + 1)
+            continue
+        nxt = pos + frame.length
+        if nxt == len(head):
+            return pos, frame
+        if nxt + 4 <= len(head):
+            try:
+                FrameHeader(struct.unpack_from(">I", head, nxt)[0])
+                return pos, frame
+            except ValueError:
+                pass
+        pos = head.find(b"\xff", pos + 1)
+    return None
+
+
+def parse_mp3_duration(head: bytes, audio_size: int) -> float | None:
+    """Duration in seconds from the start of an MP3's audio data.
+
+    `head` starts right after the ID3v2 tag (if any) and covers the first
+    frames; `audio_size` is the number of bytes from there to the end of
+    the audio (without a trailing ID3v1 tag), needed for CBR files.
+    """
+    found = _first_frame(head)
+    if found is None:
+        return None
+    pos, frame = found
+
+    # Xing (VBR) / Info (LAME CBR) header: frame count if flag bit 0 is set
+    x = pos + frame.xing_offset
+    if head[x : x + 4] in (b"Xing", b"Info") and len(head) >= x + 12:
+        flags, frames = struct.unpack_from(">II", head, x + 4)
+        if flags & 1 and frames:
+            return frames * frame.samples / frame.sample_rate
+    # VBRI (Fraunhofer): always 32 bytes after the frame header
+    v = pos + 36
+    if head[v : v + 4] == b"VBRI" and len(head) >= v + 18:
+        frames = struct.unpack_from(">I", head, v + 14)[0]
+        if frames:
+            return frames * frame.samples / frame.sample_rate
+
+    # CBR: audio bytes / bitrate
+    if audio_size <= pos:
+        return None
+    return (audio_size - pos) * 8 / frame.bitrate
+
+
+def mp3_duration(path: str) -> float | None:
+    """Duration of an MP3 file from its headers (None if it does not parse)."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        tag = _id3v2_size(f.read(10))
+        f.seek(tag)
+        head = f.read(HEAD_BYTES)
+        has_id3v1 = False
+        if size - tag >= 128:
+            f.seek(size - 128)
+            has_id3v1 = f.read(3) == b"TAG"
+    return parse_mp3_duration(head, size - tag - (128 if has_id3v1 else 0))
+
+
+def _ffprobe_duration(path: str) -> float | None:
+    try:
+        out = subprocess.check_output(
+            [
+                "ffprobe",
+                "-v",
+                "quiet",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "csv=p=0",
+                path,
+            ],
+            text=True,
+            timeout=10,
+        ).strip()
+        return float(out)
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+
+_cache: dict[tuple[str, int, int], float | None] = {}
+
+
+def audio_duration(path: str) -> float | None:
+    """Duration of an audio file in seconds (None if unknown).
+
+    MP3 headers are parsed in-process; ffprobe is only the fallback.
+    Cached by (path, size, mtime).
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key in _cache:
+        return _cache[key]
+
+    secs = None
+    if path.lower().endswith(".mp3"):
+        try:
+            secs = mp3_duration(path)
+        except OSError:
+            pass
+    if secs is None:
+        secs = _ffprobe_duration(path)
+    _cache[key] = secs
+    return secs
+
+
+def clear_cache() -> None:
+    _cache.clear()
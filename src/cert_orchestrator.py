@@ -15,7 +15,6 @@ Workflow per song:
 
 from __future__ import annotations
 
-import glob
 import os
 import re
 import shutil
@@ -25,14 +24,23 @@ import pyautogui
 
 from .events import OrchestratorEvents, PrintEvents, C_DONE, C_ERR, C_WARN, C_RESET
 from .orchestrator import (
+    _calibrate_templates,
     _click_at,
+    _finish_threshold_calibration,
+    _log_match_stats,
     TUNEE_DIR,
     DL_DIR,
-    SONG_EXTENSIONS,
 )
-from .screenshot import take_screenshot_bgr, get_monitor_offset, get_screen_size
+from .download_watcher import DownloadTracker, wait_for
+from .frame import ScreenFrame
+from .grabber import latest_frame
+from .manifest import get_manifest
+from .match_telemetry import NEAR_MISS_DIR, reset_telemetry
+from .screenshot import get_monitor_offset, get_screen_size
+from .settle import wait_until_settled
 from .scraper import get_song_list
-from .template_match import find_all_templates, find_template
+from .template_match import find_all_templates, find_template, get_scale, reset_priors
+from .thresholds import start_calibration, threshold_for
 
 # Timing
 CERT_CLICK_DELAY = 1.5
@@ -40,12 +48,21 @@ CERT_WAIT_MAX = 30  # max seconds to wait for PDF download
 BETWEEN_CERTS_DELAY = 2
 MAX_RETRIES = 3
 
+# Half-height of the band around the hovered row searched for the play
+# button (at template scale 1.0)
+PLAY_BUTTON_BAND = 80
+
+# Default template threshold (overridden per template by thresholds.json)
+CERT_THRESHOLD = 0.7
+
 
 # ── Helpers ──────────────────────────────────────────────────────────
 
 
 def find_folders_needing_certs() -> dict[int, str]:
-    """Scan ~/Downloads/tunee/ and find folders that have songs but no PDF.
+    """Find folders in ~/Downloads/tunee/ that have songs but no PDF.
+
+    Reads the project manifest after reconciling it with the disk.
 
     Returns:
         dict mapping folder number (1-based) -> folder path
@@ -53,32 +70,9 @@ def find_folders_needing_certs() -> dict[int, str]:
     if not os.path.isdir(TUNEE_DIR):
         return {}
 
-    result = {}
-    for entry in sorted(os.listdir(TUNEE_DIR)):
-        folder_path = os.path.join(TUNEE_DIR, entry)
-        if not os.path.isdir(folder_path):
-            continue
-
-        # Extract folder number
-        match = re.match(r"(\d+)", entry)
-        if not match:
-            continue
-        num = int(match.group(1))
-
-        # Check: has song files but no PDF
-        has_songs = False
-        has_pdf = False
-        for f in os.listdir(folder_path):
-            ext = os.path.splitext(f)[1].lower()
-            if ext in SONG_EXTENSIONS:
-                has_songs = True
-            if ext == ".pdf":
-                has_pdf = True
-
-        if has_songs and not has_pdf:
-            result[num] = folder_path
-
-    return result
+    manifest = get_manifest(TUNEE_DIR)
+    manifest.reconcile()
+    return manifest.needing_certs()
 
 
 def _get_pdf_files() -> set[str]:
@@ -94,21 +88,17 @@ def _wait_for_new_pdf(
     before: set[str],
     events: OrchestratorEvents,
     timeout: int = CERT_WAIT_MAX,
+    tracker: DownloadTracker | None = None,
 ) -> str | None:
     """Wait for a new PDF to appear in ~/Downloads/. Returns path or None."""
-    for _ in range(timeout):
-        if events.should_stop():
-            return None
-        time.sleep(1)
-        current = _get_pdf_files()
-        new_pdfs = current - before
-        if new_pdfs:
-            time.sleep(0.5)  # let file finish writing
-            return next(iter(new_pdfs))
-        # Check for in-progress downloads
-        if glob.glob(os.path.join(DL_DIR, "*.crdownload")):
-            continue
-    return None
+
+    def new_pdf() -> str | None:
+        return next(iter(_get_pdf_files() - before), None)
+
+    pdf_path = wait_for(DL_DIR, new_pdf, timeout, should_stop=events.should_stop)
+    if pdf_path and not (tracker and tracker.is_complete(pdf_path)):
+        time.sleep(0.5)  # let file finish writing
+    return pdf_path
 
 
 def _safe_mouse_position() -> None:
@@ -123,7 +113,7 @@ def _close_modals() -> None:
     _safe_mouse_position()
     for _ in range(3):
         pyautogui.press("escape")
-        time.sleep(0.5)
+        wait_until_settled(timeout=0.5)
 
 
 def _scroll_to_top() -> None:
@@ -131,9 +121,9 @@ def _scroll_to_top() -> None:
     off_x, off_y = get_monitor_offset()
     sw, sh = get_screen_size()
     pyautogui.click(round(sw * 0.5) + off_x, round(sh * 0.5) + off_y)
-    time.sleep(0.3)
+    time.sleep(0.3)  # focus click: too short for settle detection to end early
     pyautogui.hotkey("ctrl", "Home")
-    time.sleep(1.5)
+    wait_until_settled(timeout=1.5)
 
 
 def _find_folder_for_pdf(pdf_name: str) -> str | None:
@@ -189,17 +179,25 @@ def _download_certificate(
     # Step 1: Hover over the song row (left side, same Y as download icon)
     hover_x = 200
     hover_y = icon_y
+    band = round(PLAY_BUTTON_BAND * get_scale())
+    region = (0, max(0, hover_y - band), get_screen_size()[0], hover_y + band)
     events.on_log(f"  Hover song row at ({hover_x}, {hover_y})")
     pyautogui.moveTo(hover_x + off_x, hover_y + off_y)
-    time.sleep(1)
+    wait_until_settled(region, timeout=1)
 
-    # Step 2: Find and click play button
+    # Step 2: Find and click play button (it appears in the hovered row,
+    # so only a band around that row is captured)
     for attempt in range(MAX_RETRIES):
         if events.should_stop():
             return ("failed", None)
-        screenshot = take_screenshot_bgr()
-        pos = find_template(screenshot, "play_button.png", threshold=0.7)
+        frame = ScreenFrame.capture(region, gray=True)
+        pos = find_template(
+            frame,
+            "play_button.png",
+            threshold=threshold_for("play_button.png", CERT_THRESHOLD),
+        )
         if pos:
+            pos = (pos[0], pos[1] + region[1])  # back to monitor coordinates
             _click_at(pos[0], pos[1], "Play button", events)
             break
         time.sleep(0.5)
@@ -207,14 +205,21 @@ def _download_certificate(
         events.on_log(f"  {C_ERR}Play button not found{C_RESET}")
         return ("failed", None)
 
-    time.sleep(3.0)  # player needs time to fully load the new song
+    wait_until_settled(timeout=3.0)  # player needs time to load the new song
 
     # Step 3: Find and click three-dots menu
+    seen = time.monotonic()
     for attempt in range(MAX_RETRIES):
         if events.should_stop():
             return ("failed", None)
-        screenshot = take_screenshot_bgr()
-        pos = find_template(screenshot, "three_dots.png", threshold=0.7)
+        frame = latest_frame(newer_than=seen)
+        seen = frame.timestamp
+        pos = find_template(
+            frame,
+            "three_dots.png",
+            threshold=threshold_for("three_dots.png", CERT_THRESHOLD),
+            prior=True,
+        )
         if pos:
             _click_at(pos[0], pos[1], "Three-dots menu", events)
             break
@@ -224,14 +229,21 @@ def _download_certificate(
         _close_modals()
         return ("failed", None)
 
-    time.sleep(1)
+    wait_until_settled(timeout=1)
 
     # Step 4: Find and click "Copyright certificate" menu item
+    seen = time.monotonic()
     for attempt in range(MAX_RETRIES):
         if events.should_stop():
             return ("failed", None)
-        screenshot = take_screenshot_bgr()
-        pos = find_template(screenshot, "cert_menu_item.png", threshold=0.7)
+        frame = latest_frame(newer_than=seen)
+        seen = frame.timestamp
+        pos = find_template(
+            frame,
+            "cert_menu_item.png",
+            threshold=threshold_for("cert_menu_item.png", CERT_THRESHOLD),
+            prior=True,
+        )
         if pos:
             _click_at(pos[0], pos[1], "Copyright certificate", events)
             break
@@ -241,16 +253,24 @@ def _download_certificate(
         _close_modals()
         return ("failed", None)
 
-    time.sleep(1.5)
+    wait_until_settled(timeout=1.5)
 
     # Step 5: Remember PDFs before, then click download
     pdfs_before = _get_pdf_files()
+    tracker = DownloadTracker(DL_DIR)
 
+    seen = time.monotonic()
     for attempt in range(MAX_RETRIES):
         if events.should_stop():
             return ("failed", None)
-        screenshot = take_screenshot_bgr()
-        pos = find_template(screenshot, "cert_download.png", threshold=0.7)
+        frame = latest_frame(newer_than=seen)
+        seen = frame.timestamp
+        pos = find_template(
+            frame,
+            "cert_download.png",
+            threshold=threshold_for("cert_download.png", CERT_THRESHOLD),
+            prior=True,
+        )
         if pos:
             _click_at(pos[0], pos[1], "Certificate download", events)
             break
@@ -261,7 +281,7 @@ def _download_certificate(
         return ("failed", None)
 
     # Step 6: Wait for PDF
-    pdf_path = _wait_for_new_pdf(pdfs_before, events)
+    pdf_path = _wait_for_new_pdf(pdfs_before, events, tracker=tracker)
     if not pdf_path:
         events.on_log(f"  {C_ERR}PDF download timeout{C_RESET}")
         _close_modals()
@@ -290,6 +310,7 @@ def _download_certificate(
     # Step 9: Move PDF to song folder
     dst = os.path.join(folder_path, pdf_name)
     shutil.move(pdf_path, dst)
+    get_manifest(TUNEE_DIR).record_cert(folder_name)
     events.on_log(f"  {C_DONE}Certificate: {pdf_name} -> {folder_name}/{C_RESET}")
 
     return ("ok", folder_name)
@@ -302,11 +323,14 @@ def run_cert_task(
     max_songs: int = 50,
     max_scrolls: int = 15,
     events: OrchestratorEvents | None = None,
+    calibrate_thresholds: bool = False,
 ) -> bool:
     """Download certificates for songs that don't have one yet.
 
     Position-based matching: CDP song list order matches download icon
     order on screen. Folder number -> song index in CDP list.
+    With `calibrate_thresholds`, the per-template thresholds are
+    recalibrated from this run (see run_task).
     """
     if events is None:
         events = PrintEvents()
@@ -349,10 +373,15 @@ def run_cert_task(
     events.on_log(f"  Output: {TUNEE_DIR}")
     events.on_log(f"{'=' * 60}\n")
     events.on_progress(0, total_needed)
+    reset_priors()
+    reset_telemetry(NEAR_MISS_DIR)
+    if calibrate_thresholds:
+        start_calibration()
 
     # Scroll to top to ensure first icon matches first song
     _scroll_to_top()
     events.on_log("Seite nach oben gescrollt")
+    _calibrate_templates(events, CERT_THRESHOLD)
 
     for scroll_round in range(max_scrolls + 1):
         if events.should_stop():
@@ -360,8 +389,13 @@ def run_cert_task(
             break
 
         # Find download icons on current screen
-        screenshot = take_screenshot_bgr()
-        icons = find_all_templates(screenshot, "download_button.png", threshold=0.7)
+        frame = latest_frame(newer_than=time.monotonic())
+        icons = find_all_templates(
+            frame,
+            "download_button.png",
+            threshold=threshold_for("download_button.png", CERT_THRESHOLD),
+            prior=True,
+        )
 
         if not icons:
             events.on_log(
@@ -379,8 +413,7 @@ def run_cert_task(
         if scroll_round == 0:
             min_y = 0
         else:
-            _, sh = get_screen_size()
-            min_y = int(sh * 0.15)
+            min_y = int(frame.height * 0.15)
 
         eligible = [(ix, iy, c) for ix, iy, c in icons if iy > min_y]
 
@@ -409,7 +442,7 @@ def run_cert_task(
                         f"  {C_WARN}Fail-safe ausgeloest — ueberspringe{C_RESET}"
                     )
                     _safe_mouse_position()
-                    time.sleep(1)
+                    wait_until_settled(timeout=1)
                     result, folder_name = "failed", None
 
                 if result == "ok":
@@ -423,7 +456,7 @@ def run_cert_task(
                     events.on_song_failed(current_folder_num)
 
                 if completed < total_needed and not events.should_stop():
-                    time.sleep(BETWEEN_CERTS_DELAY)
+                    wait_until_settled(timeout=BETWEEN_CERTS_DELAY)
 
             song_idx += 1
 
@@ -439,6 +472,9 @@ def run_cert_task(
     events.on_log(f"  Fertig! {completed} Zertifikate heruntergeladen")
     if failures:
         events.on_log(f"  ({failures} fehlgeschlagen)")
+    _log_match_stats(events)
+    if calibrate_thresholds:
+        _finish_threshold_calibration(events)
     events.on_log(f"{'=' * 60}")
     events.on_progress(completed, total_needed)
     return completed > 0
@@ -449,4 +485,4 @@ def _scroll_down() -> None:
     off_x, off_y = get_monitor_offset()
     sw, sh = get_screen_size()
     pyautogui.scroll(-5, x=round(sw * 0.15) + off_x, y=round(sh * 0.5) + off_y)
-    time.sleep(2)
+    wait_until_settled(timeout=2)
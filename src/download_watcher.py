@@ -0,0 +1,360 @@
+"""Download watcher — inotify events for the download directory.
+
+The orchestrators wait for Chrome to drop files into ~/Downloads. Polling
+with listdir + sleep(1..3) adds up to the poll interval of latency to
+every wait. A DownloadWatcher reads the directory's inotify events
+(create, rename, close-write, delete) in a daemon thread and wakes
+waiting code the moment one arrives. A DownloadTracker follows each
+download through its temp file (.crdownload) to the final rename, which
+is the moment the file is complete.
+
+Without inotify (non-Linux, watch limit reached, directory missing) the
+watcher stays inactive and wait() simply sleeps the poll interval, i.e.
+the old polling loop. With inotify the poll interval remains the upper
+bound between checks, so a lost event costs at most one interval. If the
+kernel's event queue overflows, a "resync" event makes trackers rescan
+the directory instead.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (+ name)
+EVENT_BACKLOG = 256  # events kept for events_since()
+MOVE_PAIR_TIMEOUT = (
+    1.0  # s a MOVED_FROM waits for its MOVED_TO (may be in a later read)
+)
+
+# Names browsers download to before renaming to the final name
+# (Chrome, Firefox, Safari)
+TEMP_SUFFIXES = (".crdownload", ".part", ".download")
+
+
+@dataclass(frozen=True)
+class DownloadEvent:
+    """One change in the watched directory."""
+
+    kind: str  # "create", "rename", "close_write", "delete" or "resync"
+    name: str  # file name (no directory; "" for "resync")
+    old_name: str | None = None  # for "rename": the previous name, if known
+
+
+def _inotify_init(directory: str) -> int | None:
+    """inotify fd watching `directory`, or None if inotify is unavailable."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    fd = init(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    if add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _parse(buf: bytes) -> list[tuple[int, int, str]]:
+    """(mask, cookie, name) of every inotify_event in `buf`."""
+    out = []
+    offset = 0
+    while offset + _EVENT.size <= len(buf):
+        _, mask, cookie, length = _EVENT.unpack_from(buf, offset)
+        start = offset + _EVENT.size
+        name = buf[start : start + length].rstrip(b"\0")
+        out.append((mask, cookie, os.fsdecode(name)))
+        offset = start + length
+    return out
+
+
+class DownloadWatcher:
+    """Wakes waiters on create/rename/close-write events in one directory."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.seq = 0  # number of wakeups so far
+        self._events: deque[tuple[int, DownloadEvent]] = deque(maxlen=EVENT_BACKLOG)
+        self._moved_from: dict[int, tuple[str, float]] = {}  # cookie → name, time
+        self._cond = threading.Condition()
+        self._fd: int | None = None
+        self._stop_r = self._stop_w = -1
+        self._thread: threading.Thread | None = None
+
+    @property
+    def active(self) -> bool:
+        """True while inotify events are delivered (else wait() just polls)."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start watching; returns False if inotify is not available."""
+        if self._thread is not None:
+            return self.active
+        self._fd = _inotify_init(self.directory)
+        if self._fd is None:
+            return False
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(
+            target=self._run, name="download-watcher", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        os.write(self._stop_w, b"x")
+        self._thread.join(timeout=5)
+        self._thread = None
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            os.close(fd)
+        self._fd = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            ready, _, _ = select.select([self._fd, self._stop_r], [], [])
+            if self._stop_r in ready:
+                return
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            self._publish(_parse(buf))
+
+    def _publish(self, raw: list[tuple[int, int, str]]) -> None:
+        """Turn raw inotify events into DownloadEvents and wake the waiters.
+
+        A rename's MOVED_FROM/MOVED_TO pair can be split across reads, so
+        MOVED_FROM names are kept until MOVE_PAIR_TIMEOUT; unpaired ones
+        were moved out of the directory and count as deleted.
+        """
+        now = time.monotonic()
+        events = []
+        for mask, cookie, name in raw:
+            if mask & IN_Q_OVERFLOW:  # events were dropped: rescan
+                self._moved_from.clear()
+                events.append(DownloadEvent("resync", ""))
+            elif mask & IN_MOVED_FROM:
+                self._moved_from[cookie] = (name, now)
+            elif mask & IN_MOVED_TO:
+                old = self._moved_from.pop(cookie, None)
+                events.append(DownloadEvent("rename", name, old and old[0]))
+            elif mask & IN_CREATE:
+                events.append(DownloadEvent("create", name))
+            elif mask & IN_CLOSE_WRITE:
+                events.append(DownloadEvent("close_write", name))
+            elif mask & IN_DELETE:
+                events.append(DownloadEvent("delete", name))
+        for cookie, (name, t) in list(self._moved_from.items()):
+            if now - t > MOVE_PAIR_TIMEOUT:
+                del self._moved_from[cookie]
+                events.append(DownloadEvent("delete", name))
+        with self._cond:
+            self.seq += 1
+            for event in events:
+                self._events.append((self.seq, event))
+            self._cond.notify_all()
+
+    def events_since(self, seq: int) -> list[DownloadEvent]:
+        """Events delivered after wakeup number `seq` (as far as still kept)."""
+        return self.events_after(seq)[1]
+
+    def events_after(self, seq: int) -> tuple[int, list[DownloadEvent]]:
+        """(current seq, events after `seq`), read atomically."""
+        with self._cond:
+            return self.seq, [event for s, event in self._events if s > seq]
+
+    def wait(self, seq: int, timeout: float) -> int:
+        """Block until an event newer than `seq` arrives or `timeout` passes.
+
+        Returns the current sequence number, to be passed in next time.
+        Inactive watchers just sleep `timeout` (plain polling).
+        """
+        if not self.active:
+            time.sleep(max(0.0, timeout))
+            return self.seq
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq != seq or not self.active, timeout)
+            return self.seq
+
+
+def is_temp_name(name: str) -> bool:
+    return name.endswith(TEMP_SUFFIXES)
+
+
+def _final_name(temp_name: str) -> str:
+    """`temp_name` without its temp suffix ("x.mp3.part" → "x.mp3")."""
+    for suffix in TEMP_SUFFIXES:
+        if temp_name.endswith(suffix):
+            return temp_name[: -len(suffix)]
+    return temp_name
+
+
+class DownloadTracker:
+    """Follows the downloads started in a directory after its creation.
+
+    A browser writes each download to a temp name and renames it to the
+    final name when done; that rename marks the file complete. Files that
+    show up under their final name right away (browsers without temp
+    files) are listed in `direct`: only size stability can tell when
+    those are done. Without inotify (`tracking` False) nothing is
+    reported and callers fall back to polling.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._watcher = get_watcher(directory)
+        self._seq = self._watcher.seq
+        self._pending: set[str] = set()  # temp names still being written
+        self._direct: set[str] = set()
+        self._completed: list[str] = []
+
+    @property
+    def tracking(self) -> bool:
+        return self._watcher.active
+
+    def update(self) -> list[str]:
+        """Apply new events; returns the paths completed since the last call."""
+        self._seq, events = self._watcher.events_after(self._seq)
+        done = []
+        for ev in events:
+            if ev.kind == "create":
+                (self._pending if is_temp_name(ev.name) else self._direct).add(ev.name)
+            elif ev.kind == "delete":  # cancelled, or moved away by us
+                self._pending.discard(ev.name)
+                self._direct.discard(ev.name)
+            elif ev.kind == "resync":
+                done.extend(self._rescan())
+            elif ev.kind == "rename":
+                self._pending.discard(ev.old_name)
+                self._direct.discard(ev.old_name)
+                if ev.old_name is None:  # moved in, or its MOVED_FROM was lost
+                    self._pending.difference_update(
+                        ev.name + suffix for suffix in TEMP_SUFFIXES
+                    )
+                if is_temp_name(ev.name):  # "Unconfirmed 1.crdownload" → "x.crdownload"
+                    self._pending.add(ev.name)
+                else:
+                    self._direct.discard(ev.name)  # Firefox' placeholder file
+                    done.append(os.path.join(self.directory, ev.name))
+        self._completed.extend(done)
+        return done
+
+    def _rescan(self) -> list[str]:
+        """Rebuild the state from the directory after lost events.
+
+        Temp files present are pending; a pending temp file that is gone
+        while its final name exists completed in the meantime.
+        """
+        try:
+            names = set(os.listdir(self.directory))
+        except OSError:
+            return []
+        done = []
+        for name in self._pending - names:
+            final = _final_name(name)
+            path = os.path.join(self.directory, final)
+            if final in names and path not in self._completed:
+                done.append(path)
+        self._pending = {name for name in names if is_temp_name(name)}
+        self._direct &= names
+        return done
+
+    @property
+    def completed(self) -> list[str]:
+        """Paths completed by a rename, oldest first."""
+        self.update()
+        return list(self._completed)
+
+    @property
+    def in_progress(self) -> bool:
+        """True while a download still has its temp name."""
+        self.update()
+        return bool(self._pending)
+
+    @property
+    def direct(self) -> list[str]:
+        """Paths that appeared under their final name (completion unknown)."""
+        self.update()
+        return [os.path.join(self.directory, name) for name in sorted(self._direct)]
+
+    def is_complete(self, path: str) -> bool:
+        """True if `path` was completed by a rename from a temp name."""
+        self.update()
+        return os.path.join(self.directory, os.path.basename(path)) in self._completed
+
+
+_watchers: dict[str, DownloadWatcher] = {}
+_lock = threading.Lock()
+
+
+def get_watcher(directory: str) -> DownloadWatcher:
+    """Shared, started watcher for `directory` (inactive without inotify)."""
+    directory = os.path.realpath(directory)
+    with _lock:
+        watcher = _watchers.get(directory)
+        if watcher is None:
+            watcher = _watchers[directory] = DownloadWatcher(directory)
+        if not watcher.active:
+            watcher.start()  # retried on every call while inotify fails
+        return watcher
+
+
+def stop_watchers() -> None:
+    """Stop all shared watchers."""
+    with _lock:
+        for watcher in _watchers.values():
+            watcher.stop()
+        _watchers.clear()
+
+
+def wait_for(
+    directory: str,
+    check: Callable[[], T | None],
+    timeout: float,
+    poll_interval: float = 1.0,
+    should_stop: Callable[[], bool] | None = None,
+) -> T | None:
+    """Return the first truthy `check()` result, or None after `timeout` s.
+
+    `check` runs immediately, then after every change in `directory` and
+    at least every `poll_interval` seconds. `should_stop` aborts early.
+    """
+    watcher = get_watcher(directory)
+    deadline = time.monotonic() + timeout
+    seq = watcher.seq
+    while True:
+        result = check()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (should_stop is not None and should_stop()):
+            return None
+        seq = watcher.wait(seq, min(poll_interval, remaining))
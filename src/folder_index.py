@@ -0,0 +1,130 @@
+"""In-memory index of the song folders in ~/Downloads/tunee.
+
+Song folders are named "NN - <sanitized name> - MMmSSs". Duplicate checks
+used to list the whole directory (plus every candidate folder) several
+times per song, i.e. O(N²) directory scans per run. A FolderIndex lists
+everything once and keeps, per sanitized name, the folders sorted by
+duration in seconds, so the ±2s fuzzy lookup is a bisect. Whoever moves
+files into a folder calls refresh() for it.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import re
+from dataclasses import dataclass
+
+FOLDER_RE = re.compile(r"(\d+) - (.*) - (\d+)m(\d+)s$")
+DURATION_RE = re.compile(r"(\d+)m(\d+)s")
+FUZZY_SECONDS = 2  # max duration difference of a fuzzy match
+
+
+@dataclass
+class FolderEntry:
+    """One song folder."""
+
+    folder: str  # directory name
+    num: int
+    name: str  # sanitized song name
+    secs: int
+    has_files: bool  # contains a song file
+    has_pdf: bool  # contains a certificate
+
+
+def duration_secs(duration: str) -> int | None:
+    """'04m10s' → 250 (None if unparsable)."""
+    m = DURATION_RE.match(duration)
+    return int(m.group(1)) * 60 + int(m.group(2)) if m else None
+
+
+class FolderIndex:
+    """Song folders of `root`, looked up by (sanitized name, duration)."""
+
+    def __init__(self, root: str, song_extensions: set[str]) -> None:
+        self.root = root
+        self.song_extensions = song_extensions
+        self.entries: dict[str, FolderEntry] = {}
+        self._by_name: dict[str, list[tuple[int, str]]] = {}  # sorted (secs, folder)
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """List `root` and every song folder in it (once)."""
+        self.entries.clear()
+        self._by_name.clear()
+        try:
+            with os.scandir(self.root) as it:
+                folders = [e.name for e in it if e.is_dir()]
+        except FileNotFoundError:
+            return
+        for folder in folders:
+            self.refresh(folder)
+
+    def refresh(self, folder: str) -> FolderEntry | None:
+        """(Re-)read one folder, e.g. after files were moved into it."""
+        m = FOLDER_RE.match(folder)
+        if not m:
+            return None
+        has_files = has_pdf = False
+        try:
+            for f in os.listdir(os.path.join(self.root, folder)):
+                ext = os.path.splitext(f)[1].lower()
+                has_files = has_files or ext in self.song_extensions
+                has_pdf = has_pdf or ext == ".pdf"
+        except FileNotFoundError:
+            self._remove(folder)
+            return None
+
+        entry = self.entries.get(folder)
+        if entry is None:
+            secs = int(m.group(3)) * 60 + int(m.group(4))
+            entry = FolderEntry(folder, int(m.group(1)), m.group(2), secs, False, False)
+            self.entries[folder] = entry
+            bisect.insort(self._by_name.setdefault(entry.name, []), (secs, folder))
+        entry.has_files, entry.has_pdf = has_files, has_pdf
+        return entry
+
+    def _remove(self, folder: str) -> None:
+        entry = self.entries.pop(folder, None)
+        if entry is not None:
+            self._by_name[entry.name].remove((entry.secs, folder))
+
+    def lookup(
+        self, name: str, secs: int, tolerance: int = FUZZY_SECONDS
+    ) -> list[FolderEntry]:
+        """Folders of `name` within ±tolerance s, closest first, then by name."""
+        durations = self._by_name.get(name, [])
+        lo = bisect.bisect_left(durations, secs - tolerance, key=lambda d: d[0])
+        hi = bisect.bisect_right(durations, secs + tolerance, key=lambda d: d[0])
+        hits = sorted(durations[lo:hi], key=lambda d: (abs(d[0] - secs), d[1]))
+        return [self.entries[folder] for _, folder in hits]
+
+    def find(self, name: str, duration: str) -> str | None:
+        """Folder for a song: exact duration first, else within ±2s.
+
+        Within the exact matches (or else the fuzzy ones) an empty folder,
+        i.e. one not downloaded yet, wins over a closer one with files, so
+        every version of a song gets its own folder.
+        """
+        secs = duration_secs(duration)
+        if secs is None:
+            return None
+        candidates = self.lookup(name, secs)
+        if not candidates:
+            return None
+        exact = [e for e in candidates if e.secs == secs]
+        for group in (exact, candidates):
+            for entry in group:
+                if not entry.has_files:
+                    return entry.folder
+            if group:
+                return group[0].folder
+        return None
+
+    def is_downloaded(self, name: str, duration: str) -> bool:
+        """True if folders for the song exist and all of them have files."""
+        secs = duration_secs(duration)
+        if secs is None:
+            return False
+        candidates = self.lookup(name, secs)
+        return bool(candidates) and all(e.has_files for e in candidates)
@@ -0,0 +1,127 @@
+"""ScreenFrame — one captured screenshot with lazily shared preprocessing.
+
+Every template lookup needs the grayscale image (and pyramid mode needs
+downscaled levels, the FFT backend a centered float image and its
+spectrum).
+Wrapping a capture in a ScreenFrame computes each of these once, no
+matter how many templates are matched against it.
+"""
+
+from __future__ import annotations
+
+import time
+
+import cv2
+import numpy as np
+
+
+class ScreenFrame:
+    """A captured screenshot plus cached grayscale, pyramid and FFT inputs."""
+
+    __slots__ = (
+        "_centered",
+        "_gray",
+        "_levels",
+        "_spectrum",
+        "image",
+        "timestamp",
+    )
+
+    def __init__(self, image: np.ndarray, timestamp: float | None = None) -> None:
+        """Wrap a BGR (H, W, 3) or grayscale (H, W) uint8 array.
+
+        `timestamp` is the time.monotonic() at which the capture started
+        (defaults to now).
+        """
+        self.image = image
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self._gray: np.ndarray | None = image if image.ndim == 2 else None
+        self._levels: list[np.ndarray] = []
+        self._centered: dict[int, np.ndarray] = {}
+        self._spectrum: dict[int, np.ndarray] = {}
+
+    @classmethod
+    def capture(
+        cls,
+        region: tuple[int, int, int, int] | None = None,
+        gray: bool = False,
+        purpose: str = "match",
+    ) -> ScreenFrame:
+        """Capture the selected monitor (or an x0, y0, x1, y1 region) into a frame.
+
+        `gray` skips the BGR copy when only matching is needed. Coordinates
+        in a region frame are relative to (x0, y0). `purpose` is passed on
+        to take_screenshot_bgr / take_screenshot_gray.
+        """
+        from .screenshot import take_screenshot_bgr, take_screenshot_gray
+
+        grab = take_screenshot_gray if gray else take_screenshot_bgr
+        t0 = time.monotonic()
+        return cls(grab(region, purpose), t0)
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Grayscale image (converted once)."""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def pyramid(self, level: int) -> np.ndarray:
+        """Grayscale image halved `level` times (level 0 = full resolution)."""
+        if not self._levels:
+            self._levels.append(self.gray)
+        while len(self._levels) <= level:
+            self._levels.append(cv2.pyrDown(self._levels[-1]))
+        return self._levels[level]
+
+    def crop(self, x0: int, y0: int, x1: int, y1: int) -> ScreenFrame:
+        """Grayscale sub-frame of a rectangle (a view, no copy).
+
+        Coordinates inside the returned frame are relative to (x0, y0).
+        """
+        return ScreenFrame(self.gray[y0:y1, x0:x1], self.timestamp)
+
+    def centered(self, level: int = 0) -> np.ndarray:
+        """Float32 pyramid level with its mean removed.
+
+        Correlation with a zero-mean template ignores the mean, and
+        removing it keeps float32 sums over large windows precise.
+        """
+        if level not in self._centered:
+            gray = self.pyramid(level)
+            h, w = gray.shape
+            # Allocated at the optimal DFT size, so spectrum() needs no copy
+            padded = np.zeros(
+                (cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w)), np.float32
+            )
+            padded[:h, :w] = gray
+            padded[:h, :w] -= float(gray.mean())
+            self._centered[level] = padded
+        gray = self.pyramid(level)
+        return self._centered[level][: gray.shape[0], : gray.shape[1]]
+
+    def spectrum(self, level: int = 0) -> np.ndarray:
+        """Real DFT (CCS packed, float32) of centered(level).
+
+        Zero-padded to an optimal DFT size; shared by every template
+        matched on this frame with the FFT backend.
+        """
+        if level not in self._spectrum:
+            self.centered(level)
+            self._spectrum[level] = cv2.dft(self._centered[level])
+        return self._spectrum[level]
+
+
+def as_frame(screenshot: ScreenFrame | np.ndarray) -> ScreenFrame:
+    """Return `screenshot` as a ScreenFrame (wrapping plain arrays)."""
+    if isinstance(screenshot, ScreenFrame):
+        return screenshot
+    return ScreenFrame(screenshot)
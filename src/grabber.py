@@ -0,0 +1,178 @@
+"""Background frame grabber — captures continuously into a small ring buffer.
+
+Retry loops used to capture synchronously, match, then sleep, so every
+attempt paid the full capture latency (~1s on the Wayland portal path).
+With the grabber running, a capture thread keeps the last RING_SIZE
+frames and latest_frame(newer_than=t) hands out the newest one captured
+after `t`: matching on one frame overlaps the capture of the next.
+
+The grabber is optional. When it is not running, latest_frame() simply
+captures synchronously, so callers don't need to care.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+import numpy as np
+
+from .frame import ScreenFrame
+
+DEFAULT_RATE_HZ = 4.0
+RING_SIZE = 3
+WAIT_TIMEOUT = 5.0  # seconds to wait for a fresh frame before capturing directly
+
+
+class FrameGrabber:
+    """Capture thread filling a ring buffer of timestamped gray frames."""
+
+    def __init__(
+        self,
+        rate_hz: float = DEFAULT_RATE_HZ,
+        size: int = RING_SIZE,
+        capture: Callable[[], np.ndarray] | None = None,
+    ) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+        self.interval = 1.0 / rate_hz
+        self.size = size
+        self._capture = capture
+        self._frames: deque[ScreenFrame] = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.captured = 0
+        self.errors = 0
+        self.last_error: Exception | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="frame-grabber", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._cond:
+            self._frames.clear()
+            self._cond.notify_all()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stop.is_set()
+
+    def _run(self) -> None:
+        from mss.exception import ScreenShotError
+
+        from .screenshot import BufferPool, capture_session, close_session
+
+        capture = self._capture
+        if capture is None:
+            from .screenshot import SAMPLE, take_screenshot_gray
+
+            def capture() -> np.ndarray:
+                return take_screenshot_gray(purpose=SAMPLE)
+
+            # Frames in the ring (plus one per consumer) stay referenced
+            capture_session().pool = BufferPool(self.size + 2)
+        try:
+            while not self._stop.is_set():
+                t0 = time.monotonic()
+                try:
+                    frame = ScreenFrame(capture(), timestamp=t0)
+                except (OSError, ScreenShotError) as exc:
+                    self.errors += 1
+                    self.last_error = exc
+                else:
+                    with self._cond:
+                        self._frames.append(frame)
+                        self.captured += 1
+                        self._cond.notify_all()
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - t0)))
+        except BaseException as exc:
+            self.last_error = exc  # unexpected: the thread dies, report it
+            self._stop.set()
+            raise
+        finally:
+            close_session()
+            with self._cond:
+                self._cond.notify_all()  # waiters fall back to direct capture
+
+    def latest(
+        self, newer_than: float | None = None, timeout: float = WAIT_TIMEOUT
+    ) -> ScreenFrame | None:
+        """Newest frame whose capture started after `newer_than`, or None on timeout."""
+
+        def fresh() -> bool:
+            return bool(self._frames) and (
+                newer_than is None or self._frames[-1].timestamp > newer_than
+            )
+
+        with self._cond:
+            if (
+                self._cond.wait_for(lambda: fresh() or not self.running, timeout)
+                and fresh()
+            ):
+                return self._frames[-1]
+        return None
+
+
+_grabber: FrameGrabber | None = None
+_lock = threading.Lock()
+
+
+def start_grabber(rate_hz: float = DEFAULT_RATE_HZ) -> FrameGrabber:
+    """Start (or restart at a new rate) the shared background grabber."""
+    global _grabber
+    with _lock:
+        if _grabber is not None:
+            _grabber.stop()
+        _grabber = FrameGrabber(rate_hz)
+        _grabber.start()
+        return _grabber
+
+
+def stop_grabber() -> None:
+    """Stop the shared grabber; latest_frame() captures directly again."""
+    global _grabber
+    with _lock:
+        if _grabber is not None:
+            _grabber.stop()
+            _grabber = None
+
+
+def grabbing() -> bool:
+    """True while the shared background grabber is running."""
+    return _grabber is not None and _grabber.running
+
+
+def latest_frame(
+    newer_than: float | None = None,
+    timeout: float = WAIT_TIMEOUT,
+    purpose: str = "match",
+) -> ScreenFrame:
+    """Newest frame captured after `newer_than` (time.monotonic() seconds).
+
+    Waits for the grabber if its newest frame is older; without a running
+    grabber (or if it fails to deliver in `timeout`) captures directly.
+    Grabber frames handed out for matching go to a running recording.
+    """
+    grabber = _grabber
+    if grabber is not None:
+        frame = grabber.latest(newer_than, timeout)
+        if frame is not None:
+            if purpose == "match":
+                from .recording import note_frame
+
+                note_frame(frame)
+            return frame
+    return ScreenFrame.capture(gray=True, purpose=purpose)
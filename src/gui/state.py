@@ -23,6 +23,7 @@ class AppConfig:
     dl_icon_threshold: float = 0.7
     modal_row_threshold: float = 0.7
     video_dl_threshold: float = 0.7
+    capture_rate_hz: float = 0.0  # background frame grabber, 0 = off
 
     def save(self) -> None:
         DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -48,6 +49,7 @@ class AppState:
     duplicates: int = 0
     failures: int = 0
     running: bool = False
+    calibrate_thresholds: bool = False  # this run only, never saved
 
 
 _state: AppState | None = None
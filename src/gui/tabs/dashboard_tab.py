@@ -9,6 +9,7 @@ from pathlib import Path
 
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import (
+    QCheckBox,
     QGroupBox,
     QHBoxLayout,
     QLabel,
@@ -109,6 +110,14 @@ class DashboardTab(QWidget):
         btn_row.addStretch()
         cl.addLayout(btn_row)
 
+        self._calibrate = QCheckBox("Schwellen pro Template in diesem Lauf kalibrieren")
+        self._calibrate.setToolTip(
+            "Sammelt Treffer- und Hintergrund-Konfidenzen und schreibt "
+            'data/thresholds.json (Werte unter "override" bleiben erhalten). '
+            "Gilt nur für den nächsten gestarteten Lauf."
+        )
+        cl.addWidget(self._calibrate)
+
         # Progress bar
         self._progress = QProgressBar()
         self._progress.setRange(0, 100)
@@ -185,7 +194,19 @@ class DashboardTab(QWidget):
         # Templates
         found = sum(1 for t in REQUIRED_TEMPLATES if (TEMPLATES_DIR / t).exists())
         total = len(REQUIRED_TEMPLATES)
-        self._set_check("templates", found == total, f"Templates: {found}/{total}")
+        try:
+            from ...template_match import warm_up
+
+            loaded, secs, problems = warm_up()
+        except (ImportError, OSError, ValueError) as e:
+            loaded, secs, problems = 0, 0.0, {"Bundle": str(e)}
+        text = f"Templates: {found}/{total}, {loaded} geladen in {secs * 1000:.0f} ms"
+        if problems:
+            text += " — ungültig: " + ", ".join(
+                f"{name} ({msg})" for name, msg in sorted(problems.items())
+            )
+            self._append_log(f"[WARN] Template-Probleme: {problems}")
+        self._set_check("templates", found == total and not problems, text)
 
         # Chrome (check CDP port)
         try:
@@ -199,6 +220,12 @@ class DashboardTab(QWidget):
         except Exception:
             self._set_check("chrome", False, "Chrome: nicht gestartet")
 
+    def _take_calibrate(self) -> bool:
+        """Calibration request for the run being started (then reset)."""
+        checked = self._calibrate.isChecked()
+        self._calibrate.setChecked(False)
+        return checked
+
     def _set_check(self, key: str, ok: bool, text: str) -> None:
         icon = "✓" if ok else "✗"
         color = COLORS["success"] if ok else COLORS["error"]
@@ -264,6 +291,7 @@ class DashboardTab(QWidget):
         state.duplicates = 0
         state.failures = 0
         state.running = True
+        state.calibrate_thresholds = self._take_calibrate()
 
         self._update_stats()
         self._log.clear()
@@ -314,6 +342,7 @@ class DashboardTab(QWidget):
         state.duplicates = 0
         state.failures = 0
         state.running = True
+        state.calibrate_thresholds = self._take_calibrate()
 
         self._update_stats()
         self._log.clear()
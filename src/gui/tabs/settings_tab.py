@@ -104,6 +104,12 @@ class SettingsTab(QWidget):
         self._video_wait = QSpinBox()
         self._video_wait.setRange(10, 300)
         row.addWidget(self._video_wait)
+        row.addWidget(QLabel("Hintergrund-Capture (Hz, 0 = aus):"))
+        self._capture_rate = QDoubleSpinBox()
+        self._capture_rate.setRange(0.0, 20.0)
+        self._capture_rate.setSingleStep(0.5)
+        self._capture_rate.setDecimals(1)
+        row.addWidget(self._capture_rate)
         row.addStretch()
         tl.addLayout(row)
 
@@ -189,6 +195,7 @@ class SettingsTab(QWidget):
         self._click_delay.setValue(cfg.click_delay)
         self._between_delay.setValue(cfg.between_songs_delay)
         self._video_wait.setValue(cfg.video_wait_max)
+        self._capture_rate.setValue(cfg.capture_rate_hz)
         self._dl_thresh.setValue(cfg.dl_icon_threshold)
         self._modal_thresh.setValue(cfg.modal_row_threshold)
         self._video_thresh.setValue(cfg.video_dl_threshold)
@@ -203,6 +210,7 @@ class SettingsTab(QWidget):
         cfg.click_delay = self._click_delay.value()
         cfg.between_songs_delay = self._between_delay.value()
         cfg.video_wait_max = self._video_wait.value()
+        cfg.capture_rate_hz = self._capture_rate.value()
         cfg.dl_icon_threshold = self._dl_thresh.value()
         cfg.modal_row_threshold = self._modal_thresh.value()
         cfg.video_dl_threshold = self._video_thresh.value()
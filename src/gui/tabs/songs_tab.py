@@ -17,13 +17,11 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from ...manifest import get_manifest
 from ..styles import COLORS
 
 TUNEE_DIR = Path.home() / "Downloads" / "tunee"
 
-# Song file extensions
-_SONG_EXTS = {".mp3", ".wav", ".flac", ".lrc", ".mp4"}
-
 
 class SongsTab(QWidget):
     def __init__(self, parent=None):
@@ -71,34 +69,20 @@ class SongsTab(QWidget):
         layout.addWidget(self._table)
 
     def refresh(self) -> None:
-        """Scan the tunee output directory and populate the table."""
+        """Reconcile the project manifest with disk and populate the table."""
         self._table.setRowCount(0)
 
         if not TUNEE_DIR.exists():
             self._count_label.setText("0 Songs")
             return
 
-        folders = sorted(
-            [d for d in TUNEE_DIR.iterdir() if d.is_dir()],
-            key=lambda d: d.name,
-        )
+        manifest = get_manifest(str(TUNEE_DIR))
+        manifest.reconcile()
+        folders = manifest.folders()
 
-        # Count complete vs missing
-        complete = 0
-        missing = 0
-        certs = 0
-        for folder in folders:
-            all_files = list(folder.iterdir())
-            has_files = any(
-                f.suffix.lower() in _SONG_EXTS for f in all_files if f.is_file()
-            )
-            has_cert = any(f.suffix.lower() == ".pdf" for f in all_files if f.is_file())
-            if has_files:
-                complete += 1
-            else:
-                missing += 1
-            if has_cert:
-                certs += 1
+        complete = sum(f.complete for f in folders)
+        missing = len(folders) - complete
+        certs = sum(f.has_pdf for f in folders)
 
         parts = [f"{complete} Songs"]
         if missing > 0:
@@ -110,30 +94,21 @@ class SongsTab(QWidget):
         missing_brush = QBrush(QColor(COLORS["error"]))
 
         for row, folder in enumerate(folders):
-            name = folder.name
-            # Parse: "NN - SongName - MMmSSs"
-            parts = name.split(" - ", 2)
-            num = parts[0] if len(parts) >= 1 else ""
-            song_name = parts[1] if len(parts) >= 2 else name
-            duration = parts[2] if len(parts) >= 3 else ""
+            num = f"{folder.num:02d}" if folder.num is not None else ""
 
             # Format duration for display: "04m10s" → "04:10"
-            display_dur = duration
-            if duration and "m" in duration and "s" in duration:
+            display_dur = folder.duration
+            if display_dur and "m" in display_dur and "s" in display_dur:
                 try:
-                    m, s = duration.replace("s", "").split("m")
+                    m, s = display_dur.replace("s", "").split("m")
                     display_dur = f"{int(m):02d}:{int(s):02d}"
                 except Exception:
                     pass
 
-            # Count files and total size
-            files = [f for f in folder.iterdir() if f.is_file()]
-            song_files = [f for f in files if f.suffix.lower() in _SONG_EXTS]
-            has_cert = any(f.suffix.lower() == ".pdf" for f in files)
-            file_count = len(song_files)
-            total_mb = sum(f.stat().st_size for f in files) / (1024 * 1024)
-
-            is_missing = file_count == 0
+            file_count = len(folder.song_files)
+            total_mb = folder.total_size / (1024 * 1024)
+            has_cert = folder.has_pdf
+            is_missing = not folder.complete
 
             cert_item = self._centered_item("✓" if has_cert else "✗")
             if has_cert:
@@ -143,7 +118,7 @@ class SongsTab(QWidget):
 
             items = [
                 self._centered_item(num),
-                QTableWidgetItem("  " + song_name if is_missing else song_name),
+                QTableWidgetItem("  " + folder.name if is_missing else folder.name),
                 self._centered_item(display_dur),
                 self._centered_item("fehlend" if is_missing else str(file_count)),
                 self._centered_item("—" if is_missing else f"{total_mb:.0f}"),
@@ -0,0 +1,122 @@
+"""Telemetry tab — match confidence per template (histograms, near-misses)."""
+
+from __future__ import annotations
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QBrush, QColor, QFont
+from PySide6.QtWidgets import (
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ...match_telemetry import (
+    HIST_BINS,
+    NEAR_MISS_DIR,
+    get_telemetry,
+    sparkline,
+)
+from ..styles import COLORS
+
+REFRESH_MS = 2000
+
+
+class TelemetryTab(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._build_ui()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(REFRESH_MS)
+        self.refresh()
+
+    def _build_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        layout.setSpacing(12)
+
+        header = QHBoxLayout()
+        self._refresh_btn = QPushButton("Aktualisieren")
+        self._refresh_btn.setProperty("class", "secondary")
+        self._refresh_btn.clicked.connect(self.refresh)
+        header.addWidget(self._refresh_btn)
+        header.addStretch()
+        self._info_label = QLabel("")
+        self._info_label.setStyleSheet(f"color: {COLORS['text_muted']};")
+        header.addWidget(self._info_label)
+        layout.addLayout(header)
+
+        self._table = QTableWidget()
+        self._table.setColumnCount(8)
+        self._table.setHorizontalHeaderLabels(
+            [
+                "Template",
+                "Treffer",
+                "Median",
+                "Bester Fehlschlag",
+                "Knapp",
+                "ms",
+                "MP",
+                f"Konfidenz 0 → 1 ({HIST_BINS} Stufen)",
+            ]
+        )
+        self._table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self._table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self._table.setAlternatingRowColors(True)
+        self._table.verticalHeader().setVisible(False)
+
+        hdr = self._table.horizontalHeader()
+        hdr.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for col in range(1, 8):
+            hdr.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+
+        layout.addWidget(self._table)
+
+    def refresh(self) -> None:
+        """Reload the per-template telemetry of the current session."""
+        if not self.isVisible() and self._table.rowCount():
+            return
+        telemetry = sorted(get_telemetry().items())
+        self._table.setRowCount(len(telemetry))
+        near_total = 0
+        mono = QFont("monospace")
+        warn = QBrush(QColor(COLORS["warning"]))
+
+        for row, (name, st) in enumerate(telemetry):
+            s = st.summary()
+            near_total += s["near_misses"]
+            median = s["median_conf"]
+            best_miss = s["best_miss"]
+            hist = QTableWidgetItem(sparkline(s["histogram"]))
+            hist.setFont(mono)
+            items = [
+                QTableWidgetItem(name),
+                self._centered_item(f"{s['found']}/{s['lookups']}"),
+                self._centered_item(f"{median:.2f}" if median is not None else "-"),
+                self._centered_item(
+                    f"{best_miss:.2f}" if best_miss is not None else "-"
+                ),
+                self._centered_item(str(s["near_misses"])),
+                self._centered_item(f"{s['avg_ms']:.0f}"),
+                self._centered_item(f"{s['avg_area'] / 1e6:.2f}"),
+                hist,
+            ]
+            if s["near_misses"]:
+                items[4].setForeground(warn)
+            for col, item in enumerate(items):
+                self._table.setItem(row, col, item)
+
+        self._info_label.setText(
+            f"{len(telemetry)} Templates, {near_total} knappe Fehlschläge "
+            f"(Ausschnitte in {NEAR_MISS_DIR})"
+        )
+
+    @staticmethod
+    def _centered_item(text: str) -> QTableWidgetItem:
+        item = QTableWidgetItem(text)
+        item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        return item
@@ -15,6 +15,7 @@ from .styles import COLORS, STYLESHEET
 from .tabs.dashboard_tab import DashboardTab
 from .tabs.settings_tab import SettingsTab
 from .tabs.songs_tab import SongsTab
+from .tabs.telemetry_tab import TelemetryTab
 
 
 class _Header(QWidget):
@@ -71,12 +72,14 @@ class MainWindow(QMainWindow):
         self._dashboard_tab = DashboardTab()
         self._songs_tab = SongsTab()
         self._settings_tab = SettingsTab()
+        self._telemetry_tab = TelemetryTab()
 
         # Wire cross-tab references
         self._dashboard_tab._songs_tab = self._songs_tab
 
         tabs.addTab(self._dashboard_tab, "Dashboard")
         tabs.addTab(self._songs_tab, "Songs")
+        tabs.addTab(self._telemetry_tab, "Erkennung")
         tabs.addTab(self._settings_tab, "Einstellungen")
 
         # Wrap in padded container
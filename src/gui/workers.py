@@ -10,7 +10,8 @@ from ..events import SignalEvents
 from ..orchestrator import run_task, prepare_project
 from ..cert_orchestrator import run_cert_task
 from ..scraper import get_song_list
-from ..screenshot import set_monitor
+from ..grabber import start_grabber, stop_grabber
+from ..screenshot import close_session, set_monitor
 from .state import get_state
 
 
@@ -83,10 +84,13 @@ class DownloadWorker(BaseWorker):
             )
 
             set_monitor(cfg.monitor_index)
+            if cfg.capture_rate_hz > 0:
+                start_grabber(cfg.capture_rate_hz)
             success = run_task(
                 max_songs=cfg.max_songs,
                 max_scrolls=cfg.max_scrolls,
                 events=self._events,
+                calibrate_thresholds=state.calibrate_thresholds,
             )
             if self._events.should_stop():
                 self.finished_work.emit(False, "Vom Benutzer gestoppt")
@@ -100,6 +104,8 @@ class DownloadWorker(BaseWorker):
             self.finished_work.emit(False, str(exc))
         finally:
             self._events = None
+            stop_grabber()
+            close_session()
 
 
 class CertWorker(BaseWorker):
@@ -127,10 +133,13 @@ class CertWorker(BaseWorker):
 
         try:
             set_monitor(cfg.monitor_index)
+            if cfg.capture_rate_hz > 0:
+                start_grabber(cfg.capture_rate_hz)
             success = run_cert_task(
                 max_songs=cfg.max_songs,
                 max_scrolls=cfg.max_scrolls,
                 events=self._events,
+                calibrate_thresholds=state.calibrate_thresholds,
             )
             if self._events.should_stop():
                 self.finished_work.emit(False, "Vom Benutzer gestoppt")
@@ -144,3 +153,5 @@ class CertWorker(BaseWorker):
             self.finished_work.emit(False, str(exc))
         finally:
             self._events = None
+            stop_grabber()
+            close_session()
@@ -0,0 +1,316 @@
+"""Project manifest — SQLite record of the song folders in ~/Downloads/tunee.
+
+Status queries (project status, folders needing certificates, the songs
+tab) used to walk the whole output tree and stat every file on every
+call. The manifest stores the scraped song list, each folder's files
+per format with size and mtime, the certificate status and timestamps
+in data/manifest.sqlite, keyed by output root so switching projects
+keeps each one's state. prepare_project, _move_to_subfolder and the
+certificate flow write it transactionally as they change folders. Every
+directory in the root counts, as in the old directory walk; names not
+of the form "NN - Name - MMmSSs" just carry less information.
+
+Manual changes (files deleted or copied by hand) are picked up by
+reconcile(): it lists the root, stats every folder and re-lists
+only folders whose directory mtime changed. Directory mtimes change when
+entries are added, removed or renamed, not when a file is rewritten in
+place; a full rescan() covers that.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .template_bundle import DATA_DIR
+
+MANIFEST_FILE = DATA_DIR / "manifest.sqlite"
+SCHEMA_VERSION = 2  # 1 held a single root per file
+
+FOLDER_RE = re.compile(r"(\d+) - (.*) - (\d+m\d+s)$")
+SONG_EXTENSIONS = {".mp3", ".wav", ".flac", ".lrc", ".mp4"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    root TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    num INTEGER,
+    name TEXT,             -- song name as scraped (sanitized if not scraped)
+    duration TEXT,         -- MMmSSs
+    dir_mtime_ns INTEGER,  -- folder mtime when its files were last listed
+    scraped_at REAL,
+    downloaded_at REAL,
+    cert_status TEXT NOT NULL DEFAULT 'missing',  -- 'missing' | 'ok'
+    cert_at REAL,
+    PRIMARY KEY (root, folder)
+);
+CREATE TABLE IF NOT EXISTS files (
+    root TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    format TEXT NOT NULL,  -- extension without the dot, e.g. 'mp3', 'pdf'
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (root, folder, name),
+    FOREIGN KEY (root, folder) REFERENCES folders(root, folder) ON DELETE CASCADE
+);
+"""
+
+
+@dataclass
+class FileInfo:
+    name: str
+    format: str
+    size: int
+    mtime_ns: int
+
+
+@dataclass
+class FolderStatus:
+    """One song folder as recorded in the manifest."""
+
+    folder: str
+    num: int | None
+    name: str
+    duration: str
+    cert_status: str
+    files: list[FileInfo] = field(default_factory=list)
+
+    @property
+    def song_files(self) -> list[FileInfo]:
+        return [f for f in self.files if "." + f.format in SONG_EXTENSIONS]
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.song_files)
+
+    @property
+    def has_pdf(self) -> bool:
+        return any(f.format == "pdf" for f in self.files)
+
+    @property
+    def total_size(self) -> int:
+        return sum(f.size for f in self.files)
+
+
+def _list_files(path: str) -> list[FileInfo]:
+    files = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+            ext = os.path.splitext(entry.name)[1].lower().lstrip(".")
+            files.append(FileInfo(entry.name, ext, st.st_size, st.st_mtime_ns))
+    return files
+
+
+class Manifest:
+    """The manifest of one output root, stored in an SQLite file.
+
+    The file is shared by all roots; every row carries its root.
+    """
+
+    def __init__(self, root: str, path: str | Path | None = None) -> None:
+        self.root = root
+        self.path = Path(path if path is not None else MANIFEST_FILE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()  # one writer per process
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != str(SCHEMA_VERSION):
+                # Older layout: start over (reconcile() rebuilds it from disk)
+                db.execute("DROP TABLE IF EXISTS files")
+                db.execute("DROP TABLE IF EXISTS folders")
+                db.execute("DELETE FROM meta")
+                db.execute(
+                    "INSERT INTO meta VALUES ('version', ?)", (str(SCHEMA_VERSION),)
+                )
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        """A connection inside one transaction (commit on success)."""
+        with self._lock, closing(sqlite3.connect(self.path, timeout=10)) as db:
+            db.execute("PRAGMA foreign_keys = ON")
+            with db:
+                yield db
+
+    # ── Writers ──────────────────────────────────────────────────────
+
+    def _store_folder(self, db: sqlite3.Connection, folder: str) -> bool:
+        """(Re-)list one folder into `db`; False if it is not a directory."""
+        path = os.path.join(self.root, folder)
+        if not os.path.isdir(path):
+            db.execute(
+                "DELETE FROM folders WHERE root = ? AND folder = ?", (self.root, folder)
+            )
+            return False
+        m = FOLDER_RE.match(folder)
+        if m:
+            num, name, duration = int(m.group(1)), m.group(2), m.group(3)
+        else:  # counted like any folder, numbered if it starts with digits
+            lead = re.match(r"\d+", folder)
+            num, name, duration = int(lead.group()) if lead else None, folder, ""
+        mtime = os.stat(path).st_mtime_ns
+        files = _list_files(path)
+        db.execute(
+            "INSERT INTO folders (root, folder, num, name, duration, dir_mtime_ns) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(root, folder) DO UPDATE SET "
+            "dir_mtime_ns = excluded.dir_mtime_ns",
+            (self.root, folder, num, name, duration, mtime),
+        )
+        db.execute(
+            "DELETE FROM files WHERE root = ? AND folder = ?", (self.root, folder)
+        )
+        db.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.root, folder, f.name, f.format, f.size, f.mtime_ns) for f in files],
+        )
+        has_pdf = any(f.format == "pdf" for f in files)
+        db.execute(
+            "UPDATE folders SET cert_status = ? WHERE root = ? AND folder = ?",
+            ("ok" if has_pdf else "missing", self.root, folder),
+        )
+        return True
+
+    def record_songs(self, songs: list[dict]) -> None:
+        """Record the scraped song list as prepared by prepare_project."""
+        now = time.time()
+        with self._transaction() as db:
+            for song in songs:
+                self._store_folder(db, song["folder"])
+                db.execute(
+                    "UPDATE folders SET num = ?, name = ?, duration = ?, "
+                    "scraped_at = ? WHERE root = ? AND folder = ?",
+                    (
+                        song["num"],
+                        song["name"],
+                        song["duration"],
+                        now,
+                        self.root,
+                        song["folder"],
+                    ),
+                )
+
+    def record_download(self, folder: str) -> None:
+        """Files were moved into `folder`."""
+        with self._transaction() as db:
+            if self._store_folder(db, folder):
+                db.execute(
+                    "UPDATE folders SET downloaded_at = ? WHERE root = ? AND folder = ?",
+                    (time.time(), self.root, folder),
+                )
+
+    def record_cert(self, folder: str) -> None:
+        """A certificate PDF was moved into `folder`."""
+        with self._transaction() as db:
+            if self._store_folder(db, folder):
+                db.execute(
+                    "UPDATE folders SET cert_at = ? WHERE root = ? AND folder = ?",
+                    (time.time(), self.root, folder),
+                )
+
+    def reconcile(self, full: bool = False) -> list[str]:
+        """Bring the manifest up to date with the disk; returns changed folders.
+
+        Only folders whose directory mtime differs from the recorded one
+        are listed again (all of them with `full`).
+        """
+        try:
+            with os.scandir(self.root) as it:
+                on_disk = {e.name: e.stat().st_mtime_ns for e in it if e.is_dir()}
+        except FileNotFoundError:
+            on_disk = {}
+
+        with self._transaction() as db:
+            known = dict(
+                db.execute(
+                    "SELECT folder, dir_mtime_ns FROM folders WHERE root = ?",
+                    (self.root,),
+                )
+            )
+            changed = [
+                f for f, mtime in on_disk.items() if full or known.get(f) != mtime
+            ]
+            gone = [f for f in known if f not in on_disk]
+            for folder in changed:
+                self._store_folder(db, folder)
+            db.executemany(
+                "DELETE FROM folders WHERE root = ? AND folder = ?",
+                [(self.root, f) for f in gone],
+            )
+        return sorted(changed + gone)
+
+    def rescan(self) -> list[str]:
+        """Re-list every folder (also catches files rewritten in place)."""
+        return self.reconcile(full=True)
+
+    # ── Queries ──────────────────────────────────────────────────────
+
+    def folders(self) -> list[FolderStatus]:
+        """All folders of the root with their files, sorted by folder name."""
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT folder, num, name, duration, cert_status FROM folders "
+                "WHERE root = ? ORDER BY folder",
+                (self.root,),
+            ).fetchall()
+            files = db.execute(
+                "SELECT folder, name, format, size, mtime_ns FROM files "
+                "WHERE root = ? ORDER BY name",
+                (self.root,),
+            ).fetchall()
+        result = {r[0]: FolderStatus(*r) for r in rows}
+        for folder, *info in files:
+            result[folder].files.append(FileInfo(*info))
+        return list(result.values())
+
+    def status(self) -> dict:
+        """{"total", "complete", "missing", "missing_nums"} like get_project_status."""
+        folders = self.folders()
+        missing_nums = [f.num for f in folders if not f.complete and f.num is not None]
+        complete = sum(f.complete for f in folders)
+        return {
+            "total": len(folders),
+            "complete": complete,
+            "missing": len(folders) - complete,
+            "missing_nums": missing_nums,
+        }
+
+    def needing_certs(self) -> dict[int, str]:
+        """{folder number: folder path} of folders with songs but no PDF."""
+        return {
+            f.num: os.path.join(self.root, f.folder)
+            for f in self.folders()
+            if f.complete and not f.has_pdf and f.num is not None
+        }
+
+
+_manifest: Manifest | None = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest(root: str) -> Manifest:
+    """Shared manifest for the output directory `root`.
+
+    Switching to another root keeps the state recorded for the old one.
+    """
+    global _manifest
+    with _manifest_lock:
+        if (
+            _manifest is None
+            or _manifest.root != root
+            or _manifest.path != Path(MANIFEST_FILE)
+        ):
+            _manifest = Manifest(root)
+        return _manifest
@@ -0,0 +1,271 @@
+"""Match telemetry — confidence, search time and area of every template lookup.
+
+Each find_template / find_all_templates call records one sample per
+template: the best score seen (also when it stayed below the threshold),
+the time spent and the number of pixels searched. The last WINDOW
+samples per template form a rolling confidence histogram. Lookups that
+missed by less than NEAR_MISS_MARGIN save the best-scoring crop, so a
+0.69 near-miss can be told apart from a real absence.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .frame import ScreenFrame
+from .template_bundle import DATA_DIR
+from .thresholds import collect
+
+HIST_BINS = 20  # 0.05 wide over [0, 1]; negative scores land in the first bin
+WINDOW = 500  # rolling samples kept per template
+NEAR_MISS_MARGIN = 0.1  # save crops scoring within this of the threshold
+NEAR_MISS_LIMIT = 20  # crops saved per template per session
+NEAR_MISS_DIR = DATA_DIR / "near_misses"
+TELEMETRY_DIR = DATA_DIR / "telemetry"  # per-run JSON dumps
+
+_SPARK = "▁▂▃▄▅▆▇█"
+
+
+@dataclass
+class Sample:
+    """One template lookup."""
+
+    conf: float | None  # best score seen, None if nothing was scored
+    threshold: float
+    found: bool
+    ms: float
+    area: int  # pixels searched (ROI + full frame on a prior miss)
+
+
+class TemplateTelemetry:
+    """Counters and rolling samples of one template."""
+
+    def __init__(self) -> None:
+        self.samples: deque[Sample] = deque(maxlen=WINDOW)
+        self.lookups = 0
+        self.found = 0
+        self.near_misses = 0
+
+    def copy(self) -> TemplateTelemetry:
+        c = TemplateTelemetry()
+        c.samples.extend(self.samples)
+        c.lookups, c.found, c.near_misses = self.lookups, self.found, self.near_misses
+        return c
+
+    def histogram(self) -> np.ndarray:
+        """Confidence counts over the rolling window (HIST_BINS bins)."""
+        confs = [s.conf for s in self.samples if s.conf is not None]
+        counts, _ = np.histogram(
+            np.clip(confs, 0.0, 1.0), bins=HIST_BINS, range=(0.0, 1.0)
+        )
+        return counts
+
+    def summary(self) -> dict:
+        """Aggregates over the rolling window."""
+        confs = [s.conf for s in self.samples if s.conf is not None]
+        misses = [s.conf for s in self.samples if not s.found and s.conf is not None]
+        n = max(1, len(self.samples))
+        return {
+            "lookups": self.lookups,
+            "found": self.found,
+            "near_misses": self.near_misses,
+            "median_conf": float(np.median(confs)) if confs else None,
+            "best_miss": max(misses) if misses else None,
+            "avg_ms": sum(s.ms for s in self.samples) / n,
+            "avg_area": sum(s.area for s in self.samples) / n,
+            "histogram": self.histogram().tolist(),
+        }
+
+
+_stats: dict[str, TemplateTelemetry] = {}
+_lock = threading.Lock()
+_near_miss_dir: Path | None = None  # off until a run enables it
+
+
+def reset_telemetry(near_miss_dir: Path | None = None) -> None:
+    """Start a new session; near-miss crops are saved to `near_miss_dir`.
+
+    The orchestrators pass NEAR_MISS_DIR. Without a directory (tests,
+    benchmarks, the GUI's preflight) no crops are written.
+    """
+    global _near_miss_dir
+    with _lock:
+        _stats.clear()
+        _near_miss_dir = near_miss_dir
+
+
+def get_telemetry() -> dict[str, TemplateTelemetry]:
+    """Snapshot of the per-template telemetry of the current session."""
+    with _lock:
+        return {name: st.copy() for name, st in _stats.items()}
+
+
+def record(
+    name: str,
+    conf: float | None,
+    threshold: float,
+    found: bool,
+    seconds: float,
+    area: int,
+    crop: np.ndarray | None = None,
+) -> Path | None:
+    """Record one lookup. Saves `crop` if it is a near-miss; returns its path."""
+    near = (
+        not found
+        and conf is not None
+        and conf >= threshold - NEAR_MISS_MARGIN
+        and crop is not None
+    )
+    with _lock:
+        st = _stats.setdefault(name, TemplateTelemetry())
+        st.samples.append(Sample(conf, threshold, found, seconds * 1000, area))
+        st.lookups += 1
+        st.found += found
+        if near:
+            st.near_misses += 1
+        save_dir = _near_miss_dir
+        save = near and save_dir is not None and st.near_misses <= NEAR_MISS_LIMIT
+
+    if not save:
+        return None
+    stamp = time.strftime("%H%M%S") + f"{time.time() % 1:.3f}"[1:]
+    path = save_dir / f"{Path(name).stem}_{conf:.3f}_{stamp}.png"
+    try:
+        save_dir.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(path), crop)
+    except OSError:
+        return None
+    return path
+
+
+class Probe:
+    """Collects the best score of one lookup across every area it searched."""
+
+    __slots__ = (
+        "_box",
+        "_frame",
+        "area",
+        "background",
+        "conf",
+        "hits",
+        "miss_background",
+        "name",
+        "t0",
+        "threshold",
+    )
+
+    def __init__(self, name: str, threshold: float) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.t0 = time.perf_counter()
+        self.area = 0
+        self.conf: float | None = None
+        self.hits: list[float] = []  # accepted scores (threshold calibration)
+        self.background: float | None = None  # best score outside the hits
+        self.miss_background: float | None = None  # best score of areas w/o hits
+        self._frame: ScreenFrame | None = None
+        self._box = (0, 0, 0, 0)
+
+    def searched(self, frame: ScreenFrame) -> None:
+        """Count a searched frame (or ROI crop) toward the lookup's area."""
+        self.area += frame.width * frame.height
+
+    def observe(
+        self, frame: ScreenFrame, x: int, y: int, w: int, h: int, conf: float
+    ) -> None:
+        """Offer a scored position (top-left x, y of a w x h template)."""
+        if self.conf is None or conf > self.conf:
+            self.conf = conf
+            self._frame = frame
+            self._box = (x, y, w, h)
+
+    def calibration(self, hits: list[float], background: float | None) -> None:
+        """Offer threshold-calibration samples from one searched area.
+
+        Areas with hits and areas without are kept apart: when the lookup
+        succeeds, only the score outside its accepted hits is background.
+        """
+        self.hits.extend(hits)
+        if background is None:
+            return
+        if hits:
+            if self.background is None or background > self.background:
+                self.background = background
+        elif self.miss_background is None or background > self.miss_background:
+            self.miss_background = background
+
+    def _crop(self) -> np.ndarray | None:
+        """Best-scoring area with half a template of context on each side."""
+        if self._frame is None:
+            return None
+        x, y, w, h = self._box
+        img = self._frame.image
+        x0, y0 = max(0, x - w // 2), max(0, y - h // 2)
+        return img[y0 : y + h + h // 2, x0 : x + w + w // 2].copy()
+
+    def finish(self, found: bool) -> None:
+        """Record the lookup (and its calibration samples, if collecting)."""
+        collect(
+            self.name, self.hits, self.background if found else self.miss_background
+        )
+        near = (
+            not found
+            and self.conf is not None
+            and self.conf >= self.threshold - NEAR_MISS_MARGIN
+        )
+        record(
+            self.name,
+            self.conf,
+            self.threshold,
+            found,
+            time.perf_counter() - self.t0,
+            self.area,
+            self._crop() if near else None,
+        )
+
+
+def sparkline(counts: np.ndarray | list[int]) -> str:
+    """Histogram as a one-line block-character chart."""
+    peak = max(counts) if len(counts) else 0
+    if not peak:
+        return " " * len(counts)
+    return "".join(
+        _SPARK[-(-c * len(_SPARK) // peak) - 1] if c else " " for c in counts
+    )
+
+
+def summary_lines() -> list[str]:
+    """Human-readable per-template summary (one line each)."""
+    lines = []
+    for name, st in sorted(get_telemetry().items()):
+        s = st.summary()
+        med = f"{s['median_conf']:.2f}" if s["median_conf"] is not None else "-"
+        miss = f"{s['best_miss']:.2f}" if s["best_miss"] is not None else "-"
+        lines.append(
+            f"{name}: {s['found']}/{s['lookups']} found, median {med}, "
+            f"best miss {miss}, {s['near_misses']} near, "
+            f"{s['avg_ms']:.0f}ms, {s['avg_area'] / 1e6:.2f}MP "
+            f"|{sparkline(s['histogram'])}|"
+        )
+    return lines
+
+
+def dump_json(path: Path) -> None:
+    """Write the session's telemetry (summaries + raw window) as JSON."""
+    data = {
+        name: {
+            **st.summary(),
+            "samples": [asdict(s) for s in st.samples],
+        }
+        for name, st in sorted(get_telemetry().items())
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
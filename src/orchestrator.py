@@ -12,11 +12,12 @@ import glob
 import os
 import re
 import shutil
-import subprocess
 import time
 
 import pyautogui
 
+from .audio_duration import audio_duration
+from .download_watcher import DownloadTracker, wait_for
 from .events import (
     OrchestratorEvents,
     PrintEvents,
@@ -26,8 +27,34 @@ from .events import (
     C_WARN,
     C_RESET,
 )
-from .screenshot import take_screenshot_bgr, get_monitor_offset, get_screen_size
-from .template_match import find_template, find_all_templates, find_button_in_row
+from .folder_index import FolderIndex
+from .frame import ScreenFrame
+from .grabber import latest_frame
+from .manifest import SONG_EXTENSIONS, get_manifest
+from .match_telemetry import (
+    NEAR_MISS_DIR,
+    TELEMETRY_DIR,
+    dump_json,
+    reset_telemetry,
+    summary_lines,
+)
+from .recording import note_click, note_frame
+from .screenshot import get_monitor_offset, get_screen_size
+from .settle import wait_until_settled
+from .template_match import (
+    MODAL_ROWS,
+    MODAL_TEMPLATE,
+    calibrate_scale,
+    find_all_templates,
+    find_button_in_row,
+    find_template,
+    get_prior_stats,
+    get_scale,
+    reset_priors,
+    resolve_modal,
+    warm_up,
+)
+from .thresholds import finish_calibration, start_calibration, threshold_for
 
 # Paths
 DL_DIR = os.path.expanduser("~/Downloads")
@@ -39,16 +66,15 @@ MODAL_ROW_THRESHOLD = 0.7
 VIDEO_DL_THRESHOLD = 0.7
 
 # Timing
-CLICK_DELAY = 1.5  # seconds after each click
+CLICK_DELAY = 1.5  # max seconds to wait for the screen to settle after a click
 VIDEO_WAIT_MAX = 90  # max seconds to wait for video download
 VIDEO_POLL_INTERVAL = 3  # seconds between download checks
-BETWEEN_SONGS_DELAY = 3  # seconds pause between songs
+VIDEO_STABLE_SAMPLE = 2  # seconds a video's size must not change (no-rename fallback)
+DOWNLOAD_START_TIMEOUT = 10  # max seconds a clicked download may take to show up
+BETWEEN_SONGS_DELAY = 3  # max seconds to wait for the page to settle between songs
 
 MAX_RETRIES = 5
 
-# File extensions we look for
-SONG_EXTENSIONS = {".mp3", ".wav", ".flac", ".lrc", ".mp4"}
-
 
 # ── Helpers ──────────────────────────────────────────────────────────
 
@@ -59,9 +85,54 @@ def _click_at(x: int, y: int, label: str, events: OrchestratorEvents) -> None:
     abs_x = x + off_x
     abs_y = y + off_y
     events.on_log(f"  {C_TMPL}{label} at ({x},{y}) → click ({abs_x},{abs_y}){C_RESET}")
+    note_click(x, y, label)
     pyautogui.click(abs_x, abs_y)
 
 
+def _calibrate_templates(events: OrchestratorEvents, threshold: float) -> None:
+    """Warm up the template bundle, then detect the browser zoom/DPI scale."""
+    loaded, secs, problems = warm_up()
+    events.on_log(f"  Templates: {loaded} loaded in {secs * 1000:.0f} ms")
+    for name, msg in problems.items():
+        events.on_log(f"  {C_WARN}Template {name}: {msg}{C_RESET}")
+    scale = calibrate_scale(ScreenFrame.capture(gray=True), threshold)
+    if scale is None:
+        events.on_log(
+            f"  {C_WARN}Template scale not detected — keeping {get_scale():.2f}{C_RESET}"
+        )
+    else:
+        events.on_log(f"  Template scale: {scale:.2f}")
+
+
+def _log_match_stats(events: OrchestratorEvents) -> None:
+    """Log per-template prior hit rates and confidence telemetry, save it as JSON."""
+    stats = get_prior_stats()
+    if stats:
+        events.on_log("  Template lookups (prior ROI hits / lookups, avg ROI vs full):")
+        for name, st in sorted(stats.items()):
+            lookups = st.hits + st.misses + st.cold
+            full = st.misses + st.cold
+            roi_ms = st.roi_time / max(1, st.hits + st.misses) * 1000
+            full_ms = st.full_time / max(1, full) * 1000
+            events.on_log(
+                f"    {name}: {st.hits}/{lookups} in ROI, "
+                f"{roi_ms:.0f}ms vs {full_ms:.0f}ms full"
+            )
+
+    lines = summary_lines()
+    if not lines:
+        return
+    events.on_log("  Match confidence (histogram 0 → 1 over the last lookups):")
+    for line in lines:
+        events.on_log(f"    {line}")
+    path = TELEMETRY_DIR / time.strftime("%Y%m%d_%H%M%S.json")
+    try:
+        dump_json(path)
+        events.on_log(f"  Telemetry saved to {path}")
+    except OSError as e:
+        events.on_log(f"  {C_WARN}Could not save telemetry: {e}{C_RESET}")
+
+
 def _get_dl_files() -> set[str]:
     """Get all song-related files currently in ~/Downloads/."""
     files = set()
@@ -72,27 +143,15 @@ def _get_dl_files() -> set[str]:
 
 
 def _get_duration(mp3_path: str) -> str:
-    """Get duration from an audio file via ffprobe. Returns e.g. '04m10s'."""
-    try:
-        out = subprocess.check_output(
-            [
-                "ffprobe",
-                "-v",
-                "quiet",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "csv=p=0",
-                mp3_path,
-            ],
-            text=True,
-            timeout=10,
-        ).strip()
-        secs = float(out)
-        m, s = divmod(int(secs), 60)
-        return f"{m:02d}m{s:02d}s"
-    except Exception:
+    """Get duration from an audio file's header (ffprobe as fallback).
+
+    Returns e.g. '04m10s'.
+    """
+    secs = audio_duration(mp3_path)
+    if secs is None:
         return "00m00s"
+    m, s = divmod(int(secs), 60)
+    return f"{m:02d}m{s:02d}s"
 
 
 def _sanitize(name: str) -> str:
@@ -108,16 +167,6 @@ def _duration_display_to_folder(display: str) -> str:
     return "00m00s"
 
 
-def _folder_has_files(folder_path: str) -> bool:
-    """Check if a folder contains any song files."""
-    if not os.path.isdir(folder_path):
-        return False
-    for f in os.listdir(folder_path):
-        if os.path.splitext(f)[1].lower() in SONG_EXTENSIONS:
-            return True
-    return False
-
-
 # ── Project preparation ──────────────────────────────────────────────
 
 
@@ -142,7 +191,7 @@ def prepare_project(songs: list[dict]) -> list[dict]:
         folder_path = os.path.join(TUNEE_DIR, folder_name)
         os.makedirs(folder_path, exist_ok=True)
 
-        complete = _folder_has_files(folder_path)
+        complete = _folder_index().refresh(folder_name).has_files
         result.append(
             {
                 "num": i,
@@ -153,11 +202,12 @@ def prepare_project(songs: list[dict]) -> list[dict]:
             }
         )
 
+    get_manifest(TUNEE_DIR).record_songs(result)
     return result
 
 
 def get_project_status() -> dict:
-    """Get download status from existing folders.
+    """Get download status from the project manifest (reconciled with disk).
 
     Returns {"total": int, "complete": int, "missing": int,
              "missing_nums": list[int]}
@@ -165,34 +215,31 @@ def get_project_status() -> dict:
     if not os.path.isdir(TUNEE_DIR):
         return {"total": 0, "complete": 0, "missing": 0, "missing_nums": []}
 
-    folders = sorted(
-        d for d in os.listdir(TUNEE_DIR) if os.path.isdir(os.path.join(TUNEE_DIR, d))
-    )
-    total = len(folders)
-    complete = 0
-    missing_nums = []
-
-    for folder in folders:
-        path = os.path.join(TUNEE_DIR, folder)
-        if _folder_has_files(path):
-            complete += 1
-        else:
-            # Extract number from folder name
-            match = re.match(r"(\d+)", folder)
-            if match:
-                missing_nums.append(int(match.group(1)))
-
-    return {
-        "total": total,
-        "complete": complete,
-        "missing": total - complete,
-        "missing_nums": missing_nums,
-    }
+    manifest = get_manifest(TUNEE_DIR)
+    manifest.reconcile()
+    return manifest.status()
 
 
 # ── Duplicate check (folder-based) ──────────────────────────────────
 
 
+_index: FolderIndex | None = None
+
+
+def _folder_index() -> FolderIndex:
+    """Index of TUNEE_DIR, built on first use (and again if TUNEE_DIR changes)."""
+    global _index
+    if _index is None or _index.root != TUNEE_DIR:
+        _index = FolderIndex(TUNEE_DIR, SONG_EXTENSIONS)
+    return _index
+
+
+def reset_folder_index() -> None:
+    """Forget the folder index; the next lookup lists TUNEE_DIR again."""
+    global _index
+    _index = None
+
+
 def _find_matching_folder(song_name: str, duration: str) -> str | None:
     """Find the pre-created folder matching this song.
 
@@ -203,105 +250,17 @@ def _find_matching_folder(song_name: str, duration: str) -> str | None:
     prefers EMPTY folders (not yet downloaded) so that each version gets
     its own folder.
     """
-    if not os.path.isdir(TUNEE_DIR):
-        return None
-
-    sanitized = _sanitize(song_name)
-    exact_suffix = f" - {sanitized} - {duration}"
-
-    # Exact match — collect ALL matching folders, prefer empty ones
-    exact_matches = []
-    for entry in sorted(os.listdir(TUNEE_DIR)):
-        if entry.endswith(exact_suffix) and os.path.isdir(
-            os.path.join(TUNEE_DIR, entry)
-        ):
-            exact_matches.append(entry)
-
-    if exact_matches:
-        # Prefer an empty folder (not yet downloaded)
-        for m in exact_matches:
-            if not _folder_has_files(os.path.join(TUNEE_DIR, m)):
-                return m
-        # All have files — return first (numerically lowest)
-        return exact_matches[0]
-
-    # Fuzzy match: same name, duration ±2 seconds
-    name_part = f" - {sanitized} - "
-    dur_match = re.match(r"(\d+)m(\d+)s", duration)
-    if not dur_match:
-        return None
-    target_secs = int(dur_match.group(1)) * 60 + int(dur_match.group(2))
-
-    candidates = []
-    for entry in sorted(os.listdir(TUNEE_DIR)):
-        if name_part not in entry:
-            continue
-        if not os.path.isdir(os.path.join(TUNEE_DIR, entry)):
-            continue
-        m = re.search(r"(\d+)m(\d+)s$", entry)
-        if not m:
-            continue
-        folder_secs = int(m.group(1)) * 60 + int(m.group(2))
-        diff = abs(folder_secs - target_secs)
-        if diff <= 2:
-            candidates.append((diff, entry))
-
-    if not candidates:
-        return None
-
-    # Sort by duration-closeness, then prefer empty folders
-    candidates.sort(key=lambda c: c[0])
-    for _, entry in candidates:
-        if not _folder_has_files(os.path.join(TUNEE_DIR, entry)):
-            return entry
-    # All matching folders have files — return closest match
-    return candidates[0][1]
+    return _folder_index().find(_sanitize(song_name), duration)
 
 
 def _is_already_downloaded(song_name: str, duration: str) -> bool:
     """Check if all matching folders already have files.
 
     Returns False if there is at least one empty matching folder
-    (meaning this song version still needs to be downloaded).
+    (meaning this song version still needs to be downloaded), or if
+    no matching folder exists at all (a new song).
     """
-    if not os.path.isdir(TUNEE_DIR):
-        return False
-
-    sanitized = _sanitize(song_name)
-    exact_suffix = f" - {sanitized} - {duration}"
-
-    # Check all folders matching name + duration (exact)
-    for entry in os.listdir(TUNEE_DIR):
-        if entry.endswith(exact_suffix) and os.path.isdir(
-            os.path.join(TUNEE_DIR, entry)
-        ):
-            if not _folder_has_files(os.path.join(TUNEE_DIR, entry)):
-                return False  # Empty matching folder exists → not a duplicate
-
-    # Also check fuzzy matches (±2 seconds)
-    name_part = f" - {sanitized} - "
-    dur_match = re.match(r"(\d+)m(\d+)s", duration)
-    if dur_match:
-        target_secs = int(dur_match.group(1)) * 60 + int(dur_match.group(2))
-        for entry in os.listdir(TUNEE_DIR):
-            if name_part not in entry or not os.path.isdir(
-                os.path.join(TUNEE_DIR, entry)
-            ):
-                continue
-            m = re.search(r"(\d+)m(\d+)s$", entry)
-            if not m:
-                continue
-            folder_secs = int(m.group(1)) * 60 + int(m.group(2))
-            if abs(folder_secs - target_secs) <= 2:
-                if not _folder_has_files(os.path.join(TUNEE_DIR, entry)):
-                    return False  # Empty matching folder → not a duplicate
-
-    # No empty matching folder found — either all are full (true duplicate)
-    # or no matching folder exists at all (new song, not a duplicate)
-    folder = _find_matching_folder(song_name, duration)
-    if not folder:
-        return False
-    return True
+    return _folder_index().is_downloaded(_sanitize(song_name), duration)
 
 
 # ── Move files to folder ────────────────────────────────────────────
@@ -348,6 +307,8 @@ def _move_to_subfolder(
     for f in new_files:
         dst = os.path.join(folder_path, os.path.basename(f))
         shutil.move(f, dst)
+    _folder_index().refresh(folder_name)
+    get_manifest(TUNEE_DIR).record_download(folder_name)
 
     events.on_log(f"  {C_DONE}Moved {len(new_files)} files → {folder_name}/{C_RESET}")
     return folder_name, song_name, duration
@@ -356,113 +317,165 @@ def _move_to_subfolder(
 # ── Download helpers ─────────────────────────────────────────────────
 
 
+def _sizes_stable(paths: list[str], sample: float = 0.3) -> bool:
+    """True if none of `paths` changes size over `sample` s (one sleep for all)."""
+    try:
+        before = [os.path.getsize(p) for p in paths]
+        time.sleep(sample)
+        return before == [os.path.getsize(p) for p in paths] and all(before)
+    except OSError:
+        return False
+
+
 def _wait_for_video_download(
     before_mp4s: set[str],
     events: OrchestratorEvents,
+    tracker: DownloadTracker | None = None,
 ) -> bool:
     """Wait until a new .mp4 appears AND is fully downloaded.
 
-    Checks file size stability to ensure Chrome has finished writing
-    the file before returning.
+    With a tracker, the rename of Chrome's .crdownload file marks the
+    video complete. Otherwise (no inotify, or a browser writing under the
+    final name) the file size has to stay stable for two rounds.
     """
     events.on_log(f"  Waiting for video download (max {VIDEO_WAIT_MAX}s)...")
+    deadline = time.monotonic() + VIDEO_WAIT_MAX
 
-    mp4_path = None
-    stable_count = 0
+    def new_mp4() -> str | None:
+        return next(
+            iter(set(glob.glob(os.path.join(DL_DIR, "*.mp4"))) - before_mp4s), None
+        )
 
-    for i in range(VIDEO_WAIT_MAX // VIDEO_POLL_INTERVAL):
-        if events.should_stop():
-            return False
-        time.sleep(VIDEO_POLL_INTERVAL)
+    mp4_path = wait_for(
+        DL_DIR, new_mp4, VIDEO_WAIT_MAX, VIDEO_POLL_INTERVAL, events.should_stop
+    )
+    if mp4_path and not (tracker and tracker.is_complete(mp4_path)):
+        events.on_log(
+            f"  Video erschienen: {os.path.basename(mp4_path)}, warte auf vollständigen Download..."
+        )
+        stable_count = 0
+
+        def complete() -> bool:
+            nonlocal stable_count
+            if tracker and tracker.is_complete(mp4_path):
+                return True
+            stable = _sizes_stable([mp4_path], VIDEO_STABLE_SAMPLE)
+            stable_count = stable_count + 1 if stable else 0
+            return stable_count >= 2
+
+        remaining = deadline - time.monotonic()
+        if not wait_for(
+            DL_DIR, complete, remaining, VIDEO_POLL_INTERVAL, events.should_stop
+        ):
+            mp4_path = None
 
-        current = set(glob.glob(os.path.join(DL_DIR, "*.mp4")))
-        new_files = current - before_mp4s
+    if mp4_path:
+        size = os.path.getsize(mp4_path) if os.path.exists(mp4_path) else 0
+        events.on_log(
+            f"  {C_DONE}Video: {os.path.basename(mp4_path)} ({size // 1024}KB){C_RESET}"
+        )
+        return True
+    if not events.should_stop():
+        events.on_log(f"  {C_WARN}Video download timeout{C_RESET}")
+    return False
 
-        if new_files and not mp4_path:
-            mp4_path = next(iter(new_files))
-            events.on_log(
-                f"  Video erschienen: {os.path.basename(mp4_path)}, warte auf vollständigen Download..."
-            )
 
-        if mp4_path:
-            try:
-                size1 = os.path.getsize(mp4_path)
-                time.sleep(2)
-                size2 = os.path.getsize(mp4_path)
-                if size1 == size2 and size1 > 0:
-                    stable_count += 1
-                    if stable_count >= 2:
-                        events.on_log(
-                            f"  {C_DONE}Video: {os.path.basename(mp4_path)} ({size2 // 1024}KB){C_RESET}"
-                        )
-                        return True
-                else:
-                    stable_count = 0
-            except OSError:
+def _wait_for_downloads_complete(
+    events: OrchestratorEvents,
+    files_before: set[str],
+    tracker: DownloadTracker | None = None,
+    expected: int = 0,
+) -> None:
+    """Wait until every download started since `files_before` is complete.
+
+    With a tracker that is the moment the last temp file of this song is
+    renamed. Files without a temp name, or all new files when inotify is
+    unavailable, must additionally keep their size for two rounds. Until
+    `expected` new files (one per clicked format) exist, the wait also
+    goes on for up to DOWNLOAD_START_TIMEOUT s: a download whose temp file
+    has not appeared yet is not pending either.
+    """
+    stable_count = 0
+    start_deadline = time.monotonic() + DOWNLOAD_START_TIMEOUT
+
+    def settled() -> bool:
+        nonlocal stable_count
+        if (
+            len(_get_dl_files() - files_before) < expected
+            and time.monotonic() < start_deadline
+        ):
+            return False
+        if tracker is not None and tracker.tracking:
+            if tracker.in_progress:
+                return False
+            unsure = tracker.direct
+        else:
+            if glob.glob(os.path.join(DL_DIR, "*.crdownload")):
                 stable_count = 0
-                continue
+                return False
+            unsure = sorted(_get_dl_files() - files_before)
+        unsure = [p for p in unsure if os.path.exists(p)]
+        if not unsure:
+            return True
+        stable_count = stable_count + 1 if _sizes_stable(unsure) else 0
+        return stable_count >= 2
 
-        # Check for .crdownload (still downloading)
-        downloading = glob.glob(os.path.join(DL_DIR, "*.crdownload"))
-        if downloading:
-            continue
+    wait_for(DL_DIR, settled, 60, should_stop=events.should_stop)
 
-    events.on_log(f"  {C_WARN}Video download timeout{C_RESET}")
-    return False
 
+def _modal_thresholds() -> dict[str, float]:
+    """Per-template thresholds of the download modal and its row icons."""
+    names = [MODAL_TEMPLATE] + [tmpl for tmpl, _ in MODAL_ROWS.values()]
+    return {name: threshold_for(name, MODAL_ROW_THRESHOLD) for name in names}
 
-def _wait_for_downloads_complete(events: OrchestratorEvents) -> None:
-    """Wait until no .crdownload files remain AND all files have stable size."""
-    stable_count = 0
-    for _ in range(60):
-        if events.should_stop():
-            return
-        downloading = glob.glob(os.path.join(DL_DIR, "*.crdownload"))
-        if downloading:
-            stable_count = 0
-            time.sleep(1)
-            continue
 
-        # No .crdownload — verify all MP4s have stable size
-        mp4s = glob.glob(os.path.join(DL_DIR, "*.mp4"))
-        all_stable = True
-        for mp4 in mp4s:
-            try:
-                s1 = os.path.getsize(mp4)
-                time.sleep(0.3)
-                s2 = os.path.getsize(mp4)
-                if s1 != s2:
-                    all_stable = False
-                    break
-            except OSError:
-                all_stable = False
-                break
-
-        if all_stable:
-            stable_count += 1
-            if stable_count >= 2:
-                return
-        else:
-            stable_count = 0
-        time.sleep(1)
+def _resolve_modal(events: OrchestratorEvents) -> dict[str, tuple[int, int]]:
+    """Resolve all modal Download buttons from one capture (retries until MP3)."""
+    seen = time.monotonic()
+    for attempt in range(MAX_RETRIES):
+        if events.should_stop():
+            break
+        frame = latest_frame(newer_than=seen)
+        seen = frame.timestamp
+        points = resolve_modal(frame, _modal_thresholds(), prior=True)
+        if "mp3" in points:
+            return points
+        time.sleep(0.5)
+    return {}
 
 
 def _click_modal_row(
-    tmpl_name: str,
+    fmt: str,
     label: str,
     events: OrchestratorEvents,
+    points: dict[str, tuple[int, int]] | None = None,
 ) -> bool:
-    """Find a modal row icon and click its Download button. Returns True if clicked."""
+    """Click the Download button of a modal row. Returns True if clicked.
+
+    Uses the click point from `points` (see _resolve_modal) when known,
+    otherwise captures and searches for the row icon until found.
+    """
+    if points and fmt in points:
+        _click_at(points[fmt][0], points[fmt][1], label, events)
+        wait_until_settled(timeout=CLICK_DELAY)
+        return True
+
+    tmpl_name = MODAL_ROWS[fmt][0]
+    seen = time.monotonic()
     for attempt in range(MAX_RETRIES):
         if events.should_stop():
             return False
-        screenshot = take_screenshot_bgr()
+        frame = latest_frame(newer_than=seen)
+        seen = frame.timestamp
         pos = find_button_in_row(
-            screenshot, tmpl_name, row_threshold=MODAL_ROW_THRESHOLD
+            frame,
+            tmpl_name,
+            row_threshold=threshold_for(tmpl_name, MODAL_ROW_THRESHOLD),
+            prior=True,
         )
         if pos:
             _click_at(pos[0], pos[1], label, events)
-            time.sleep(CLICK_DELAY)
+            wait_until_settled(timeout=CLICK_DELAY)
             return True
         time.sleep(0.5)
     return False
@@ -474,36 +487,43 @@ def _click_template(
     events: OrchestratorEvents,
     threshold: float = 0.7,
 ) -> bool:
-    """Find and click a template. Returns True if clicked."""
+    """Find and click a template. Returns True if clicked.
+
+    A calibrated threshold for the template (thresholds.json) replaces
+    `threshold`.
+    """
+    threshold = threshold_for(tmpl_name, threshold)
+    seen = time.monotonic()
     for attempt in range(MAX_RETRIES):
         if events.should_stop():
             return False
-        screenshot = take_screenshot_bgr()
-        pos = find_template(screenshot, tmpl_name, threshold=threshold)
+        frame = latest_frame(newer_than=seen)
+        seen = frame.timestamp
+        pos = find_template(frame, tmpl_name, threshold=threshold, prior=True)
         if pos:
             _click_at(pos[0], pos[1], label, events)
-            time.sleep(CLICK_DELAY)
+            wait_until_settled(timeout=CLICK_DELAY)
             return True
         time.sleep(0.5)
     return False
 
 
 def _wait_for_new_mp3(
-    files_before: set[str], events: OrchestratorEvents, timeout: int = 30
+    files_before: set[str],
+    events: OrchestratorEvents,
+    timeout: int = 30,
+    tracker: DownloadTracker | None = None,
 ) -> str | None:
     """Wait for a new MP3 to appear in ~/Downloads. Returns path or None."""
-    for _ in range(timeout):
-        if events.should_stop():
-            return None
-        time.sleep(1)
-        current = _get_dl_files()
-        new_mp3s = [f for f in (current - files_before) if f.endswith(".mp3")]
-        if new_mp3s:
-            time.sleep(0.5)
-            return new_mp3s[0]
-        if glob.glob(os.path.join(DL_DIR, "*.crdownload")):
-            continue
-    return None
+
+    def new_mp3() -> str | None:
+        new_mp3s = [f for f in (_get_dl_files() - files_before) if f.endswith(".mp3")]
+        return new_mp3s[0] if new_mp3s else None
+
+    mp3_path = wait_for(DL_DIR, new_mp3, timeout, should_stop=events.should_stop)
+    if mp3_path and not (tracker and tracker.is_complete(mp3_path)):
+        time.sleep(0.5)  # no rename seen: give the browser time to finish writing
+    return mp3_path
 
 
 # ── Single song download ────────────────────────────────────────────
@@ -525,20 +545,22 @@ def _download_song(
       result: "ok", "duplicate", or "failed"
     """
     files_before = _get_dl_files()
+    tracker = DownloadTracker(DL_DIR)
 
     # Step 1: Click the download icon to open modal
     _click_at(icon_x, icon_y, f"Song #{song_num} download icon", events)
-    time.sleep(CLICK_DELAY)
+    wait_until_settled(timeout=CLICK_DELAY)
 
-    # Step 2: Click MP3 Download
-    if not _click_modal_row("modal_mp3.png", "MP3 Download", events):
+    # Step 2: Resolve all modal buttons from one capture, click MP3 Download
+    points = _resolve_modal(events)
+    if not points or not _click_modal_row("mp3", "MP3 Download", events, points):
         events.on_log(f"  {C_ERR}MP3 not found — modal didn't open?{C_RESET}")
         pyautogui.press("escape")
         return "failed", "Unknown", "00m00s"
     events.on_log(f"  {C_DONE}MP3 ✓{C_RESET}")
 
     # Step 3: Wait for MP3 and check if already downloaded
-    mp3_path = _wait_for_new_mp3(files_before, events)
+    mp3_path = _wait_for_new_mp3(files_before, events, tracker=tracker)
     if not mp3_path:
         events.on_log(f"  {C_ERR}MP3 download timeout{C_RESET}")
         pyautogui.press("escape")
@@ -553,56 +575,76 @@ def _download_song(
         )
         os.remove(mp3_path)
         pyautogui.press("escape")
-        time.sleep(1)
+        wait_until_settled(timeout=1)
         return "duplicate", song_name, duration
 
     events.on_log(
         f"  New song: {song_name} ({duration}) — downloading remaining formats"
     )
 
+    triggered = 1  # downloads clicked for this song: MP3 so far
+
     # Step 4: Click RAW Download
-    if not _click_modal_row("modal_raw.png", "RAW Download", events):
+    if not _click_modal_row("raw", "RAW Download", events, points):
         events.on_log(f"  {C_WARN}RAW not found — skipping{C_RESET}")
     else:
         events.on_log(f"  {C_DONE}RAW ✓{C_RESET}")
+        triggered += 1
 
     # Step 5: Click LRC Download
-    if not _click_modal_row("modal_lrc.png", "LRC Download", events):
+    if not _click_modal_row("lrc", "LRC Download", events, points):
         events.on_log(f"  {C_WARN}LRC not found — skipping{C_RESET}")
     else:
         events.on_log(f"  {C_DONE}LRC ✓{C_RESET}")
+        triggered += 1
 
     # Step 6: Click VIDEO Download (both modals close automatically)
     mp4s_before = set(glob.glob(os.path.join(DL_DIR, "*.mp4")))
 
-    if not _click_modal_row("modal_video.png", "VIDEO Download", events):
+    if not _click_modal_row("video", "VIDEO Download", events, points):
         events.on_log(f"  {C_WARN}VIDEO not found — skipping{C_RESET}")
         pyautogui.press("escape")
-        time.sleep(1)
-        _wait_for_downloads_complete(events)
+        wait_until_settled(timeout=1)
+        _wait_for_downloads_complete(events, files_before, tracker, triggered)
         new_files = _get_dl_files() - files_before
         _move_to_subfolder(new_files, song_num, events)
         return "ok", song_name, duration
 
     # Step 7: Click Download in Lyric Video modal (closes both modals automatically)
-    time.sleep(1)
+    wait_until_settled(timeout=1)
     if _click_template(
         "lyric_video_download.png", "Video DL Button", events, VIDEO_DL_THRESHOLD
     ):
         events.on_log(f"  {C_DONE}VIDEO DL ✓{C_RESET}")
-        _wait_for_video_download(mp4s_before, events)
+        triggered += 1
+        _wait_for_video_download(mp4s_before, events, tracker)
     else:
         events.on_log(f"  {C_WARN}Video DL button not found{C_RESET}")
         pyautogui.press("escape")
-        time.sleep(1)
+        wait_until_settled(timeout=1)
 
-    _wait_for_downloads_complete(events)
+    _wait_for_downloads_complete(events, files_before, tracker, triggered)
 
     new_files = _get_dl_files() - files_before
     _move_to_subfolder(new_files, song_num, events)
     return "ok", song_name, duration
 
 
+def _finish_threshold_calibration(events: OrchestratorEvents) -> None:
+    """Derive per-template thresholds from this run and log them."""
+    results = finish_calibration()
+    if not results:
+        events.on_log(f"  {C_WARN}Threshold calibration: not enough samples{C_RESET}")
+        return
+    events.on_log("  Threshold calibration (weakest hit / strongest look-alike):")
+    for name, cal in results.items():
+        events.on_log(
+            f"    {name}: {cal.threshold:.2f} "
+            f"({cal.hit_low:.2f} / {cal.background_high:.2f}, "
+            f"{cal.hits} hits, {cal.background} samples)"
+        )
+
+
 # ── Main download loop ───────────────────────────────────────────────
 
 
@@ -611,11 +653,14 @@ def run_task(
     max_scrolls: int = 15,
     start_num: int = 0,
     events: OrchestratorEvents | None = None,
+    calibrate_thresholds: bool = False,
 ) -> bool:
     """Download all songs by finding download icons top-to-bottom.
 
     Pre-created folders are used for duplicate detection: if a folder
     already has files, the song is skipped (only MP3 downloaded + checked).
+    With `calibrate_thresholds`, the match confidences of the run are used
+    to recalibrate the per-template thresholds (data/thresholds.json).
     """
     if events is None:
         events = PrintEvents()
@@ -625,6 +670,11 @@ def run_task(
     failures = 0
 
     os.makedirs(TUNEE_DIR, exist_ok=True)
+    reset_folder_index()
+    reset_priors()
+    reset_telemetry(NEAR_MISS_DIR)
+    if calibrate_thresholds:
+        start_calibration()
 
     status = get_project_status()
     events.on_log(f"\n{'=' * 60}")
@@ -637,6 +687,7 @@ def run_task(
         )
     events.on_log(f"{'=' * 60}\n")
     events.on_progress(song_count, max_songs)
+    _calibrate_templates(events, DL_ICON_THRESHOLD)
 
     empty_scrolls = 0
 
@@ -645,9 +696,12 @@ def run_task(
             events.on_log("Stopped by user.")
             break
 
-        screenshot = take_screenshot_bgr()
+        frame = latest_frame(newer_than=time.monotonic())
         icons = find_all_templates(
-            screenshot, "download_button.png", threshold=DL_ICON_THRESHOLD
+            frame,
+            "download_button.png",
+            threshold=threshold_for("download_button.png", DL_ICON_THRESHOLD),
+            prior=True,
         )
 
         if not icons:
@@ -657,7 +711,7 @@ def run_task(
             events.on_log("  Saving debug screenshot to /tmp/cgc_debug_no_icons.png")
             import cv2 as _cv2
 
-            _cv2.imwrite("/tmp/cgc_debug_no_icons.png", screenshot)
+            _cv2.imwrite("/tmp/cgc_debug_no_icons.png", frame.image)
             break
 
         icons.sort(key=lambda m: m[1])
@@ -670,8 +724,7 @@ def run_task(
             # visible from the previous round).  Use 15% of screen height
             # as cutoff — anything below is treated as new content.
             # Duplicate detection via folder check handles any re-encounters.
-            _, sh = get_screen_size()
-            min_y = int(sh * 0.15)
+            min_y = int(frame.height * 0.15)
 
         eligible = [(ix, iy, c) for ix, iy, c in icons if iy > min_y]
         if not eligible:
@@ -682,7 +735,7 @@ def run_task(
                 pyautogui.scroll(
                     -5, x=round(sw * 0.15) + off_x, y=round(sh * 0.5) + off_y
                 )
-                time.sleep(2)
+                wait_until_settled(timeout=2)
             continue
 
         songs_this_round = 0
@@ -694,6 +747,8 @@ def run_task(
 
             tentative_num = song_count + 1
             songs_this_round += 1
+            if songs_this_round > 1:
+                note_frame(frame)  # record the icon list again for this click
             events.on_song_start(tentative_num, ix, iy)
 
             result, song_name, duration = _download_song(ix, iy, tentative_num, events)
@@ -712,8 +767,10 @@ def run_task(
                 events.on_song_failed(tentative_num)
 
             if song_count < max_songs and not events.should_stop():
-                events.on_log(f"  Waiting {BETWEEN_SONGS_DELAY}s before next song...")
-                time.sleep(BETWEEN_SONGS_DELAY)
+                events.on_log(
+                    f"  Waiting for the page to settle (max {BETWEEN_SONGS_DELAY}s)..."
+                )
+                wait_until_settled(timeout=BETWEEN_SONGS_DELAY)
 
         if song_count >= max_songs:
             break
@@ -731,7 +788,7 @@ def run_task(
             off_x, off_y = get_monitor_offset()
             sw, sh = get_screen_size()
             pyautogui.scroll(-5, x=round(sw * 0.15) + off_x, y=round(sh * 0.5) + off_y)
-            time.sleep(2)
+            wait_until_settled(timeout=2)
 
     events.on_log(f"\n{'=' * 60}")
     events.on_log(f"  Done! Downloaded {song_count} new songs to {TUNEE_DIR}")
@@ -739,6 +796,9 @@ def run_task(
         events.on_log(f"  ({duplicates} already downloaded — skipped)")
     if failures:
         events.on_log(f"  ({failures} failures)")
+    _log_match_stats(events)
+    if calibrate_thresholds:
+        _finish_threshold_calibration(events)
     events.on_log(f"{'=' * 60}")
     events.on_progress(song_count, max_songs)
     return song_count > 0
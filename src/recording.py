@@ -0,0 +1,210 @@
+"""Session recording and replay — capture backends for offline runs.
+
+A Recorder wraps the live display: every frame the orchestrators match
+on is also written, PNG-compressed and timestamped, to a session file,
+together with the click that followed it (see note_click, called by
+_click_at). Grabber frames are recorded when latest_frame() hands them
+out for matching (note_frame). A Replayer serves a session's frames to
+take_screenshot_bgr / take_screenshot_gray in the recorded order, so a
+production run can be fed through the matching code again without a
+display, e.g. by benchmarks/bench_replay.py.
+
+Only MATCH captures are recorded and replayed. SAMPLE captures (settle
+detection, the grabber thread) depend on timing; a Recorder passes them
+straight to the display and a Replayer answers them with the frame it
+served last, so they never shift the frame sequence.
+
+A session file is a zip archive: frames/NNNNNN.png plus session.json
+with the monitor geometry and one entry per frame. It is complete only
+after Recorder.close().
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .frame import ScreenFrame
+from .screenshot import (
+    MATCH,
+    CaptureBackend,
+    LiveBackend,
+    Region,
+    get_capture_backend,
+    get_monitor_offset,
+    get_screen_size,
+    set_capture_backend,
+)
+
+SESSION_VERSION = 2  # 1 also recorded settle samples, out of step on replay
+PNG_COMPRESSION = 1  # fastest zlib level; recording runs on the capture path
+
+
+@dataclass
+class RecordedFrame:
+    """One captured frame of a session."""
+
+    name: str  # member name in the session file
+    t: float  # seconds since the recording started
+    region: Region | None  # as requested by the caller (monitor coordinates)
+    gray: bool
+    click: tuple[int, int] | None = None  # monitor coordinates of the next click
+    label: str = ""  # what was clicked
+
+
+class ReplayFinished(EOFError):
+    """A Replayer was asked for more frames than the session holds."""
+
+
+class Recorder(CaptureBackend):
+    """Capture from `source` (the live display) and write every frame to `path`."""
+
+    def __init__(self, path: str | Path, source: CaptureBackend | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.source = source or LiveBackend()
+        self.frames: list[RecordedFrame] = []
+        self._zip = zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED)
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self._monitor = {"size": get_screen_size(), "offset": get_monitor_offset()}
+
+    def grab(self, region: Region | None, gray: bool, purpose: str = MATCH):
+        if purpose != MATCH:
+            return self.source.grab(region, gray, purpose)
+        t = time.monotonic()
+        img = self.source.grab(region, gray)
+        self.record(img, region, gray, t)
+        return img
+
+    def record(
+        self, img: np.ndarray, region: Region | None, gray: bool, t: float
+    ) -> None:
+        """Write a frame captured at time.monotonic() `t` to the session."""
+        ok, png = cv2.imencode(
+            ".png", img, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]
+        )
+        if not ok:
+            raise RuntimeError("Encoding a recorded frame failed")
+        with self._lock:
+            if self._zip.fp is None:
+                raise ValueError(f"Recorder for {self.path} is closed")
+            name = f"frames/{len(self.frames):06d}.png"
+            self._zip.writestr(name, png.tobytes())
+            self.frames.append(
+                RecordedFrame(
+                    name, round(t - self._t0, 4), region and tuple(region), gray
+                )
+            )
+
+    def click(self, x: int, y: int, label: str = "") -> None:
+        """Attach a click (monitor coordinates) to the last matched frame."""
+        with self._lock:
+            if self.frames and self.frames[-1].click is None:
+                self.frames[-1].click = (x, y)
+                self.frames[-1].label = label
+
+    def close(self) -> None:
+        """Write the frame index; the session file is complete afterwards."""
+        with self._lock:
+            if self._zip.fp is None:
+                return
+            meta = {
+                "version": SESSION_VERSION,
+                "monitor": self._monitor,
+                "frames": [asdict(f) for f in self.frames],
+            }
+            self._zip.writestr("session.json", json.dumps(meta, indent=1))
+            self._zip.close()
+
+
+class Replayer(CaptureBackend):
+    """Serve the frames of a recorded session in order."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path)
+        meta = json.loads(self._zip.read("session.json"))
+        if meta.get("version") != SESSION_VERSION:
+            raise ValueError(f"Unsupported session version in {self.path}")
+        self.monitor = {k: tuple(v) for k, v in meta["monitor"].items()}
+        self.frames = [
+            RecordedFrame(
+                f["name"],
+                f["t"],
+                f["region"] and tuple(f["region"]),
+                f["gray"],
+                f["click"] and tuple(f["click"]),
+                f["label"],
+            )
+            for f in meta["frames"]
+        ]
+        self.position = 0
+        self._lock = threading.Lock()
+
+    def load(self, index: int) -> np.ndarray:
+        """Decode frame `index` as recorded (BGR or gray)."""
+        data = np.frombuffer(self._zip.read(self.frames[index].name), np.uint8)
+        return cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+
+    def grab(self, region: Region | None, gray: bool, purpose: str = MATCH):
+        with self._lock:
+            if purpose != MATCH and self.frames:
+                index = max(0, self.position - 1)  # the screen as last matched
+            elif self.position >= len(self.frames):
+                raise ReplayFinished(f"All {len(self.frames)} frames of {self.path}")
+            else:
+                index = self.position
+                self.position += 1
+            img = self.load(index)
+        recorded = self.frames[index].region
+        if region is not None and recorded is None:
+            x0, y0, x1, y1 = region
+            img = img[max(0, y0) : y1, max(0, x0) : x1]
+        if gray and img.ndim == 3:
+            return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if not gray and img.ndim == 2:
+            return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        return img
+
+    def rewind(self) -> None:
+        self.position = 0
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+def start_recording(path: str | Path) -> Recorder:
+    """Record every capture from now on to the session file `path`."""
+    recorder = Recorder(path, get_capture_backend())
+    set_capture_backend(recorder)
+    return recorder
+
+
+def stop_recording() -> None:
+    """Finish a recording started with start_recording() (no-op otherwise)."""
+    backend = get_capture_backend()
+    if isinstance(backend, Recorder):
+        set_capture_backend(backend.source)
+        backend.close()
+
+
+def note_frame(frame: ScreenFrame) -> None:
+    """Record a grabber frame a running Recorder did not capture itself."""
+    backend = get_capture_backend()
+    if isinstance(backend, Recorder):
+        backend.record(frame.image, None, frame.image.ndim == 2, frame.timestamp)
+
+
+def note_click(x: int, y: int, label: str = "") -> None:
+    """Tell a running Recorder about a click at monitor coordinates (x, y)."""
+    backend = get_capture_backend()
+    if isinstance(backend, Recorder):
+        backend.click(x, y, label)
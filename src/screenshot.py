@@ -1,10 +1,17 @@
 """Screenshot helper — Wayland-compatible with XDG Portal, gnome-screenshot fallback, and mss for X11."""
 
 import base64
+import ctypes
+import ctypes.util
 import io
+import mmap
 import os
+import select
 import subprocess
+import sys
 import tempfile
+import threading
+import zlib
 from pathlib import Path
 
 from PIL import Image
@@ -18,6 +25,25 @@ _is_wayland: bool = os.environ.get("XDG_SESSION_TYPE") == "wayland"
 # Persistent portal helper process
 _helper_proc: subprocess.Popen | None = None
 _HELPER_SCRIPT = str(Path(__file__).parent / "_portal_helper.py")
+_HELPER_CMD = ["/usr/bin/python3", _HELPER_SCRIPT]
+_HELPER_PROTOCOL = 2
+_helper_frame: "_SharedFrame | None" = None
+_portal_lock = threading.RLock()  # one request at a time; guards the shared frame
+
+# Monitor geometry, shared by all threads. Valid while _geometry_gen
+# equals _randr_gen, which the RandR watcher bumps on every screen change.
+_geometry: list[dict] | None = None
+_geometry_gen = -1
+_randr_gen = 0
+_geometry_lock = threading.Lock()
+_watcher: threading.Thread | None = None
+
+# Per-thread capture session (mss handles must not cross threads)
+_local = threading.local()
+
+# Output buffers kept per shape and session: the frame being matched, the
+# one captured next, and one spare for a frame still held by a caller
+POOL_SIZE = 3
 
 
 def set_monitor(idx: int) -> None:
@@ -26,40 +52,205 @@ def set_monitor(idx: int) -> None:
     _monitor_idx = idx
 
 
-def list_monitors() -> list[dict]:
-    """Return all monitors as dicts with left/top/width/height."""
-    if _is_wayland:
-        w, h = get_screen_size()
-        return [
-            {"left": 0, "top": 0, "width": w, "height": h},
-            {"left": 0, "top": 0, "width": w, "height": h},
-        ]
+# ── Capture session & geometry cache ─────────────────────────────────
+
+
+def _open_mss():
     import mss
 
-    with mss.mss() as sct:
-        return list(sct.monitors)
+    return mss.mss()
+
+
+class BufferPool:
+    """Reusable capture output arrays.
+
+    A buffer is handed out again only when nothing outside the pool
+    references it — no frame, no view, no crop — so a caller may keep a
+    capture as long as it likes; it just won't be recycled meanwhile.
+    At most POOL_SIZE buffers are kept per shape; beyond that (or for
+    shapes seen once, like ROI captures) take() allocates as usual.
+    """
+
+    def __init__(self, size: int = POOL_SIZE) -> None:
+        self._size = size
+        self._buffers: dict[tuple[int, ...], list] = {}
+
+    def take(self, shape: tuple[int, ...]):
+        """A uint8 array of `shape` that no one else holds (contents undefined)."""
+        import numpy as np
+
+        buffers = self._buffers.setdefault(shape, [])
+        for buf in buffers:
+            # References: the list, the loop variable and getrefcount's argument
+            # (views keep their base alive, so they count too)
+            if sys.getrefcount(buf) <= 3:
+                return buf
+        buf = np.empty(shape, np.uint8)
+        if len(buffers) < self._size:
+            buffers.append(buf)
+        return buf
+
+    def clear(self) -> None:
+        self._buffers.clear()
+
+
+class CaptureSession:
+    """Long-lived mss handle and output buffers of one thread.
+
+    The mss handle keeps the X connection open and is reopened after a
+    RandR change, since mss caches the monitor layout of its connection.
+    """
+
+    def __init__(self) -> None:
+        self._sct = None
+        self._gen = -1
+        self.pool = BufferPool()
+
+    def sct(self):
+        """The thread's mss instance, reopened if the screen layout changed."""
+        if self._sct is None or self._gen != _randr_gen:
+            self.close()
+            self._gen = _randr_gen
+            self._sct = _open_mss()
+        return self._sct
+
+    def grab(self, monitor: dict):
+        return self.sct().grab(monitor)
+
+    def close(self) -> None:
+        if self._sct is not None:
+            from mss.exception import ScreenShotError
+
+            try:
+                self._sct.close()
+            except (OSError, ScreenShotError):
+                pass  # connection already gone
+            self._sct = None
+        self.pool.clear()
+
+
+def capture_session() -> CaptureSession:
+    """The calling thread's capture session (created on first use)."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = CaptureSession()
+    return session
+
+
+def close_session() -> None:
+    """Close the calling thread's capture session (e.g. before thread exit)."""
+    session = getattr(_local, "session", None)
+    if session is not None:
+        session.close()
+        _local.session = None
+
+
+def invalidate_geometry() -> None:
+    """Force a fresh geometry query (and new mss handles) on the next call."""
+    global _randr_gen
+    with _geometry_lock:
+        _randr_gen += 1
+
+
+def _watch_randr() -> None:
+    """Bump _randr_gen on every RandR screen/CRTC/output change event.
+
+    Runs on its own Xlib connection in a daemon thread, blocked in select()
+    between events. Without libX11/libXrandr it returns immediately and
+    geometry only refreshes through invalidate_geometry().
+    """
+    global _randr_gen
+    try:
+        xlib = ctypes.CDLL(ctypes.util.find_library("X11") or "libX11.so.6")
+        xrandr = ctypes.CDLL(ctypes.util.find_library("Xrandr") or "libXrandr.so.2")
+    except OSError:
+        return
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+    xlib.XPending.argtypes = [ctypes.c_void_p]
+    xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    xrandr.XRRQueryExtension.argtypes = [
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+    ]
+    xrandr.XRRSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int]
+    xrandr.XRRUpdateConfiguration.argtypes = [ctypes.c_void_p]
+
+    dpy = xlib.XOpenDisplay(None)
+    if not dpy:
+        return
+    event_base, error_base = ctypes.c_int(), ctypes.c_int()
+    if not xrandr.XRRQueryExtension(
+        dpy, ctypes.byref(event_base), ctypes.byref(error_base)
+    ):
+        return
+    # RRScreenChangeNotifyMask | RRCrtcChangeNotifyMask | RROutputChangeNotifyMask
+    xrandr.XRRSelectInput(dpy, xlib.XDefaultRootWindow(dpy), 1 | 2 | 4)
+    fd = xlib.XConnectionNumber(dpy)
+    event = ctypes.create_string_buffer(192)  # sizeof(XEvent)
+    while True:
+        while xlib.XPending(dpy):
+            xlib.XNextEvent(dpy, event)
+            xrandr.XRRUpdateConfiguration(event)
+            with _geometry_lock:
+                _randr_gen += 1
+        select.select([fd], [], [])
+
+
+def _start_watcher() -> None:
+    global _watcher
+    if _watcher is None and os.environ.get("DISPLAY"):
+        _watcher = threading.Thread(
+            target=_watch_randr, name="randr-watcher", daemon=True
+        )
+        _watcher.start()
+
+
+def _monitors() -> list[dict]:
+    """Cached monitor list (mss layout: [all combined, monitor 1, ...])."""
+    global _geometry, _geometry_gen
+    if _geometry is not None and _geometry_gen == _randr_gen:
+        return _geometry
+    _start_watcher()
+    gen = _randr_gen
+    if _is_wayland:
+        w, h = _get_screen_size_wayland()
+        mon = {"left": 0, "top": 0, "width": w, "height": h}
+        monitors = [mon, dict(mon)]
+    else:
+        monitors = [dict(m) for m in capture_session().sct().monitors]
+    with _geometry_lock:
+        _geometry, _geometry_gen = monitors, gen
+    return monitors
+
+
+def _selected_monitor() -> dict:
+    # Wayland captures go through the portal: one screen, whatever the index
+    return _monitors()[1 if _is_wayland else _monitor_idx]
+
+
+def list_monitors() -> list[dict]:
+    """Return all monitors as dicts with left/top/width/height."""
+    invalidate_geometry()  # settings/CLI listing: always re-query
+    return [dict(m) for m in _monitors()]
 
 
 def get_monitor_offset() -> tuple[int, int]:
     """Return (left, top) pixel offset of the selected monitor in the virtual desktop."""
     if _is_wayland:
         return 0, 0
-    import mss
-
-    with mss.mss() as sct:
-        mon = sct.monitors[_monitor_idx]
-        return mon["left"], mon["top"]
+    mon = _selected_monitor()
+    return mon["left"], mon["top"]
 
 
 def get_screen_size() -> tuple[int, int]:
     """Return (width, height) of the selected monitor."""
-    if _is_wayland:
-        return _get_screen_size_wayland()
-    import mss
-
-    with mss.mss() as sct:
-        mon = sct.monitors[_monitor_idx]
-        return mon["width"], mon["height"]
+    mon = _selected_monitor()
+    return mon["width"], mon["height"]
 
 
 def _get_screen_size_wayland() -> tuple[int, int]:
@@ -73,7 +264,7 @@ def _get_screen_size_wayland() -> tuple[int, int]:
                         res = part.split("+")[0]
                         w, h = res.split("x")
                         return int(w), int(h)
-    except Exception:
+    except (OSError, subprocess.SubprocessError, ValueError):
         pass
     return 1920, 1080
 
@@ -81,66 +272,115 @@ def _get_screen_size_wayland() -> tuple[int, int]:
 # ── Wayland capture backends ──────────────────────────────────────────
 
 
+class _SharedFrame:
+    """Reader side of the memfd the portal helper writes frames into."""
+
+    def __init__(self) -> None:
+        self.fd = os.memfd_create("cgc-portal-frame", os.MFD_CLOEXEC)
+        self.mm: mmap.mmap | None = None
+
+    def view(self, width: int, height: int, stride: int, channels: int):
+        """(H, W, channels) uint8 view of the current frame (no copy)."""
+        import numpy as np
+
+        size = os.fstat(self.fd).st_size
+        if self.mm is None or len(self.mm) != size:
+            self._unmap()
+            self.mm = mmap.mmap(self.fd, size, prot=mmap.PROT_READ)
+        if height < 1 or stride < width * channels:
+            raise OSError(f"bad frame header {width}x{height} stride {stride}")
+        if stride * (height - 1) + width * channels > size:
+            raise OSError("frame larger than the shared segment")
+        return np.ndarray(
+            (height, width, channels),
+            np.uint8,
+            buffer=self.mm,
+            strides=(stride, channels, 1),
+        )
+
+    def _unmap(self) -> None:
+        if self.mm is not None:
+            try:
+                self.mm.close()
+            except BufferError:
+                pass  # a view is still alive; the map goes with it
+            self.mm = None
+
+    def close(self) -> None:
+        self._unmap()
+        os.close(self.fd)
+
+
+def _stop_helper() -> None:
+    global _helper_proc, _helper_frame
+    if _helper_proc is not None:
+        try:
+            _helper_proc.kill()
+        except OSError:
+            pass
+        _helper_proc = None
+    if _helper_frame is not None:
+        _helper_frame.close()
+        _helper_frame = None
+
+
 def _get_helper() -> subprocess.Popen | None:
     """Get or start the persistent portal helper process."""
-    global _helper_proc
+    global _helper_proc, _helper_frame
     if _helper_proc is not None and _helper_proc.poll() is None:
         return _helper_proc
 
+    _stop_helper()
     try:
+        _helper_frame = _SharedFrame()
+        fd = _helper_frame.fd
         _helper_proc = subprocess.Popen(
-            ["/usr/bin/python3", _HELPER_SCRIPT],
+            [*_HELPER_CMD, "--shm-fd", str(fd)],
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
             text=True,
+            pass_fds=(fd,),
         )
-        # Wait for READY signal
-        ready = _helper_proc.stdout.readline().strip()
-        if ready == "READY":
+        # Wait for "READY <protocol>"
+        ready = _helper_proc.stdout.readline().split()
+        if ready == ["READY", str(_HELPER_PROTOCOL)]:
             return _helper_proc
-        _helper_proc.kill()
-        _helper_proc = None
-    except Exception:
-        _helper_proc = None
-
+    except (OSError, ValueError):
+        pass  # no memfd, helper missing or its pipe broke
+    _stop_helper()
     return None
 
 
-def _capture_portal() -> Image.Image | None:
-    """Capture via XDG Desktop Portal using persistent helper process (~1s)."""
+def _capture_portal():
+    """Capture via XDG Desktop Portal using persistent helper process (~1s).
+
+    Returns an (H, W, 3|4) RGB(A) view into the shared frame, valid until
+    the next capture (hold _portal_lock while using it), or None.
+    """
     helper = _get_helper()
     if helper is None:
         return None
 
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-        tmp_path = tmp.name
-
     try:
-        helper.stdin.write(tmp_path + "\n")
+        helper.stdin.write("GRAB\n")
         helper.stdin.flush()
-        response = helper.stdout.readline().strip()
-        if (
-            response == "OK"
-            and os.path.exists(tmp_path)
-            and os.path.getsize(tmp_path) > 0
-        ):
-            return Image.open(tmp_path).convert("RGB")
-    except (BrokenPipeError, OSError):
-        # Helper died, reset for next call
-        global _helper_proc
-        _helper_proc = None
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+        response = helper.stdout.readline().split()
+        if len(response) == 5 and response[0] == "OK":
+            return _helper_frame.view(*map(int, response[1:]))
+        if not response:
+            _stop_helper()  # EOF: helper died, restart on the next call
+    except (BrokenPipeError, OSError, ValueError):
+        # Helper died or sent garbage, reset for next call
+        _stop_helper()
 
     return None
 
 
-def _capture_gnome_screenshot() -> Image.Image:
-    """Capture via gnome-screenshot CLI (~2.4s, fallback)."""
+def _capture_gnome_screenshot():
+    """Capture via gnome-screenshot CLI (~2.4s, fallback). Returns an RGB array."""
+    import numpy as np
+
     with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
         tmp_path = tmp.name
     try:
@@ -149,7 +389,7 @@ def _capture_gnome_screenshot() -> Image.Image:
             capture_output=True,
             timeout=10,
         )
-        return Image.open(tmp_path).convert("RGB")
+        return np.asarray(Image.open(tmp_path).convert("RGB"))
     finally:
         try:
             os.unlink(tmp_path)
@@ -157,69 +397,292 @@ def _capture_gnome_screenshot() -> Image.Image:
             pass
 
 
-def _capture_wayland() -> Image.Image:
-    """Capture the screen under Wayland. Tries fast portal first, then gnome-screenshot."""
-    img = _capture_portal()
-    if img is not None:
-        return img
-    return _capture_gnome_screenshot()
+def _capture_wayland(region: "Region | None" = None):
+    """Capture the screen under Wayland. Tries fast portal first, then gnome-screenshot.
+
+    Returns an RGB(A) array cropped to `region` (a view; call with
+    _portal_lock held and convert before the next capture).
+    """
+    arr = _capture_portal()
+    if arr is None:
+        arr = _capture_gnome_screenshot()
+    if region is not None:
+        x0, y0, x1, y1 = _clip_region(region)
+        arr = arr[y0:y1, x0:x1]
+    return arr
 
 
 # ── Public API ────────────────────────────────────────────────────────
 
+# Capture rectangle (x0, y0, x1, y1) in monitor coordinates
+Region = tuple[int, int, int, int]
+
+# Capture purposes: a frame the matcher looks at, or a timing-dependent
+# sample (settle detection, background grabber)
+MATCH, SAMPLE = "match", "sample"
+
 # Max image dimension sent to VLM.
 MAX_VLM_WIDTH = 1920
 MAX_VLM_HEIGHT = 1080
 
+# UI-TARS (Qwen2.5-VL) resizes every image to multiples of its 28px patch
+# grid and answers in that resized pixel space. Sending images that are
+# already on the grid (set_vlm_encoding(patch_grid=True)) makes the
+# model's coordinates the image's own.
+VLM_PATCH = 28
+
+VLM_FORMATS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+DEFAULT_VLM_QUALITY = 85
+
+_vlm_format = "png"
+_vlm_quality = DEFAULT_VLM_QUALITY
+_vlm_max_size = (MAX_VLM_WIDTH, MAX_VLM_HEIGHT)
+_vlm_patch_grid = False
+# (key, result) of the last encoded frame; see take_screenshot()
+_vlm_cache: tuple[tuple, tuple[str, tuple[int, int]]] | None = None
+
+
+def set_vlm_encoding(
+    fmt: str = "png",
+    quality: int = DEFAULT_VLM_QUALITY,
+    max_size: tuple[int, int] = (MAX_VLM_WIDTH, MAX_VLM_HEIGHT),
+    patch_grid: bool = False,
+) -> None:
+    """Choose how take_screenshot() encodes frames for the VLM.
+
+    Args:
+        fmt: "png" (lossless), "jpeg" or "webp".
+        quality: 1-100, used for JPEG and WebP.
+        max_size: (width, height) the image is downscaled to fit into.
+        patch_grid: also round the size down to multiples of VLM_PATCH
+            (changes the aspect ratio slightly; off keeps the plain fit).
+    """
+    global _vlm_format, _vlm_quality, _vlm_max_size, _vlm_patch_grid
+    if fmt not in VLM_FORMATS:
+        raise ValueError(
+            f"Unknown VLM image format {fmt!r}, expected one of {list(VLM_FORMATS)}"
+        )
+    if not 1 <= quality <= 100:
+        raise ValueError(f"VLM image quality must be 1-100, got {quality}")
+    if min(max_size) < (VLM_PATCH if patch_grid else 1):
+        raise ValueError(f"VLM max size {max_size} is too small")
+    _vlm_format, _vlm_quality, _vlm_max_size = fmt, quality, tuple(max_size)
+    _vlm_patch_grid = patch_grid
+
+
+def _vlm_size(width: int, height: int) -> tuple[int, int]:
+    """Size a width x height frame is sent at: fits _vlm_max_size, keeps the aspect.
+
+    With the patch grid enabled, both sides are rounded down to it.
+    """
+    max_w, max_h = _vlm_max_size
+    scale = min(1.0, max_w / width, max_h / height)
+    if not _vlm_patch_grid:
+        return max(1, round(width * scale)), max(1, round(height * scale))
+    return (
+        max(VLM_PATCH, int(width * scale) // VLM_PATCH * VLM_PATCH),
+        max(VLM_PATCH, int(height * scale) // VLM_PATCH * VLM_PATCH),
+    )
+
+
+def _encode_vlm(src, code: int) -> tuple[str, tuple[int, int]]:
+    """Downscale a raw capture, convert it with cvtColor `code` and encode it."""
+    import cv2
+
+    size = _vlm_size(src.shape[1], src.shape[0])
+    if size != (src.shape[1], src.shape[0]):
+        src = cv2.resize(src, size, interpolation=cv2.INTER_AREA)
+    bgr = cv2.cvtColor(src, code)
+
+    if _vlm_format == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, _vlm_quality]
+    elif _vlm_format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, _vlm_quality]
+    else:
+        params = []
+    ok, buf = cv2.imencode(VLM_FORMATS[_vlm_format], bgr, params)
+    if not ok:
+        raise RuntimeError(f"Encoding the screenshot as {_vlm_format} failed")
+    return base64.b64encode(buf).decode(), size
+
 
 def take_screenshot() -> tuple[str, tuple[int, int]]:
-    """Capture the selected monitor, resize for VLM, return as base64-encoded PNG.
+    """Capture the selected monitor, resize for VLM, return it base64-encoded.
+
+    The format, quality and max size come from set_vlm_encoding(). The raw
+    capture is hashed first: if the screen did not change since the last
+    call, the previous encoding is returned without resizing or encoding.
 
     Returns:
-        (base64_png, (width, height)) — the encoded image and its pixel dimensions
-        (after resizing).
+        (base64_image, (width, height)) — the encoded image and its pixel
+        dimensions (after resizing), to be passed on to actions.execute().
     """
-    if _is_wayland:
-        img = _capture_wayland()
-    else:
-        import mss
+    global _vlm_cache
+    import cv2
+    import numpy as np
+
+    with _portal_lock:
+        if _is_wayland:
+            src = _capture_wayland()
+            code = cv2.COLOR_RGB2BGR if src.shape[2] == 3 else cv2.COLOR_RGBA2BGR
+        else:
+            src = _grab_bgra(None)
+            code = cv2.COLOR_BGRA2BGR
+
+        # crc32 of the raw pixels: ~10ms for a 4K frame, far below an encode
+        frame_hash = zlib.crc32(np.ascontiguousarray(src))
+        key = (
+            frame_hash,
+            src.shape,
+            _vlm_format,
+            _vlm_quality,
+            _vlm_max_size,
+            _vlm_patch_grid,
+        )
+        cached = _vlm_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        result = _encode_vlm(src, code)
+
+    _vlm_cache = (key, result)
+    return result
+
+
+def _clip_region(region: Region | None) -> Region:
+    """Clamp a monitor-relative (x0, y0, x1, y1) rectangle to the monitor."""
+    mon = _selected_monitor()
+    w, h = mon["width"], mon["height"]
+    if region is None:
+        return 0, 0, w, h
+    x0, y0, x1, y1 = region
+    x0, y0 = min(max(0, x0), w), min(max(0, y0), h)
+    x1, y1 = min(max(x0, x1), w), min(max(y0, y1), h)
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError(f"Empty capture region {region} on a {w}x{h} monitor")
+    return x0, y0, x1, y1
+
+
+def _grab_bgra(region: Region | None):
+    """Grab the selected monitor (or a region of it) as an (H, W, 4) BGRA view."""
+    import numpy as np
+
+    x0, y0, x1, y1 = _clip_region(region)
+    mon = _selected_monitor()
+    box = {
+        "left": mon["left"] + x0,
+        "top": mon["top"] + y0,
+        "width": x1 - x0,
+        "height": y1 - y0,
+    }
+    shot = capture_session().grab(box)
+    # .raw is mss's own buffer; .bgra would return a bytes copy of it
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
 
-        with mss.mss() as sct:
-            shot = sct.grab(sct.monitors[_monitor_idx])
-            img = Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
 
-    img.thumbnail((MAX_VLM_WIDTH, MAX_VLM_HEIGHT), Image.LANCZOS)
+def _convert(src, code: int, channels: int):
+    """cv2.cvtColor of a capture into a pooled output buffer (no temporaries)."""
+    import cv2
 
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return base64.b64encode(buf.getvalue()).decode(), img.size
+    shape = src.shape[:2] if channels == 1 else (*src.shape[:2], channels)
+    return cv2.cvtColor(src, code, dst=capture_session().pool.take(shape))
 
 
-def take_screenshot_bgr():
+def take_screenshot_bgr(region: Region | None = None, purpose: str = MATCH):
     """Capture the selected monitor as a BGR numpy array (for OpenCV template matching).
 
+    Args:
+        region: Optional (x0, y0, x1, y1) rectangle in monitor coordinates
+            (the same ones find_template returns and _click_at expects).
+            Only that rectangle is grabbed; coordinates found in the result
+            are relative to (x0, y0).
+        purpose: MATCH for frames the matcher looks at, SAMPLE for settle
+            detection and background grabber frames (not recorded or
+            replayed, see CaptureBackend).
+
     Returns:
         numpy.ndarray in BGR format, at native monitor resolution (no resize).
+        From the live display the array comes from the thread's BufferPool
+        and is recycled only after the last reference to it (or a view of
+        it) is gone. See set_capture_backend() for recording and replay.
     """
-    import numpy as np
+    return _backend.grab(region, gray=False, purpose=purpose)
+
+
+def take_screenshot_gray(region: Region | None = None, purpose: str = MATCH):
+    """Like take_screenshot_bgr, but converted straight to grayscale (H, W)."""
+    return _backend.grab(region, gray=True, purpose=purpose)
+
+
+def _live_bgr(region: Region | None):
+    import cv2
 
     if _is_wayland:
-        img = _capture_wayland()
-        arr = np.array(img)
-        return arr[:, :, ::-1].copy()  # RGB → BGR
+        with _portal_lock:
+            arr = _capture_wayland(region)
+            code = cv2.COLOR_RGB2BGR if arr.shape[2] == 3 else cv2.COLOR_RGBA2BGR
+            return _convert(arr, code, 3)
 
-    import mss
+    return _convert(_grab_bgra(region), cv2.COLOR_BGRA2BGR, 3)
 
-    with mss.mss() as sct:
-        shot = sct.grab(sct.monitors[_monitor_idx])
-        img = np.frombuffer(shot.bgra, dtype=np.uint8).reshape(
-            shot.height, shot.width, 4
-        )
-        return img[:, :, :3].copy()  # drop alpha, keep BGR
+
+def _live_gray(region: Region | None):
+    import cv2
+
+    if _is_wayland:
+        with _portal_lock:
+            arr = _capture_wayland(region)
+            code = cv2.COLOR_RGB2GRAY if arr.shape[2] == 3 else cv2.COLOR_RGBA2GRAY
+            return _convert(arr, code, 1)
+
+    return _convert(_grab_bgra(region), cv2.COLOR_BGRA2GRAY, 1)
+
+
+# ── Capture backends ─────────────────────────────────────────────────
+
+
+class CaptureBackend:
+    """Where take_screenshot_bgr() / take_screenshot_gray() get their pixels.
+
+    The default LiveBackend grabs the display; recording.Recorder and
+    recording.Replayer record a session to a file and serve it back.
+    Only MATCH captures belong to a session: SAMPLE captures (settle
+    detection, the background grabber) happen at a timing-dependent rate
+    and must not shift the recorded frame sequence.
+    """
+
+    def grab(self, region: Region | None, gray: bool, purpose: str = MATCH):
+        """BGR (H, W, 3) or gray (H, W) uint8 array of the monitor or a region."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LiveBackend(CaptureBackend):
+    """The selected monitor of the live display (X11 or Wayland)."""
+
+    def grab(self, region: Region | None, gray: bool, purpose: str = MATCH):
+        return _live_gray(region) if gray else _live_bgr(region)
+
+
+_backend: CaptureBackend = LiveBackend()
+
+
+def set_capture_backend(backend: CaptureBackend | None) -> None:
+    """Route all captures through `backend` (None: back to the live display).
+
+    The previous backend is not closed; that is up to whoever created it.
+    """
+    global _backend
+    _backend = LiveBackend() if backend is None else backend
+
+
+def get_capture_backend() -> CaptureBackend:
+    return _backend
 
 
-def get_image_size(b64_png: str) -> tuple[int, int]:
-    """Get (width, height) of a base64-encoded PNG without fully decoding it."""
-    data = base64.b64decode(b64_png)
+def get_image_size(b64_image: str) -> tuple[int, int]:
+    """Get (width, height) of a base64-encoded image without fully decoding it."""
+    data = base64.b64decode(b64_image)
     img = Image.open(io.BytesIO(data))
     return img.size
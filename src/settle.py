@@ -0,0 +1,96 @@
+"""Screen-settle detection — wait until the UI stops changing after an action.
+
+Fixed post-click sleeps assume the worst-case UI latency. Instead,
+wait_until_settled() samples the screen (or a region of it), compares
+heavily downsampled consecutive frames and returns as soon as nothing
+changed for STABLE_FOR seconds. The old sleep stays as a hard upper
+bound: if the screen keeps moving (spinners, video) or capturing fails,
+it waits exactly `timeout` like before.
+"""
+
+from __future__ import annotations
+
+import time
+
+import cv2
+import numpy as np
+
+from .frame import ScreenFrame
+from .grabber import grabbing, latest_frame
+from .screenshot import SAMPLE
+
+SETTLE_SCALE = 8  # compare frames downsampled by this factor per side
+PIXEL_DELTA = 12  # gray-level difference that counts as a change
+CHANGED_FRACTION = 0.002  # settled while at most this share of pixels changes
+STABLE_FOR = 0.25  # seconds without change before the screen counts as settled
+MIN_WAIT = 0.15  # let the action start (e.g. a modal begin to fade in)
+POLL_INTERVAL = 0.05
+
+_warned = False  # capture failures are reported once per process
+
+
+def _sample(
+    region: tuple[int, int, int, int] | None, newer_than: float, timeout: float
+) -> tuple[np.ndarray, float]:
+    """Downsampled gray capture of `region` and its capture start time."""
+    if grabbing():
+        frame = latest_frame(newer_than=newer_than, timeout=timeout, purpose=SAMPLE)
+        if region is not None:
+            frame = frame.crop(*region)
+    else:
+        frame = ScreenFrame.capture(region, gray=True, purpose=SAMPLE)
+    gray = frame.gray
+    size = (
+        max(1, gray.shape[1] // SETTLE_SCALE),
+        max(1, gray.shape[0] // SETTLE_SCALE),
+    )
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA), frame.timestamp
+
+
+def changed_fraction(a: np.ndarray, b: np.ndarray) -> float:
+    """Share of pixels differing by more than PIXEL_DELTA (1.0 if shapes differ)."""
+    if a.shape != b.shape:
+        return 1.0
+    diff = cv2.absdiff(a, b)
+    return float(np.count_nonzero(diff > PIXEL_DELTA)) / diff.size
+
+
+def wait_until_settled(
+    region: tuple[int, int, int, int] | None = None,
+    timeout: float = 2.0,
+    stable_for: float = STABLE_FOR,
+) -> bool:
+    """Block until the screen (or an x0, y0, x1, y1 region) stops changing.
+
+    Returns True as soon as it settled, False after `timeout` seconds
+    (never later, give or take one capture).
+    """
+    global _warned
+    from mss.exception import ScreenShotError
+
+    start = time.monotonic()
+    deadline = start + timeout
+    time.sleep(min(MIN_WAIT, timeout))
+
+    prev: np.ndarray | None = None
+    prev_t = stable_since = start
+    capture_cost = 0.0
+    try:
+        while time.monotonic() + capture_cost < deadline:
+            t0 = time.monotonic()
+            small, t = _sample(region, prev_t, deadline - t0)
+            capture_cost = time.monotonic() - t0
+            if prev is None or changed_fraction(prev, small) > CHANGED_FRACTION:
+                stable_since = t
+            elif t - stable_since >= stable_for:
+                return True
+            prev, prev_t = small, t
+            time.sleep(max(0.0, min(POLL_INTERVAL, deadline - time.monotonic())))
+    except (OSError, ScreenShotError) as exc:
+        # No capture possible: fall back to the plain sleep
+        if not _warned:
+            _warned = True
+            print(f"  [WARN] Screen-settle capture failed, using fixed waits: {exc}")
+
+    time.sleep(max(0.0, deadline - time.monotonic()))
+    return False
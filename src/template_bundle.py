@@ -0,0 +1,242 @@
+"""Compiled template bundle — all templates precomputed in one mmap-able file.
+
+The bundle holds every PNG from the templates directory as grayscale at
+the common browser zoom levels, with their pyramid levels and the
+mean/norm statistics normalized correlation needs. It is memory-mapped at
+startup and rebuilt automatically when a source PNG changes.
+
+File layout (little endian):
+    8 bytes   magic b"CGCTPL1\\n"
+    8 bytes   header length N
+    N bytes   JSON header (sources, scales, levels, entries)
+    padding   to a 64-byte boundary
+    ...       raw uint8 images, each at its entry's offset from the data start
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "old_code" / "templates"
+DATA_DIR = Path(__file__).parent.parent / "data"
+BUNDLE_FILE = DATA_DIR / "templates.bundle"
+
+# Chrome zoom levels — precomputed so a calibrated scale rarely needs a resize
+BUNDLE_SCALES = (0.75, 0.8, 0.9, 1.0, 1.1, 1.25, 1.5, 1.75, 2.0)
+BUNDLE_LEVELS = 2  # pyramid halvings stored per variant
+MIN_TEMPLATE_SIDE = 8
+
+_MAGIC = b"CGCTPL1\n"
+_ALIGN = 64
+
+_bundle: TemplateBundle | None = None
+_lock = threading.Lock()
+
+
+def rescale(img: np.ndarray, scale: float) -> np.ndarray:
+    """Resize an image by `scale` (area filter when shrinking)."""
+    if scale == 1.0:
+        return img
+    interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=interp)
+
+
+@dataclass(frozen=True)
+class TemplateStats:
+    """Precomputed statistics of one template variant."""
+
+    mean: float  # mean gray value
+    norm: float  # L2 norm of (template - mean)
+
+
+class TemplateBundle:
+    """Read-only view of a bundle file (or an in-memory build)."""
+
+    def __init__(self, buf: np.ndarray, header: dict, path: Path | None) -> None:
+        self.path = path
+        self.header = header
+        self._buf = buf
+        self._entries = {
+            (e["name"], e["scale"], e["level"]): e for e in header["entries"]
+        }
+
+    @property
+    def names(self) -> list[str]:
+        """Template filenames in the bundle."""
+        return sorted(self.header["sources"])
+
+    @property
+    def errors(self) -> dict[str, str]:
+        """Templates that could not be packed → reason."""
+        return self.header.get("errors", {})
+
+    def _entry(self, name: str, scale: float, level: int) -> dict | None:
+        return self._entries.get((name, round(scale, 2), level))
+
+    def get(self, name: str, scale: float = 1.0, level: int = 0) -> np.ndarray | None:
+        """Template image (read-only view), or None if not precomputed."""
+        e = self._entry(name, scale, level)
+        if e is None:
+            return None
+        h, w = e["shape"]
+        return self._buf[e["offset"] : e["offset"] + h * w].reshape(h, w)
+
+    def stats(
+        self, name: str, scale: float = 1.0, level: int = 0
+    ) -> TemplateStats | None:
+        """Mean/norm of a template variant, or None if not precomputed."""
+        e = self._entry(name, scale, level)
+        if e is None:
+            return None
+        return TemplateStats(e["mean"], e["norm"])
+
+
+def _sources(templates_dir: Path) -> dict[str, list[int]]:
+    """{filename: [mtime_ns, size]} of every PNG template."""
+    result = {}
+    for path in sorted(templates_dir.glob("*.png")):
+        st = path.stat()
+        result[path.name] = [st.st_mtime_ns, st.st_size]
+    return result
+
+
+def _pack(templates_dir: Path) -> tuple[dict, bytes]:
+    """Read and precompute all templates. Returns (header, data)."""
+    sources = _sources(templates_dir)
+    entries = []
+    errors = {}
+    chunks = []
+    offset = 0
+
+    for name in sources:
+        raw = cv2.imread(str(templates_dir / name), cv2.IMREAD_GRAYSCALE)
+        if raw is None:
+            errors[name] = "unreadable"
+            continue
+        if min(raw.shape) < MIN_TEMPLATE_SIDE:
+            errors[name] = f"too small ({raw.shape[1]}x{raw.shape[0]})"
+            continue
+        if float(raw.std()) == 0.0:
+            errors[name] = "uniform (no contrast)"
+            continue
+
+        for scale in BUNDLE_SCALES:
+            img = rescale(raw, scale)
+            for level in range(BUNDLE_LEVELS + 1):
+                if level:
+                    img = cv2.pyrDown(img)
+                if min(img.shape) < 1:
+                    break
+                img = np.ascontiguousarray(img)
+                mean = float(img.mean())
+                norm = float(np.sqrt(((img.astype(np.float64) - mean) ** 2).sum()))
+                entries.append(
+                    {
+                        "name": name,
+                        "scale": scale,
+                        "level": level,
+                        "shape": list(img.shape),
+                        "offset": offset,
+                        "mean": mean,
+                        "norm": norm,
+                    }
+                )
+                chunks.append(img.tobytes())
+                offset += img.size
+
+    header = {
+        "version": 1,
+        "sources": sources,
+        "scales": list(BUNDLE_SCALES),
+        "levels": BUNDLE_LEVELS,
+        "errors": errors,
+        "entries": entries,
+    }
+    return header, b"".join(chunks)
+
+
+def _data_start(header_len: int) -> int:
+    return -(-(16 + header_len) // _ALIGN) * _ALIGN
+
+
+def build_bundle(
+    path: Path | None = None, templates_dir: Path | None = None
+) -> TemplateBundle:
+    """Pack all templates and write the bundle file atomically.
+
+    Defaults to BUNDLE_FILE and TEMPLATES_DIR. If the file can't be
+    written (read-only checkout), the bundle is kept in memory only.
+    """
+    path = BUNDLE_FILE if path is None else path
+    templates_dir = TEMPLATES_DIR if templates_dir is None else templates_dir
+    header, data = _pack(templates_dir)
+    header_bytes = json.dumps(header).encode()
+    start = _data_start(len(header_bytes))
+    prefix = _MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes
+    blob = prefix + b"\0" * (start - len(prefix)) + data
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+    except OSError:
+        buf = np.frombuffer(blob, np.uint8)[start:]
+        return TemplateBundle(buf, header, None)
+    return _open(path)
+
+
+def _open(path: Path) -> TemplateBundle:
+    """Memory-map an existing bundle file."""
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(mm[:8]) != _MAGIC:
+        raise ValueError(f"Not a template bundle: {path}")
+    (header_len,) = struct.unpack("<Q", bytes(mm[8:16]))
+    header = json.loads(bytes(mm[16 : 16 + header_len]))
+    return TemplateBundle(mm[_data_start(header_len) :], header, path)
+
+
+def _is_stale(header: dict, templates_dir: Path) -> bool:
+    return (
+        header.get("version") != 1
+        or header.get("sources") != _sources(templates_dir)
+        or header.get("scales") != list(BUNDLE_SCALES)
+        or header.get("levels") != BUNDLE_LEVELS
+    )
+
+
+def load_bundle(
+    path: Path | None = None, templates_dir: Path | None = None
+) -> TemplateBundle:
+    """Memory-map the bundle, rebuilding it first if any source PNG changed.
+
+    Defaults to BUNDLE_FILE and TEMPLATES_DIR.
+    """
+    global _bundle
+    path = BUNDLE_FILE if path is None else path
+    templates_dir = TEMPLATES_DIR if templates_dir is None else templates_dir
+    with _lock:
+        if (
+            _bundle is not None
+            and _bundle.path == path
+            and not _is_stale(_bundle.header, templates_dir)
+        ):
+            return _bundle
+        bundle = None
+        if path.exists():
+            try:
+                bundle = _open(path)
+            except (OSError, ValueError, KeyError):
+                bundle = None
+        if bundle is None or _is_stale(bundle.header, templates_dir):
+            bundle = build_bundle(path, templates_dir)
+        _bundle = bundle
+        return bundle
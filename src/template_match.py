@@ -2,120 +2,1079 @@
 
 from __future__ import annotations
 
-from pathlib import Path
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 
 import cv2
 import numpy as np
 
-TEMPLATES_DIR = Path(__file__).parent.parent / "old_code" / "templates"
+from .frame import ScreenFrame, as_frame
+from .match_telemetry import Probe
+from .template_bundle import (
+    DATA_DIR,
+    TEMPLATES_DIR,
+    TemplateBundle,
+    TemplateStats,
+    load_bundle,
+    rescale,
+)
+from .thresholds import calibrating, threshold_for
+
+# Pyramid search (opt-in): match on a downscaled copy first, then refine
+# at full resolution only in small windows around the coarse candidates.
+PYRAMID_MAX_LEVEL = 2  # at most 2 halvings → 1/4 resolution
+PYRAMID_MIN_SIDE = 12  # template must stay at least this large when downscaled
+PYRAMID_SLACK = 0.2  # coarse threshold = threshold - slack (blur lowers scores)
+PYRAMID_MAX_CANDIDATES = 8  # coarse peaks refined by find_template
+
+# find_all_templates: matches closer than this fraction of the template's
+# smaller side count as the same element (60px icon → 20px)
+NMS_RADIUS_FRACTION = 1 / 3
+
+# Download button sits this far right of a modal row icon center
+BUTTON_OFFSET_X = 555
+
+# Download modal: format → (row icon template, row center y as a fraction
+# of the modal height). Geometry measured on modal.png (558x516).
+MODAL_TEMPLATE = "modal.png"
+MODAL_ROWS = {
+    "mp3": ("modal_mp3.png", 131 / 516),
+    "raw": ("modal_raw.png", 231 / 516),
+    "video": ("modal_video.png", 331 / 516),
+    "lrc": ("modal_lrc.png", 431 / 516),
+}
+MODAL_BUTTON_X = 453 / 558  # Download button column, fraction of modal width
+MODAL_ROW_PITCH = 100 / 516  # row spacing, fraction of modal height
+# The row icons were captured at a larger zoom than modal.png: inside the
+# modal they appear at this fraction of their template size (measured)
+MODAL_ICON_SCALE = 0.66
+
+# Batch matching: OpenCV releases the GIL, so templates run in parallel
+FIND_MANY_WORKERS = min(4, os.cpu_count() or 1)
+
+# Scale calibration: templates were captured at one zoom/DPI; the session
+# scale is detected once by matching the download icon at several sizes.
+SCALE_TEMPLATE = "download_button.png"
+SCALE_MIN = 0.5
+SCALE_MAX = 2.0
+SCALE_COARSE_STEP = 0.1  # first pass, on the half-resolution frame
+SCALE_FINE_STEP = 0.02  # second pass, full resolution around the best hit
+
+# Correlation backend: "auto" picks spatial (cv2.matchTemplate) or FFT per
+# template and frame size from a cost model measured once on this machine.
+BACKEND_COST_FILE = DATA_DIR / "match_cost.json"
+FFT_MIN_STD = 0.5  # windows flatter than this (gray levels) score 0, as in OpenCV
+SPEC_CACHE_SIZE = 32  # template spectra kept (one per template, level, frame size)
 
 # Pre-load templates as grayscale
-_cache: dict[str, np.ndarray] = {}
+_raw_cache: dict[str, np.ndarray] = {}  # as captured
+_cache: dict[str, np.ndarray] = {}  # rescaled to the session scale
+_pyr_cache: dict[tuple[str, int], np.ndarray] = {}
+_pool: ThreadPoolExecutor | None = None
+_scale: float = 1.0
+_stats_cache: dict[tuple[str, int], TemplateStats] = {}
+_spec_cache: OrderedDict[tuple[str, int, tuple[int, int]], np.ndarray] = OrderedDict()
+_spec_lock = threading.Lock()
+_session_bundle: TemplateBundle | None = None
+_bundle_loaded = False
+_backend = "auto"
+_cost_model: CostModel | None = None
+_cost_lock = threading.Lock()
+
+
+def _reload_bundle() -> TemplateBundle | None:
+    """Map the template bundle (rebuilt if a PNG changed) for this session."""
+    global _session_bundle, _bundle_loaded
+    try:
+        _session_bundle = load_bundle()
+    except OSError:
+        _session_bundle = None
+    _bundle_loaded = True
+    return _session_bundle
+
+
+def _bundle() -> TemplateBundle | None:
+    """The session's template bundle, or None if it can't be loaded.
+
+    Checked for stale PNGs once per session (warm_up, set_scale), not on
+    every lookup.
+    """
+    if not _bundle_loaded:
+        return _reload_bundle()
+    return _session_bundle
+
+
+def _load_raw(name: str) -> np.ndarray:
+    """Load a template image as captured (grayscale, cached)."""
+    if name not in _raw_cache:
+        bundle = _bundle()
+        img = bundle.get(name) if bundle else None
+        if img is None:
+            path = TEMPLATES_DIR / name
+            if not path.exists():
+                raise FileNotFoundError(f"Template not found: {path}")
+            img = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                raise ValueError(f"Failed to read template: {path}")
+        _raw_cache[name] = img
+    return _raw_cache[name]
 
 
 def _load(name: str) -> np.ndarray:
-    """Load a template image (grayscale, cached)."""
+    """Load a template at the session scale (grayscale, cached)."""
     if name not in _cache:
-        path = TEMPLATES_DIR / name
-        if not path.exists():
-            raise FileNotFoundError(f"Template not found: {path}")
-        img = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
-        if img is None:
-            raise ValueError(f"Failed to read template: {path}")
-        _cache[name] = img
+        bundle = _bundle()
+        img = bundle.get(name, _scale) if bundle else None
+        _cache[name] = img if img is not None else rescale(_load_raw(name), _scale)
     return _cache[name]
 
 
+def warm_up() -> tuple[int, float, dict[str, str]]:
+    """Map the template bundle, fill all caches and load the backend cost model.
+
+    Returns (templates loaded, seconds, {template: problem}).
+    """
+    t0 = time.perf_counter()
+    problems: dict[str, str] = {}
+    try:
+        problems.update(load_bundle().errors)
+    except OSError as e:
+        problems["bundle"] = str(e)
+    _reload_bundle()
+    get_cost_model()
+    loaded = 0
+    for path in sorted(TEMPLATES_DIR.glob("*.png")):
+        if path.name in problems:
+            continue
+        try:
+            tmpl = _load(path.name)
+            for level in range(1, _pyramid_level(tmpl) + 1):
+                _load_pyr(path.name, level)
+            loaded += 1
+        except (FileNotFoundError, ValueError) as e:
+            problems[path.name] = str(e)
+    return loaded, time.perf_counter() - t0, problems
+
+
+# ── Pyramid search ───────────────────────────────────────────────────
+
+
+def _pyr_down(img: np.ndarray, level: int) -> np.ndarray:
+    """Halve an image `level` times (Gaussian pyramid)."""
+    for _ in range(level):
+        img = cv2.pyrDown(img)
+    return img
+
+
+def _pyramid_level(tmpl: np.ndarray) -> int:
+    """Number of halvings that keep the template above PYRAMID_MIN_SIDE."""
+    side = min(tmpl.shape[:2])
+    level = 0
+    while level < PYRAMID_MAX_LEVEL and (side >> (level + 1)) >= PYRAMID_MIN_SIDE:
+        level += 1
+    return level
+
+
+def _load_pyr(name: str, level: int) -> np.ndarray:
+    """Load a downscaled template (cached per level)."""
+    key = (name, level)
+    if key not in _pyr_cache:
+        bundle = _bundle()
+        img = bundle.get(name, _scale, level) if bundle else None
+        _pyr_cache[key] = img if img is not None else _pyr_down(_load(name), level)
+    return _pyr_cache[key]
+
+
+# ── Correlation backends ─────────────────────────────────────────────
+
+
+@dataclass
+class CostModel:
+    """Predicted seconds per correlation for both backends.
+
+    spatial ≈ a·F + b·F·√T   (F frame pixels, T template pixels)
+    fft     ≈ c·P·log2(P) + d·N   (P padded frame pixels, N result pixels)
+
+    The FFT estimate excludes the frame spectrum, which is computed once
+    per frame and shared by all templates.
+    """
+
+    spatial: tuple[float, float]
+    fft: tuple[float, float]
+
+    @staticmethod
+    def _features(
+        frame_shape: tuple[int, int], tmpl_shape: tuple[int, int]
+    ) -> tuple[list[float], list[float]]:
+        (h, w), (th, tw) = frame_shape[:2], tmpl_shape[:2]
+        f = float(h * w)
+        p = float(cv2.getOptimalDFTSize(h) * cv2.getOptimalDFTSize(w))
+        n = float((h - th + 1) * (w - tw + 1))
+        return [f, f * (th * tw) ** 0.5], [p * np.log2(p), n]
+
+    def costs(
+        self, frame_shape: tuple[int, int], tmpl_shape: tuple[int, int]
+    ) -> tuple[float, float]:
+        """(spatial, fft) predicted seconds."""
+        fs, ff = self._features(frame_shape, tmpl_shape)
+        return (
+            float(np.dot(self.spatial, fs)),
+            float(np.dot(self.fft, ff)),
+        )
+
+
+def _fit(rows: list[list[float]], times: list[float]) -> tuple[float, float]:
+    """Non-negative least-squares-ish fit of time ≈ rows·coef."""
+    coef, *_ = np.linalg.lstsq(np.array(rows), np.array(times), rcond=None)
+    return float(max(coef[0], 0.0)), float(max(coef[1], 0.0))
+
+
+def _measure_costs() -> CostModel:
+    """Time both backends on synthetic frames and fit the cost model."""
+    rng = np.random.default_rng(0)
+    spatial_rows, spatial_times, fft_rows, fft_times = [], [], [], []
+    for h, w in ((360, 640), (720, 1280)):
+        noise = rng.integers(0, 256, (h, w), dtype=np.uint8)
+        frame = ScreenFrame(cv2.GaussianBlur(noise, (5, 5), 0))
+        frame.spectrum()
+        for side in (24, 96, 320):
+            tmpl = np.ascontiguousarray(frame.gray[8 : 8 + side, 16 : 16 + side])
+            stats = _stats_of(tmpl)
+            spec = _template_spectrum(tmpl, frame.spectrum().shape)
+            t_spatial = t_fft = float("inf")
+            for _ in range(2):
+                t0 = time.perf_counter()
+                cv2.matchTemplate(frame.gray, tmpl, cv2.TM_CCOEFF_NORMED)
+                t1 = time.perf_counter()
+                _fft_correlate(frame, 0, tmpl.shape, spec, stats)
+                t2 = time.perf_counter()
+                t_spatial = min(t_spatial, t1 - t0)
+                t_fft = min(t_fft, t2 - t1)
+            fs, ff = CostModel._features((h, w), tmpl.shape)
+            spatial_rows.append(fs)
+            spatial_times.append(t_spatial)
+            fft_rows.append(ff)
+            fft_times.append(t_fft)
+    return CostModel(_fit(spatial_rows, spatial_times), _fit(fft_rows, fft_times))
+
+
+def get_cost_model() -> CostModel:
+    """The backend cost model — loaded from disk, or measured once and saved."""
+    global _cost_model
+    with _cost_lock:
+        if _cost_model is not None:
+            return _cost_model
+        key = {"opencv": cv2.__version__, "cpus": os.cpu_count()}
+        try:
+            data = json.loads(BACKEND_COST_FILE.read_text())
+            if data.get("key") == key:
+                _cost_model = CostModel(tuple(data["spatial"]), tuple(data["fft"]))
+                return _cost_model
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        _cost_model = _measure_costs()
+        try:
+            BACKEND_COST_FILE.parent.mkdir(parents=True, exist_ok=True)
+            BACKEND_COST_FILE.write_text(
+                json.dumps(
+                    {
+                        "key": key,
+                        "spatial": _cost_model.spatial,
+                        "fft": _cost_model.fft,
+                    },
+                    indent=2,
+                )
+            )
+        except OSError:
+            pass
+        return _cost_model
+
+
+def set_backend(backend: str) -> None:
+    """Force a correlation backend: "auto" (default), "spatial" or "fft"."""
+    global _backend
+    if backend not in ("auto", "spatial", "fft"):
+        raise ValueError(f"Unknown backend: {backend}")
+    _backend = backend
+
+
+def choose_backend(frame_shape: tuple[int, int], tmpl_shape: tuple[int, int]) -> str:
+    """Backend that will be used for a template on a frame of this size."""
+    if _backend != "auto":
+        return _backend
+    spatial, fft = get_cost_model().costs(frame_shape, tmpl_shape)
+    return "fft" if fft < spatial else "spatial"
+
+
+def _stats_of(tmpl: np.ndarray) -> TemplateStats:
+    mean = float(tmpl.mean())
+    return TemplateStats(mean, float(np.linalg.norm(tmpl - mean)))
+
+
+def _template_stats(name: str, level: int, tmpl: np.ndarray) -> TemplateStats:
+    """Mean/norm of a template variant (from the bundle if possible, cached)."""
+    key = (name, level)
+    stats = _stats_cache.get(key)
+    if stats is None:
+        bundle = _bundle()
+        stats = bundle.stats(name, _scale, level) if bundle else None
+        if stats is None:
+            stats = _stats_of(tmpl)
+        _stats_cache[key] = stats
+    return stats
+
+
+def _template_spectrum(tmpl: np.ndarray, shape: tuple[int, int]) -> np.ndarray:
+    """Real DFT of the zero-mean template, zero-padded to `shape`."""
+    padded = np.zeros(shape, np.float32)
+    th, tw = tmpl.shape[:2]
+    padded[:th, :tw] = tmpl
+    padded[:th, :tw] -= float(tmpl.mean())
+    return cv2.dft(padded)
+
+
+def _fft_correlate(
+    frame: ScreenFrame,
+    level: int,
+    tmpl_shape: tuple[int, int],
+    spec: np.ndarray,
+    stats: TemplateStats,
+) -> np.ndarray:
+    """TM_CCOEFF_NORMED via the frequency domain.
+
+    The numerator is the cross-correlation of the frame with the zero-mean
+    template (one spectrum product + inverse DFT); the window energies in
+    the denominator come from box filters over the centered frame.
+    """
+    gray = frame.pyramid(level)
+    h, w = gray.shape[:2]
+    th, tw = tmpl_shape[:2]
+    rh, rw = h - th + 1, w - tw + 1
+    corr = cv2.mulSpectrums(frame.spectrum(level), spec, 0, conjB=True)
+    num = cv2.idft(corr, flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)[:rh, :rw]
+
+    # Window sums of the centered image: Σ(I - Ī)² = Q - S²/n
+    centered = frame.centered(level)
+    n = th * tw
+    box = {"anchor": (0, 0), "normalize": False, "borderType": cv2.BORDER_CONSTANT}
+    win = cv2.boxFilter(centered, -1, (tw, th), **box)[:rh, :rw]
+    var = cv2.sqrBoxFilter(centered, -1, (tw, th), **box)[:rh, :rw]
+    win *= win
+    win *= 1.0 / n
+    var -= win
+
+    den = np.sqrt(np.maximum(var, 0.0, out=var), out=win)
+    den *= stats.norm
+    result = np.zeros((rh, rw), np.float32)
+    np.divide(num, den, out=result, where=var >= FFT_MIN_STD**2 * n)
+    return np.clip(result, -1.0, 1.0, out=result)
+
+
+def _fft_inputs(
+    frame: ScreenFrame, name: str, level: int, tmpl: np.ndarray
+) -> tuple[np.ndarray, TemplateStats]:
+    """Template spectrum (LRU-cached per frame size) and stats for the FFT."""
+    shape = frame.spectrum(level).shape
+    key = (name, level, shape)
+    with _spec_lock:
+        spec = _spec_cache.get(key)
+        if spec is not None:
+            _spec_cache.move_to_end(key)
+    if spec is None:
+        spec = _template_spectrum(tmpl, shape)
+        with _spec_lock:
+            _spec_cache[key] = spec
+            while len(_spec_cache) > SPEC_CACHE_SIZE:
+                _spec_cache.popitem(last=False)
+    return spec, _template_stats(name, level, tmpl)
+
+
+def _correlate(frame: ScreenFrame, name: str, level: int = 0) -> np.ndarray:
+    """TM_CCOEFF_NORMED map of a template over a whole pyramid level.
+
+    Uses whichever backend the cost model predicts to be faster; both
+    give the same scores within float tolerance.
+    """
+    gray = frame.pyramid(level)
+    tmpl = _load_pyr(name, level) if level else _load(name)
+    if choose_backend(gray.shape, tmpl.shape) == "spatial":
+        return cv2.matchTemplate(gray, tmpl, cv2.TM_CCOEFF_NORMED)
+    spec, stats = _fft_inputs(frame, name, level, tmpl)
+    return _fft_correlate(frame, level, tmpl.shape, spec, stats)
+
+
+# ── Peak extraction ──────────────────────────────────────────────────
+
+_PEAK_KERNEL = np.ones((3, 3), np.uint8)
+
+
+def _local_peaks(
+    result: np.ndarray, threshold: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Local maxima of a result map above threshold (dilate-and-compare).
+
+    Returns (xs, ys, conf) sorted by confidence (best first), raster
+    order among equal scores.
+    """
+    mask = result >= threshold
+    if not mask.any():
+        empty = np.empty(0, np.intp)
+        return empty, empty, np.empty(0, np.float32)
+    mask &= result >= cv2.dilate(result, _PEAK_KERNEL)
+    ys, xs = np.nonzero(mask)
+    conf = result[ys, xs]
+    order = np.argsort(-conf, kind="stable")
+    return xs[order], ys[order], conf[order]
+
+
+def _suppress(xs: np.ndarray, ys: np.ndarray, radius: int) -> np.ndarray:
+    """Greedy non-maximum suppression over peaks sorted best-first.
+
+    A peak is dropped if a better kept peak lies within `radius` pixels
+    on both axes. Returns the indices of the kept peaks.
+    """
+    suppressed = np.zeros(len(xs), bool)
+    keep = []
+    for i in range(len(xs)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= (np.abs(xs - xs[i]) <= radius) & (np.abs(ys - ys[i]) <= radius)
+    return np.asarray(keep, np.intp)
+
+
+def _coarse_peaks(
+    result: np.ndarray, threshold: float, limit: int | None
+) -> list[tuple[int, int]]:
+    """Local maxima of a coarse result map above threshold, best first."""
+    xs, ys, _ = _local_peaks(result, threshold)
+    if limit is not None:
+        xs, ys = xs[:limit], ys[:limit]
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def _pyramid_windows(
+    frame: ScreenFrame,
+    template_name: str,
+    threshold: float,
+    limit: int | None,
+) -> list[tuple[int, int, np.ndarray]]:
+    """Coarse-to-fine search. Returns full-res result windows (x0, y0, result).
+
+    Each window holds full-resolution TM_CCOEFF_NORMED scores for top-left
+    positions (x0 + col, y0 + row) — the same values (up to float rounding)
+    a full-frame matchTemplate would give, just computed for a small area.
+    """
+    tmpl = _load(template_name)
+    th, tw = tmpl.shape[:2]
+    gray = frame.gray
+    h, w = gray.shape[:2]
+    level = _pyramid_level(tmpl)
+
+    if level == 0:
+        return [(0, 0, _correlate(frame, template_name))]
+
+    small = frame.pyramid(level)
+    small_tmpl = _load_pyr(template_name, level)
+    if small.shape[0] < small_tmpl.shape[0] or small.shape[1] < small_tmpl.shape[1]:
+        return []
+
+    coarse = _correlate(frame, template_name, level)
+    peaks = _coarse_peaks(coarse, threshold - PYRAMID_SLACK, limit)
+
+    factor = 1 << level
+    margin = 2 * factor
+    windows = []
+    for px, py in peaks:
+        x0 = max(0, px * factor - margin)
+        y0 = max(0, py * factor - margin)
+        x1 = min(w, px * factor + tw + margin)
+        y1 = min(h, py * factor + th + margin)
+        if x1 - x0 < tw or y1 - y0 < th:
+            continue
+        result = cv2.matchTemplate(gray[y0:y1, x0:x1], tmpl, cv2.TM_CCOEFF_NORMED)
+        windows.append((x0, y0, result))
+    return windows
+
+
+def _best_in_windows(
+    windows: list[tuple[int, int, np.ndarray]],
+) -> tuple[float, tuple[int, int]] | None:
+    """Best (max_val, top-left) over all windows, first in raster order on ties."""
+    best = None
+    for x0, y0, result in windows:
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        loc = (max_loc[0] + x0, max_loc[1] + y0)
+        if (
+            best is None
+            or max_val > best[0]
+            or (max_val == best[0] and (loc[1], loc[0]) < (best[1][1], best[1][0]))
+        ):
+            best = (max_val, loc)
+    return best
+
+
+# ── Spatial priors ───────────────────────────────────────────────────
+
+# Remember where each template was seen and search there before the full
+# frame. The margin stays below half a modal row so a stale prior can't
+# pick up the neighbouring row; like the other offsets it is scaled.
+PRIOR_MARGIN = 48  # px added around remembered boxes at scale 1.0
+PRIOR_DECAY = 0.7  # weight multiplier for old boxes on every new sighting
+PRIOR_MIN_WEIGHT = 0.1  # boxes below this weight are forgotten
+PRIOR_MAX_BOXES = 8
+
+
+@dataclass
+class PriorStats:
+    """Per-template counters for prior-guided lookups."""
+
+    hits: int = 0  # found inside the prior ROI
+    misses: int = 0  # ROI searched without success → full frame
+    cold: int = 0  # no prior yet → full frame
+    roi_time: float = 0.0  # seconds spent searching ROIs
+    full_time: float = 0.0  # seconds spent searching full frames
+
+
+_priors: dict[str, list[list[float]]] = {}  # name → [[x0, y0, x1, y1, weight]]
+_prior_stats: dict[str, PriorStats] = {}
+_prior_lock = threading.Lock()
+
+
+def get_prior_stats() -> dict[str, PriorStats]:
+    """Snapshot of hit/miss statistics per template."""
+    with _prior_lock:
+        return {name: replace(st) for name, st in _prior_stats.items()}
+
+
+def reset_priors() -> None:
+    """Forget all remembered locations and statistics."""
+    with _prior_lock:
+        _priors.clear()
+        _prior_stats.clear()
+
+
+def _prior_roi(
+    name: str, width: int, height: int, column: bool
+) -> tuple[int, int, int, int] | None:
+    """Expanded bounding box of the remembered boxes, clipped to the frame.
+
+    With `column`, the ROI spans the full frame height (x-band only).
+    """
+    with _prior_lock:
+        boxes = _priors.get(name)
+        if not boxes:
+            return None
+        margin = round(PRIOR_MARGIN * _scale)
+        x0 = max(0, int(min(b[0] for b in boxes)) - margin)
+        y0 = max(0, int(min(b[1] for b in boxes)) - margin)
+        x1 = min(width, int(max(b[2] for b in boxes)) + margin)
+        y1 = min(height, int(max(b[3] for b in boxes)) + margin)
+    if column:
+        y0, y1 = 0, height
+    return x0, y0, x1, y1
+
+
+def _prior_observe(name: str, box: tuple[int, int, int, int]) -> None:
+    """Add a sighting; older boxes decay and eventually drop out."""
+    with _prior_lock:
+        boxes = _priors.get(name, [])
+        for b in boxes:
+            b[4] *= PRIOR_DECAY
+        boxes = [b for b in boxes if b[4] >= PRIOR_MIN_WEIGHT]
+        boxes.append([*box, 1.0])
+        _priors[name] = boxes[-PRIOR_MAX_BOXES:]
+
+
+def _prior_search(
+    frame: ScreenFrame,
+    name: str,
+    column: bool,
+    search: Callable[[ScreenFrame], list[tuple[int, int, float]]],
+) -> list[tuple[int, int, float]]:
+    """Run `search` on the prior ROI first, on the full frame on a miss.
+
+    `search` returns top-left hits (x, y, confidence); empty means not found.
+    """
+    th, tw = _load(name).shape[:2]
+    roi = _prior_roi(name, frame.width, frame.height, column)
+    roi_time = 0.0
+    hits: list[tuple[int, int, float]] = []
+
+    if roi is not None and roi[2] - roi[0] >= tw and roi[3] - roi[1] >= th:
+        t0 = time.perf_counter()
+        hits = [(x + roi[0], y + roi[1], c) for x, y, c in search(frame.crop(*roi))]
+        roi_time = time.perf_counter() - t0
+
+    full_time = 0.0
+    if not hits:
+        t0 = time.perf_counter()
+        hits = search(frame)
+        full_time = time.perf_counter() - t0
+
+    with _prior_lock:
+        st = _prior_stats.setdefault(name, PriorStats())
+        if roi is None:
+            st.cold += 1
+        elif full_time:
+            st.misses += 1
+        else:
+            st.hits += 1
+        st.roi_time += roi_time
+        st.full_time += full_time
+
+    if hits:
+        _prior_observe(
+            name,
+            (
+                min(x for x, _, _ in hits),
+                min(y for _, y, _ in hits),
+                max(x for x, _, _ in hits) + tw,
+                max(y for _, y, _ in hits) + th,
+            ),
+        )
+    return hits
+
+
+# ── Search primitives (top-left coordinates) ─────────────────────────
+
+
+def _background_score(
+    windows: list[tuple[int, int, np.ndarray]],
+    hits: list[tuple[int, int]],
+    tw: int,
+    th: int,
+) -> float | None:
+    """Best score outside the hits (each masked by one template size).
+
+    Used for threshold calibration: the strongest look-alike elsewhere.
+    """
+    best = None
+    for x0, y0, result in windows:
+        masked = result.copy() if hits else result
+        for x, y in hits:
+            lx, ly = int(x) - x0, int(y) - y0
+            masked[
+                max(0, ly - th // 2) : max(0, ly + th // 2 + 1),
+                max(0, lx - tw // 2) : max(0, lx + tw // 2 + 1),
+            ] = -1.0
+        _, max_val, _, _ = cv2.minMaxLoc(masked)
+        if best is None or max_val > best:
+            best = float(max_val)
+    return best
+
+
+def _search_best(
+    frame: ScreenFrame,
+    template_name: str,
+    threshold: float,
+    pyramid: bool,
+    probe: Probe | None = None,
+) -> list[tuple[int, int, float]]:
+    """Best match at or above threshold as [(x, y, conf)], or []."""
+    tmpl = _load(template_name)
+    th, tw = tmpl.shape[:2]
+    if probe:
+        probe.searched(frame)
+    if pyramid:
+        windows = _pyramid_windows(
+            frame, template_name, threshold, PYRAMID_MAX_CANDIDATES
+        )
+        best = _best_in_windows(windows)
+        if best is None:
+            return []
+        max_val, max_loc = best
+    else:
+        if frame.height < th or frame.width < tw:
+            return []
+        result = _correlate(frame, template_name)
+        windows = [(0, 0, result)]
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+
+    found = max_val >= threshold
+    if probe:
+        probe.observe(frame, max_loc[0], max_loc[1], tw, th, float(max_val))
+        if calibrating():
+            hits = [max_loc] if found else []
+            probe.calibration(
+                [float(max_val)] if found else [],
+                _background_score(windows, hits, tw, th),
+            )
+    if not found:
+        return []
+    return [(max_loc[0], max_loc[1], float(max_val))]
+
+
+def _search_all(
+    frame: ScreenFrame,
+    template_name: str,
+    threshold: float,
+    pyramid: bool,
+    min_distance: int,
+    probe: Probe | None = None,
+) -> list[tuple[int, int, float]]:
+    """All separated peaks at or above threshold, best first."""
+    tmpl = _load(template_name)
+    th, tw = tmpl.shape[:2]
+    if probe:
+        probe.searched(frame)
+    if frame.height < th or frame.width < tw:
+        return []
+
+    if pyramid:
+        windows = _pyramid_windows(frame, template_name, threshold, None)
+    else:
+        windows = [(0, 0, _correlate(frame, template_name))]
+
+    xs_parts, ys_parts, conf_parts = [], [], []
+    for x0, y0, result in windows:
+        px, py, pc = _local_peaks(result, threshold)
+        xs_parts.append(px + x0)
+        ys_parts.append(py + y0)
+        conf_parts.append(pc)
+    if not any(len(px) for px in xs_parts):
+        # Miss: report the best sub-threshold score (near-miss telemetry)
+        best = _best_in_windows(windows) if probe else None
+        if best is not None:
+            max_val, (x, y) = best
+            probe.observe(frame, x, y, tw, th, float(max_val))
+            if calibrating():
+                probe.calibration([], float(max_val))
+        return []
+    xs = np.concatenate(xs_parts)
+    ys = np.concatenate(ys_parts)
+    conf = np.concatenate(conf_parts)
+
+    # Best confidence first, raster order among ties (windows may overlap;
+    # duplicates of one position are removed by the suppression below)
+    order = np.lexsort((xs, ys, -conf))
+    xs, ys, conf = xs[order], ys[order], conf[order]
+    keep = _suppress(xs, ys, min_distance)
+    if probe:
+        probe.observe(frame, int(xs[0]), int(ys[0]), tw, th, float(conf[0]))
+        if calibrating():
+            probe.calibration(
+                [float(conf[i]) for i in keep],
+                _background_score(windows, [(xs[i], ys[i]) for i in keep], tw, th),
+            )
+
+    return [(int(xs[i]), int(ys[i]), float(conf[i])) for i in keep]
+
+
+# ── Public API ───────────────────────────────────────────────────────
+
+
 def find_template(
-    screenshot_bgr: np.ndarray,
+    screenshot: ScreenFrame | np.ndarray,
     template_name: str,
-    threshold: float = 0.8,
+    threshold: float | None = None,
+    pyramid: bool = False,
+    prior: bool = False,
 ) -> tuple[int, int] | None:
     """Find a template in a screenshot. Returns center (x, y) or None.
 
     Args:
-        screenshot_bgr: Screenshot as BGR numpy array (from mss/PIL).
+        screenshot: ScreenFrame, or BGR numpy array (from mss/PIL).
         template_name: Filename in templates/ directory.
-        threshold: Minimum match confidence (0-1).
+        threshold: Minimum match confidence (0-1). None uses the
+            template's calibrated threshold (see thresholds.py).
+        pyramid: Coarse-to-fine search (downscaled first, refine around
+            the best candidates). Much faster on large monitors.
+        prior: Search around where this template was last seen first and
+            fall back to the full frame on a miss (see get_prior_stats).
 
     Returns:
         (x, y) center of best match, or None if below threshold.
     """
-    gray = cv2.cvtColor(screenshot_bgr, cv2.COLOR_BGR2GRAY)
-    tmpl = _load(template_name)
-    th, tw = tmpl.shape[:2]
+    frame = as_frame(screenshot)
+    th, tw = _load(template_name).shape[:2]
+    if threshold is None:
+        threshold = threshold_for(template_name)
+    probe = Probe(template_name, threshold)
 
-    result = cv2.matchTemplate(gray, tmpl, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    def search(f: ScreenFrame) -> list[tuple[int, int, float]]:
+        return _search_best(f, template_name, threshold, pyramid, probe)
 
-    if max_val < threshold:
+    if prior:
+        hits = _prior_search(frame, template_name, False, search)
+    else:
+        hits = search(frame)
+    probe.finish(bool(hits))
+    if not hits:
         return None
 
-    # max_loc is top-left corner, return center
-    cx = max_loc[0] + tw // 2
-    cy = max_loc[1] + th // 2
-    return cx, cy
+    # Hits are top-left corners, return center
+    x, y, _ = hits[0]
+    return x + tw // 2, y + th // 2
 
 
 def find_all_templates(
-    screenshot_bgr: np.ndarray,
+    screenshot: ScreenFrame | np.ndarray,
     template_name: str,
-    threshold: float = 0.8,
+    threshold: float | None = None,
+    pyramid: bool = False,
+    min_distance: int | None = None,
+    prior: bool = False,
 ) -> list[tuple[int, int, float]]:
-    """Find ALL occurrences of a template. Returns list of (x, y, confidence)."""
-    gray = cv2.cvtColor(screenshot_bgr, cv2.COLOR_BGR2GRAY)
-    tmpl = _load(template_name)
-    th, tw = tmpl.shape[:2]
+    """Find ALL occurrences of a template. Returns list of (x, y, confidence).
 
-    result = cv2.matchTemplate(gray, tmpl, cv2.TM_CCOEFF_NORMED)
-    locations = np.where(result >= threshold)
+    Only local maxima of the match map count as hits; hits closer than
+    `min_distance` pixels (default: a third of the template's smaller
+    side) to a better hit are dropped. Sorted by confidence, best first.
+    With `prior`, the column where the template was last seen is searched
+    first (full frame height), the whole frame only if nothing is there.
+    A threshold of None uses the template's calibrated threshold.
+    """
+    frame = as_frame(screenshot)
+    th, tw = _load(template_name).shape[:2]
+    if threshold is None:
+        threshold = threshold_for(template_name)
+    if min_distance is None:
+        min_distance = max(1, round(min(th, tw) * NMS_RADIUS_FRACTION))
 
-    matches = []
-    for pt_y, pt_x in zip(*locations):
-        cx = pt_x + tw // 2
-        cy = pt_y + th // 2
-        conf = result[pt_y, pt_x]
-        matches.append((cx, cy, float(conf)))
+    probe = Probe(template_name, threshold)
 
-    # Deduplicate nearby matches (within 20px)
-    if not matches:
-        return []
+    def search(f: ScreenFrame) -> list[tuple[int, int, float]]:
+        return _search_all(f, template_name, threshold, pyramid, min_distance, probe)
 
-    matches.sort(key=lambda m: -m[2])  # best confidence first
-    filtered = []
-    for m in matches:
-        if all(abs(m[0] - f[0]) > 20 or abs(m[1] - f[1]) > 20 for f in filtered):
-            filtered.append(m)
+    if prior:
+        hits = _prior_search(frame, template_name, True, search)
+    else:
+        hits = search(frame)
+    probe.finish(bool(hits))
 
-    return filtered
+    return [(x + tw // 2, y + th // 2, c) for x, y, c in hits]
 
 
 def find_button_in_row(
-    screenshot_bgr: np.ndarray,
+    screenshot: ScreenFrame | np.ndarray,
     row_template: str,
-    row_threshold: float = 0.8,
-    button_offset_x: int = 555,
+    row_threshold: float | None = None,
+    button_offset_x: int | None = None,
+    pyramid: bool = False,
+    prior: bool = False,
 ) -> tuple[int, int] | None:
     """Find a row icon template, then return the Download button position.
 
     Locates the row by its icon (MP3/RAW/LRC/VIDEO), then returns
-    coordinates offset to the right where the Download button sits.
+    coordinates offset to the right where the Download button sits
+    (default: BUTTON_OFFSET_X at the session scale).
     """
-    gray = cv2.cvtColor(screenshot_bgr, cv2.COLOR_BGR2GRAY)
-    row_tmpl = _load(row_template)
-    rh, rw = row_tmpl.shape[:2]
+    if button_offset_x is None:
+        button_offset_x = round(BUTTON_OFFSET_X * _scale)
+    icon = find_template(
+        screenshot, row_template, row_threshold, pyramid=pyramid, prior=prior
+    )
+    if icon is None:
+        return None
 
-    result = cv2.matchTemplate(gray, row_tmpl, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    # Download button is button_offset_x pixels to the right of the icon center
+    icon_cx, icon_cy = icon
+    return icon_cx + button_offset_x, icon_cy
 
-    if max_val < row_threshold:
-        return None
 
-    # Icon center
-    icon_cx = max_loc[0] + rw // 2
-    icon_cy = max_loc[1] + rh // 2
+# ── Batch matching ───────────────────────────────────────────────────
 
-    # Download button is button_offset_x pixels to the right of the icon center
-    btn_x = icon_cx + button_offset_x
-    btn_y = icon_cy
-    return btn_x, btn_y
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Get or start the shared matcher thread pool."""
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=FIND_MANY_WORKERS, thread_name_prefix="template-match"
+        )
+    return _pool
+
+
+def _threshold_of(
+    threshold: float | Mapping[str, float] | None, name: str
+) -> float | None:
+    """Threshold for `name` from a number, a per-name mapping or None."""
+    if isinstance(threshold, Mapping):
+        return threshold.get(name)
+    return threshold
+
+
+def find_many(
+    screenshot: ScreenFrame | np.ndarray,
+    template_names: Iterable[str],
+    threshold: float | Mapping[str, float] | None = None,
+    pyramid: bool = False,
+    prior: bool = False,
+) -> dict[str, tuple[int, int] | None]:
+    """Match several templates against one frame in a single call.
+
+    Each template is searched like find_template, fanned out over a small
+    thread pool. Returns {template_name: (x, y) center or None}.
+
+    Args:
+        threshold: One threshold for all templates, a per-name mapping,
+            or None for each template's calibrated threshold (also used
+            for names missing from the mapping).
+    """
+    frame = as_frame(screenshot)
+    names = list(dict.fromkeys(template_names))
+
+    # Do all lazy, cached work up front (pyramid levels, frame and template
+    # spectra) so the workers only read shared state
+    for name in names:
+        level = _pyramid_level(_load(name)) if pyramid else 0
+        gray = frame.pyramid(level)
+        tmpl = _load_pyr(name, level) if level else _load(name)
+        fits = gray.shape[0] >= tmpl.shape[0] and gray.shape[1] >= tmpl.shape[1]
+        if fits and choose_backend(gray.shape, tmpl.shape) == "fft":
+            _fft_inputs(frame, name, level, tmpl)
+
+    def _limit(name: str) -> float | None:
+        return _threshold_of(threshold, name)
+
+    if len(names) <= 1 or FIND_MANY_WORKERS <= 1:
+        return {n: find_template(frame, n, _limit(n), pyramid, prior) for n in names}
+
+    futures = {
+        n: _get_pool().submit(find_template, frame, n, _limit(n), pyramid, prior)
+        for n in names
+    }
+    return {n: f.result() for n, f in futures.items()}
+
+
+# ── Download modal ───────────────────────────────────────────────────
+
+
+def resolve_modal(
+    screenshot: ScreenFrame | np.ndarray,
+    threshold: float | Mapping[str, float] | None = None,
+    prior: bool = False,
+) -> dict[str, tuple[int, int]]:
+    """Resolve every Download button of the download modal from one frame.
+
+    Finds the modal (modal.png) first and derives the button column and
+    row positions from its geometry. A row is returned only if its icon
+    is found in it: the modal box is enlarged by 1 / MODAL_ICON_SCALE to
+    the zoom of the icon templates and searched for them. Without a modal
+    match, the row icons are searched in the full frame and offset by
+    BUTTON_OFFSET_X. `threshold` is passed on as in find_many.
+
+    Returns:
+        {format: (x, y) click point} for the rows of "mp3", "raw", "video"
+        and "lrc" that were found — empty if none was.
+    """
+    frame = as_frame(screenshot)
+    names = [tmpl for tmpl, _ in MODAL_ROWS.values()]
+    modal = find_template(
+        frame, MODAL_TEMPLATE, _threshold_of(threshold, MODAL_TEMPLATE), prior=prior
+    )
+
+    if modal is None:
+        icons = find_many(frame, names, threshold, prior=prior)
+        offset = round(BUTTON_OFFSET_X * _scale)
+        return {
+            fmt: (icons[tmpl][0] + offset, icons[tmpl][1])
+            for fmt, (tmpl, _) in MODAL_ROWS.items()
+            if icons[tmpl]
+        }
+
+    mh, mw = _load(MODAL_TEMPLATE).shape[:2]
+    mx, my = modal[0] - mw // 2, modal[1] - mh // 2
+    box = frame.crop(mx, my, mx + mw, my + mh).gray
+    zoom = 1 / MODAL_ICON_SCALE
+    zoomed = cv2.resize(box, None, fx=zoom, fy=zoom, interpolation=cv2.INTER_LINEAR)
+    icons = find_many(ScreenFrame(zoomed), names, threshold)
+
+    btn_x = mx + round(MODAL_BUTTON_X * mw)
+    pitch = MODAL_ROW_PITCH * mh
+    points = {}
+    for fmt, (tmpl, row_y) in MODAL_ROWS.items():
+        y = my + round(row_y * mh)
+        icon = icons[tmpl]
+        # Only a row whose own icon was seen in it is clicked
+        if icon and abs(my + icon[1] / zoom - y) < pitch / 2:
+            points[fmt] = (btn_x, y)
+    return points
+
+
+# ── Scale calibration ────────────────────────────────────────────────
+
+
+def get_scale() -> float:
+    """Current session scale applied to all templates."""
+    return _scale
+
+
+def set_scale(scale: float) -> None:
+    """Rescale all templates once to `scale` and cache them.
+
+    Clears the spatial priors, since remembered boxes were found at the
+    old template size, and re-checks the template bundle.
+    """
+    global _scale
+    _scale = scale
+    _reload_bundle()
+    _cache.clear()
+    _pyr_cache.clear()
+    _stats_cache.clear()
+    with _spec_lock:
+        _spec_cache.clear()
+    reset_priors()
+    for path in sorted(TEMPLATES_DIR.glob("*.png")):
+        _load(path.name)
+
+
+def _best_scale(
+    gray: np.ndarray, raw: np.ndarray, scales: Iterable[float], factor: float
+) -> tuple[float, float, tuple[int, int]]:
+    """Best (score, scale, top-left) of `raw` resized by scale * factor."""
+    best = (-1.0, 1.0, (0, 0))
+    for scale in scales:
+        tmpl = rescale(raw, scale * factor)
+        th, tw = tmpl.shape[:2]
+        if min(th, tw) < 8 or th > gray.shape[0] or tw > gray.shape[1]:
+            continue
+        result = cv2.matchTemplate(gray, tmpl, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val > best[0]:
+            best = (max_val, scale, max_loc)
+    return best
+
+
+def calibrate_scale(
+    screenshot: ScreenFrame | np.ndarray,
+    threshold: float = 0.8,
+    template_name: str = SCALE_TEMPLATE,
+) -> float | None:
+    """Detect the screen scale of the templates and apply it (see set_scale).
+
+    Matches `template_name` (default: the download icon, visible on every
+    song list) across SCALE_MIN..SCALE_MAX: a coarse pass on the
+    half-resolution frame, then a fine pass at full resolution around the
+    best hit. Returns the detected scale, or None (scale unchanged) if no
+    scale reaches `threshold`.
+    """
+    frame = as_frame(screenshot)
+    raw = _load_raw(template_name)
+
+    coarse = np.arange(SCALE_MIN, SCALE_MAX + 1e-9, SCALE_COARSE_STEP)
+    _, scale, loc = _best_scale(frame.pyramid(1), raw, coarse, 0.5)
+
+    # Full-resolution window around the coarse hit, large enough for the
+    # biggest template in the fine range
+    reach = SCALE_COARSE_STEP
+    fine = np.arange(scale - reach, scale + reach + 1e-9, SCALE_FINE_STEP)
+    fine = fine[(fine >= SCALE_MIN - 1e-9) & (fine <= SCALE_MAX + 1e-9)]
+    th, tw = (round(side * (scale + reach)) for side in raw.shape[:2])
+    x0, y0 = max(0, loc[0] * 2 - tw // 2), max(0, loc[1] * 2 - th // 2)
+    window = frame.gray[y0 : y0 + 2 * th, x0 : x0 + 2 * tw]
+    score, scale, _ = _best_scale(window, raw, fine, 1.0)
+
+    if score < threshold:
+        return None
+    scale = round(float(scale), 2)
+    if scale != _scale:
+        set_scale(scale)
+    return scale
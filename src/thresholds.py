@@ -0,0 +1,190 @@
+"""Per-template match thresholds, calibrated from observed confidences.
+
+In calibration mode every lookup contributes two kinds of samples:
+true hits (the scores of accepted matches) and background (the best
+score left in the searched area once the hits are masked out — the
+strongest look-alike). A miss's best score counts as background only
+if no hit of the same template follows within RETRY_WINDOW seconds:
+misses that are retried successfully mostly scored the target while it
+was still animating in. At the end of the run each template gets the
+threshold that minimizes the expected cost of retries (hits below it)
+and misclicks (background above it).
+
+Results are stored in data/thresholds.json next to config.json. An
+"override" value in that file wins over the calibrated one, and an
+explicit threshold passed to a matcher wins over both.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .template_bundle import DATA_DIR
+
+THRESHOLDS_FILE = DATA_DIR / "thresholds.json"
+DEFAULT_THRESHOLD = 0.8
+THRESHOLD_MIN = 0.5
+THRESHOLD_MAX = 0.95
+MIN_SAMPLES = 5  # per class, otherwise the template is left uncalibrated
+MISS_COST = 1.0  # a hit below the threshold costs a retry
+FALSE_HIT_COST = 2.0  # background above it costs a misclick + recovery
+RETRY_WINDOW = 30.0  # s; a miss followed by a hit this soon was a retry
+
+_lock = threading.Lock()
+_table: dict[str, dict] | None = None  # contents of THRESHOLDS_FILE
+_collecting = False
+_samples: dict[str, tuple[list[float], list[float]]] = {}
+_pending: dict[str, list[tuple[float, float]]] = {}  # misses: (time, score)
+
+
+@dataclass
+class Calibration:
+    """Calibration result of one template."""
+
+    threshold: float
+    hits: int
+    background: int
+    hit_low: float  # weakest accepted hit
+    background_high: float  # strongest look-alike
+    calibrated: str  # date
+
+
+def _read(path: Path) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def threshold_for(name: str, default: float = DEFAULT_THRESHOLD) -> float:
+    """Threshold for a template: override, else calibrated, else `default`."""
+    global _table
+    with _lock:
+        if _table is None:
+            _table = _read(THRESHOLDS_FILE)
+        entry = _table.get(name) or {}
+    for key in ("override", "threshold"):
+        if isinstance(entry.get(key), (int, float)):
+            return float(entry[key])
+    return default
+
+
+def reload_thresholds() -> None:
+    """Re-read THRESHOLDS_FILE on the next lookup (after manual edits)."""
+    global _table
+    with _lock:
+        _table = None
+
+
+# ── Calibration ──────────────────────────────────────────────────────
+
+
+def start_calibration() -> None:
+    """Start collecting hit/background confidences for every template."""
+    global _collecting
+    with _lock:
+        _samples.clear()
+        _pending.clear()
+        _collecting = True
+
+
+def calibrating() -> bool:
+    return _collecting
+
+
+def collect(name: str, hits: Iterable[float], background: float | None) -> None:
+    """Add the samples of one lookup (no-op outside calibration mode).
+
+    With `hits`, `background` is the best score outside them. Without,
+    the lookup missed and its best score is held back until it is clear
+    that no successful retry follows.
+    """
+    if not _collecting:
+        return
+    hits = list(hits)
+    now = time.monotonic()
+    with _lock:
+        hit_list, bg_list = _samples.setdefault(name, ([], []))
+        pending = _pending.setdefault(name, [])
+        while pending and now - pending[0][0] > RETRY_WINDOW:
+            bg_list.append(pending.pop(0)[1])
+        if hits:
+            pending.clear()  # retried successfully: those misses saw the target
+            hit_list.extend(hits)
+            if background is not None:
+                bg_list.append(background)
+        elif background is not None:
+            pending.append((now, background))
+
+
+def derive_threshold(
+    hits: Iterable[float], background: Iterable[float]
+) -> float | None:
+    """Cost-minimizing threshold, or None with too few samples.
+
+    All thresholds on a 0.01 grid with minimal expected cost form an
+    interval (the gap between the classes when they separate); the result
+    sits in it at FALSE_HIT_COST / (MISS_COST + FALSE_HIT_COST) of the way
+    from the background side, since misclicks cost more than retries.
+    """
+    hits = np.asarray(list(hits), np.float64)
+    background = np.asarray(list(background), np.float64)
+    if len(hits) < MIN_SAMPLES or len(background) < MIN_SAMPLES:
+        return None
+
+    grid = np.round(np.arange(THRESHOLD_MIN, THRESHOLD_MAX + 0.005, 0.01), 2)
+    cost = MISS_COST * (hits[None, :] < grid[:, None]).mean(axis=1)
+    cost += FALSE_HIT_COST * (background[None, :] >= grid[:, None]).mean(axis=1)
+    best = grid[cost <= cost.min() + 1e-9]
+    lo, hi = float(best.min()), float(best.max())
+    return round(lo + (hi - lo) * FALSE_HIT_COST / (MISS_COST + FALSE_HIT_COST), 2)
+
+
+def finish_calibration(path: Path = THRESHOLDS_FILE) -> dict[str, Calibration]:
+    """Stop collecting, derive thresholds and merge them into `path`.
+
+    Overrides already in the file are kept. Returns the new calibrations.
+    """
+    global _collecting, _table
+    with _lock:
+        _collecting = False
+        for name, pending in _pending.items():
+            _samples.setdefault(name, ([], []))[1].extend(b for _, b in pending)
+        samples = {name: (list(h), list(b)) for name, (h, b) in _samples.items()}
+        _samples.clear()
+        _pending.clear()
+
+    results = {}
+    today = time.strftime("%Y-%m-%d")
+    for name, (hits, background) in sorted(samples.items()):
+        threshold = derive_threshold(hits, background)
+        if threshold is None:
+            continue
+        results[name] = Calibration(
+            threshold,
+            len(hits),
+            len(background),
+            round(min(hits), 4),
+            round(max(background), 4),
+            today,
+        )
+
+    if results:
+        table = _read(path)
+        for name, cal in results.items():
+            entry = table.setdefault(name, {})
+            entry.update(asdict(cal))
+            entry.setdefault("override", None)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(table, indent=2) + "\n", encoding="utf-8")
+    with _lock:
+        _table = None
+    return results
@@ -39,7 +39,7 @@ def ask_vlm(
     so we use the raw generate API instead of chat to avoid double-wrapping.
 
     Args:
-        screenshot_b64: Base64-encoded PNG screenshot.
+        screenshot_b64: Base64-encoded screenshot (PNG, JPEG or WebP).
         task: The task description / instruction for the agent.
         action_history: Optional list of previous Thought+Action strings.
 
@@ -0,0 +1,16 @@
+"""Shared fixtures: keep generated data files out of the repo's data/."""
+
+import pytest
+
+from src import template_bundle, template_match
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _data_dir(tmp_path_factory):
+    """Build the template bundle and the cost model in a temporary directory."""
+    data = tmp_path_factory.mktemp("data")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(template_bundle, "DATA_DIR", data)
+        mp.setattr(template_bundle, "BUNDLE_FILE", data / "templates.bundle")
+        mp.setattr(template_match, "BACKEND_COST_FILE", data / "match_cost.json")
+        yield data
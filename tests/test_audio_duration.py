@@ -0,0 +1,94 @@
+"""Test the in-process MP3 duration reader and its cache."""
+
+import struct
+
+import pytest
+
+from src import audio_duration
+from src.audio_duration import audio_duration as duration_of
+from src.audio_duration import mp3_duration, parse_mp3_duration
+
+# MPEG 1 Layer III, 128 kbit/s, 44.1 kHz, joint stereo: 417-byte frames
+HEADER = 0xFFFB9040
+FRAME_LEN = 417
+SECS_PER_FRAME = 1152 / 44100
+
+
+def _frame(payload=b""):
+    body = struct.pack(">I", HEADER) + payload
+    return body + b"\0" * (FRAME_LEN - len(body))
+
+
+def _id3v2(body):
+    syncsafe = bytes((len(body) >> s) & 0x7F for s in (21, 14, 7, 0))
+    return b"ID3\x04\x00\x00" + syncsafe + body
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    audio_duration.clear_cache()
+    yield
+    audio_duration.clear_cache()
+
+
+def test_cbr_duration_from_the_frame_count(tmp_path):
+    path = tmp_path / "cbr.mp3"
+    # ID3v2 tag with a false sync word inside, 2000 frames, ID3v1 tag
+    tag = _id3v2(b"\0" * 100 + struct.pack(">I", HEADER) + b"\0" * 5000)
+    path.write_bytes(tag + _frame() * 2000 + b"TAG" + b"\0" * 125)
+    # bytes / bitrate: 2000 * 417 * 8 / 128000 s
+    assert mp3_duration(str(path)) == pytest.approx(52.125)
+
+
+@pytest.mark.parametrize(
+    "first",
+    [
+        _frame(b"\0" * 32 + b"Xing" + struct.pack(">II", 1, 9000)),
+        _frame(b"\0" * 32 + b"VBRI" + b"\0" * 10 + struct.pack(">I", 9000)),
+    ],
+)
+def test_vbr_duration_from_the_header(tmp_path, first):
+    path = tmp_path / "vbr.mp3"
+    path.write_bytes(first + _frame() * 10)
+    assert mp3_duration(str(path)) == pytest.approx(9000 * SECS_PER_FRAME)
+
+
+def test_info_header_without_frame_count_falls_back_to_cbr(tmp_path):
+    path = tmp_path / "info.mp3"
+    # Flags bit 0 unset: the frame count field is not valid
+    info = _frame(b"\0" * 32 + b"Info" + struct.pack(">II", 0, 9000))
+    path.write_bytes(info + _frame() * 99)
+    assert mp3_duration(str(path)) == pytest.approx(100 * FRAME_LEN * 8 / 128000)
+
+
+def test_a_sync_whose_next_frame_is_cut_off_does_not_count():
+    false_sync = b"\0" * 1000 + struct.pack(">I", HEADER) + b"\0" * 20
+    assert parse_mp3_duration(false_sync, 10**6) is None
+    # A single frame that ends exactly with the data is fine
+    assert parse_mp3_duration(_frame(), FRAME_LEN) == pytest.approx(
+        FRAME_LEN * 8 / 128000
+    )
+
+
+def test_each_file_is_read_once_and_odd_files_go_to_ffprobe(tmp_path, monkeypatch):
+    parsed, probes = [], []
+    parse = audio_duration.mp3_duration
+    monkeypatch.setattr(
+        audio_duration, "mp3_duration", lambda p: parsed.append(p) or parse(p)
+    )
+    monkeypatch.setattr(
+        audio_duration, "_ffprobe_duration", lambda p: probes.append(p) or 61.0
+    )
+    song = tmp_path / "song.mp3"
+    song.write_bytes(_frame() * 100)
+    odd = tmp_path / "odd.mp3"
+    odd.write_bytes(b"not an mp3" * 100)
+
+    for _ in range(2):
+        assert duration_of(str(song)) == pytest.approx(100 * FRAME_LEN * 8 / 128000)
+        assert duration_of(str(odd)) == 61.0
+    assert parsed == [str(song), str(odd)] and probes == [str(odd)]
+
+    song.write_bytes(_frame() * 200)  # rewritten: size and mtime change
+    assert duration_of(str(song)) == pytest.approx(200 * FRAME_LEN * 8 / 128000)
+    assert len(parsed) == 3
@@ -0,0 +1,33 @@
+"""Test the synthetic-screen helpers behind the offline benchmarks."""
+
+import numpy as np
+
+from benchmarks.bench_accuracy import Tally
+from benchmarks.synthetic import compose, make_background, template_size
+from src.template_match import find_template
+
+
+def test_compose_places_templates_at_known_centers():
+    rng = np.random.default_rng(0)
+    background = make_background(800, 600, rng)
+    frame, centers = compose(
+        background, [("modal_mp3.png", 100, 200)], rng, noise=3.0, occlusion=0.1
+    )
+    tw, th = template_size("modal_mp3.png")
+
+    assert centers == [(100 + tw // 2, 200 + th // 2)]
+    assert not np.array_equal(frame, background)
+    hit = find_template(frame, "modal_mp3.png", 0.6)
+    assert hit is not None
+    assert abs(hit[0] - centers[0][0]) <= 3 and abs(hit[1] - centers[0][1]) <= 3
+
+
+def test_tally_precision_recall():
+    tally = Tally("find_all_templates", "full", "1080p", "clean")
+    tally.times = [1.0, 2.0, 3.0]
+    tally.score([(10, 10), (52, 50), (300, 300)], [(10, 12), (50, 50), (90, 90)], 3)
+    s = tally.summary()
+
+    assert (s["tp"], s["fp"], s["fn"]) == (2, 1, 1)
+    assert s["precision"] == s["recall"] == round(2 / 3, 4)
+    assert s["latency_ms_median"] == 2.0
@@ -0,0 +1,143 @@
+"""Test the inotify download watcher and its polling fallback."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from src import download_watcher
+from src.download_watcher import (
+    DownloadEvent,
+    DownloadTracker,
+    DownloadWatcher,
+    wait_for,
+)
+
+
+def _download_later(directory, name, delay=0.2):
+    """Write `name` the way Chrome does: a .crdownload file, then a rename."""
+
+    def run():
+        time.sleep(delay)
+        tmp = os.path.join(directory, name + ".crdownload")
+        with open(tmp, "w") as f:
+            f.write("data")
+        os.rename(tmp, os.path.join(directory, name))
+
+    t = threading.Thread(target=run)
+    t.start()
+    return t
+
+
+def _new_mp3(directory):
+    return lambda: [f for f in os.listdir(directory) if f.endswith(".mp3")]
+
+
+@pytest.fixture(autouse=True)
+def _stop_shared_watchers():
+    yield
+    download_watcher.stop_watchers()
+
+
+def test_waiters_wake_on_the_rename(tmp_path):
+    probe = DownloadWatcher(str(tmp_path))
+    if not probe.start():
+        pytest.skip("inotify not available")
+    probe.stop()
+    seq = download_watcher.get_watcher(str(tmp_path)).seq
+    _download_later(tmp_path, "song.mp3")
+
+    t0 = time.monotonic()
+    assert wait_for(str(tmp_path), _new_mp3(tmp_path), 5, poll_interval=3) == [
+        "song.mp3"
+    ]
+    assert time.monotonic() - t0 < 1.5  # well below the poll interval
+    time.sleep(0.05)
+    events = download_watcher.get_watcher(str(tmp_path)).events_since(seq)
+    assert DownloadEvent("create", "song.mp3.crdownload") in events
+    assert DownloadEvent("rename", "song.mp3", "song.mp3.crdownload") in events
+
+
+def test_polling_fallback_without_inotify(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_watcher, "_inotify_init", lambda directory: None)
+    watcher = download_watcher.get_watcher(str(tmp_path))
+    assert not watcher.active
+
+    _download_later(tmp_path, "song.mp3", delay=0.1)
+    assert wait_for(str(tmp_path), _new_mp3(tmp_path), 3, poll_interval=0.2)
+
+    t0 = time.monotonic()
+    stop = threading.Event()
+    threading.Timer(0.3, stop.set).start()
+    assert wait_for(str(tmp_path), lambda: None, 5, 0.1, stop.is_set) is None
+    assert time.monotonic() - t0 < 1.0
+
+
+def test_tracker_reports_completion_at_the_final_rename(tmp_path):
+    tracker = DownloadTracker(str(tmp_path))
+    if not tracker.tracking:
+        pytest.skip("inotify not available")
+    d = str(tmp_path)
+
+    def path(name):
+        return os.path.join(d, name)
+
+    # Chrome: unconfirmed temp name, renamed temp name, then the final rename
+    open(path("Unconfirmed 1.crdownload"), "w").close()
+    os.rename(path("Unconfirmed 1.crdownload"), path("v.mp4.crdownload"))
+    # Firefox: an empty placeholder under the final name plus a .part file
+    open(path("a.mp3"), "w").close()
+    open(path("a.mp3.part"), "w").close()
+    # A cancelled download and a file written without any temp name
+    open(path("x.crdownload"), "w").close()
+    os.remove(path("x.crdownload"))
+    with open(path("b.lrc"), "w") as f:
+        f.write("lyrics")
+
+    assert wait_for(d, lambda: tracker.in_progress, 2, 0.05)
+    os.rename(path("a.mp3.part"), path("a.mp3"))
+    assert wait_for(d, lambda: tracker.is_complete(path("a.mp3")), 2, 0.05)
+    assert tracker.in_progress and not tracker.is_complete(path("v.mp4"))
+
+    os.rename(path("v.mp4.crdownload"), path("v.mp4"))
+    assert wait_for(d, lambda: not tracker.in_progress, 2, 0.05)
+    assert tracker.completed == [path("a.mp3"), path("v.mp4")]
+    assert tracker.direct == [path("b.lrc")]
+
+
+def test_rename_pairs_survive_split_reads(monkeypatch):
+    watcher = DownloadWatcher("/nonexistent")
+    watcher._publish([(download_watcher.IN_MOVED_FROM, 7, "a.mp3.crdownload")])
+    watcher._publish([(download_watcher.IN_MOVED_TO, 7, "a.mp3")])
+    assert watcher.events_since(0) == [
+        DownloadEvent("rename", "a.mp3", "a.mp3.crdownload")
+    ]
+    # A MOVED_FROM without its MOVED_TO left the directory
+    monkeypatch.setattr(download_watcher, "MOVE_PAIR_TIMEOUT", 0.0)
+    watcher._publish([(download_watcher.IN_MOVED_FROM, 8, "b.part")])
+    time.sleep(0.01)
+    watcher._publish([])
+    assert watcher.events_since(2) == [DownloadEvent("delete", "b.part")]
+
+
+def test_tracker_rescans_after_a_queue_overflow(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_watcher, "_inotify_init", lambda directory: None)
+    tracker = DownloadTracker(str(tmp_path))
+    watcher = download_watcher.get_watcher(str(tmp_path))
+    for name in ("a.mp3.crdownload", "b.mp3.crdownload"):
+        (tmp_path / name).touch()
+        watcher._publish([(download_watcher.IN_CREATE, 0, name)])
+    assert tracker.in_progress
+
+    # Events lost: a finished, c started, the final rename of b came unpaired
+    (tmp_path / "a.mp3.crdownload").rename(tmp_path / "a.mp3")
+    (tmp_path / "c.mp4.crdownload").touch()
+    watcher._publish([(download_watcher.IN_Q_OVERFLOW, 0, "")])
+    assert tracker.completed == [str(tmp_path / "a.mp3")]
+    assert tracker._pending == {"b.mp3.crdownload", "c.mp4.crdownload"}
+
+    (tmp_path / "b.mp3.crdownload").rename(tmp_path / "b.mp3")
+    watcher._publish([(download_watcher.IN_MOVED_TO, 9, "b.mp3")])
+    assert tracker.is_complete(str(tmp_path / "b.mp3"))
+    assert tracker._pending == {"c.mp4.crdownload"}
@@ -0,0 +1,51 @@
+"""Test the in-memory song folder index."""
+
+from pathlib import Path
+
+from src.folder_index import FolderIndex
+from src.manifest import SONG_EXTENSIONS
+
+
+def _make(root: Path, folder: str, *files: str) -> None:
+    (root / folder).mkdir()
+    for f in files:
+        (root / folder / f).touch()
+
+
+def test_exact_and_fuzzy_lookup_prefer_empty_folders(tmp_path):
+    _make(tmp_path, "01 - Song - 03m45s", "Song.mp3")
+    _make(tmp_path, "02 - Song - 03m45s")
+    _make(tmp_path, "03 - Song - 03m47s")
+    _make(tmp_path, "04 - Other - 03m45s", "Other.mp3", "cert.pdf")
+    _make(tmp_path, "05 - Song - 03m48s")
+    (tmp_path / "notes.txt").touch()
+    index = FolderIndex(str(tmp_path), SONG_EXTENSIONS)
+
+    assert [e.folder for e in index.lookup("Song", 226)] == [
+        "01 - Song - 03m45s",
+        "02 - Song - 03m45s",
+        "03 - Song - 03m47s",
+        "05 - Song - 03m48s",
+    ]
+    assert index.find("Song", "03m45s") == "02 - Song - 03m45s"
+    assert index.find("Song", "03m46s") == "02 - Song - 03m45s"  # ±1s, empty
+    assert index.find("Song", "03m51s") is None
+    assert index.entries["04 - Other - 03m45s"].has_pdf
+    assert not index.is_downloaded("Other", "03m50s")  # no folder: a new song
+
+
+def test_refresh_tracks_moves_and_new_folders(tmp_path):
+    _make(tmp_path, "01 - Song - 03m45s", "Song.mp3")
+    _make(tmp_path, "02 - Song - 03m46s")
+    index = FolderIndex(str(tmp_path), SONG_EXTENSIONS)
+    assert not index.is_downloaded("Song", "03m45s")
+
+    (tmp_path / "02 - Song - 03m46s" / "Song.mp3").touch()
+    assert index.refresh("02 - Song - 03m46s").has_files
+    assert index.is_downloaded("Song", "03m45s")
+    assert index.find("Song", "03m46s") == "02 - Song - 03m46s"
+
+    _make(tmp_path, "03 - Song - 03m44s")
+    index.refresh("03 - Song - 03m44s")
+    assert index.find("Song", "03m45s") == "01 - Song - 03m45s"  # exact wins
+    assert index.find("Song", "03m43s") == "03 - Song - 03m44s"
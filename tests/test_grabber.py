@@ -0,0 +1,87 @@
+"""Test the background frame grabber."""
+
+import time
+
+import numpy as np
+import pytest
+
+from src import grabber, screenshot
+from src.grabber import FrameGrabber, latest_frame
+
+
+class Counter:
+    """Fake capture: 4x4 frames filled with the capture count."""
+
+    def __init__(self, fail_every: int = 0):
+        self.count = 0
+        self.fail_every = fail_every
+
+    def __call__(self):
+        self.count += 1
+        if self.fail_every and self.count % self.fail_every == 0:
+            raise OSError("capture failed")
+        time.sleep(0.005)
+        return np.full((4, 4), self.count % 256, np.uint8)
+
+
+def test_latest_waits_for_a_frame_newer_than_t():
+    g = FrameGrabber(rate_hz=50, size=2, capture=Counter())
+    g.start()
+    try:
+        first = g.latest(timeout=2)
+        assert first is not None and first.gray.shape == (4, 4)
+        t = time.monotonic()
+        fresh = g.latest(newer_than=t, timeout=2)
+        assert fresh.timestamp > t and fresh.gray[0, 0] > first.gray[0, 0]
+        # Chaining on the frame's own timestamp never returns it twice
+        nxt = g.latest(newer_than=fresh.timestamp, timeout=2)
+        assert nxt.timestamp > fresh.timestamp
+        assert len(g._frames) <= 2
+    finally:
+        g.stop()
+    assert not g.running
+    assert g.latest(newer_than=time.monotonic(), timeout=0.1) is None
+
+
+def test_capture_errors_do_not_stop_the_grabber():
+    capture = Counter(fail_every=2)
+    g = FrameGrabber(rate_hz=100, capture=capture)
+    g.start()
+    try:
+        t = time.monotonic()
+        for _ in range(3):
+            frame = g.latest(newer_than=t, timeout=2)
+            t = frame.timestamp
+        assert g.errors >= 2 and isinstance(g.last_error, OSError)
+    finally:
+        g.stop()
+    with pytest.raises(ValueError):
+        FrameGrabber(rate_hz=0)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_unexpected_errors_stop_the_grabber():
+    def broken():
+        raise TypeError("bug in the capture code")
+
+    g = FrameGrabber(rate_hz=100, capture=broken)
+    g.start()
+    try:
+        t0 = time.monotonic()
+        assert g.latest(timeout=2) is None
+        assert time.monotonic() - t0 < 1.0  # no waiting on a dead thread
+        assert not g.running and isinstance(g.last_error, TypeError)
+    finally:
+        g.stop()
+
+
+def test_latest_frame_captures_directly_without_grabber(monkeypatch):
+    grabber.stop_grabber()
+    monkeypatch.setattr(
+        screenshot,
+        "take_screenshot_gray",
+        lambda region=None, purpose=None: np.zeros((3, 5), np.uint8),
+    )
+    t = time.monotonic()
+    frame = latest_frame(newer_than=t)
+    assert frame.gray.shape == (3, 5) and frame.timestamp >= t
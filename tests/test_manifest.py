@@ -0,0 +1,82 @@
+"""Test the SQLite project manifest and its reconciliation with the disk."""
+
+import os
+
+import pytest
+
+from src import manifest
+from src.manifest import Manifest, get_manifest
+
+A = "01 - Song A - 03m45s"
+B = "02 - Song B - 04m12s"
+C = "03 - Song C - 02m00s"
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_FILE", tmp_path / "manifest.sqlite")
+    root = tmp_path / "tunee"
+    for folder in (A, B):
+        (root / folder).mkdir(parents=True)
+    (root / "not a song folder").mkdir()
+    return root
+
+
+def _write(path, size=10):
+    path.write_bytes(b"x" * size)
+
+
+def test_records_songs_downloads_and_certs(root):
+    m = get_manifest(str(root))
+    m.record_songs(
+        [
+            {"num": 1, "name": "Song A", "duration": "03m45s", "folder": A},
+            {"num": 2, "name": "Song B", "duration": "04m12s", "folder": B},
+        ]
+    )
+    assert m.status() == {
+        "total": 2,
+        "complete": 0,
+        "missing": 2,
+        "missing_nums": [1, 2],
+    }
+
+    _write(root / A / "a.mp3", 1000)
+    _write(root / A / "a.lrc")
+    m.record_download(A)
+    assert m.needing_certs() == {1: os.path.join(str(root), A)}
+
+    _write(root / A / "cert.pdf")
+    m.record_cert(A)
+    assert m.needing_certs() == {}
+
+    song = m.folders()[0]
+    assert (song.num, song.name, song.duration) == (1, "Song A", "03m45s")
+    assert [f.name for f in song.song_files] == ["a.lrc", "a.mp3"]
+    assert song.has_pdf and song.cert_status == "ok" and song.total_size == 1020
+
+    # A fresh instance reads the same file; another root has its own state
+    assert Manifest(str(root / "elsewhere")).folders() == []
+    assert get_manifest(str(root / "elsewhere")).reconcile() == []
+    assert Manifest(str(root)).status()["complete"] == 1
+    assert get_manifest(str(root)).needing_certs() == {}
+
+
+def test_reconcile_picks_up_manual_changes(root):
+    m = get_manifest(str(root))
+    assert m.reconcile() == [A, B, "not a song folder"]
+    assert m.reconcile() == []  # nothing changed: no folder listed again
+
+    _write(root / B / "b.mp3")
+    (root / C).mkdir()
+    (root / "07 extras").mkdir()
+    os.rmdir(root / A)
+    assert m.reconcile() == [A, B, C, "07 extras"]
+    # Every directory counts, as in the old directory walk
+    assert m.status() == {
+        "total": 4,
+        "complete": 1,
+        "missing": 3,
+        "missing_nums": [3, 7],
+    }
+    assert m.needing_certs() == {2: os.path.join(str(root), B)}
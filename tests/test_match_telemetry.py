@@ -0,0 +1,50 @@
+"""Test match-confidence telemetry and the near-miss recorder."""
+
+import cv2
+
+from src.match_telemetry import (
+    get_telemetry,
+    reset_telemetry,
+    sparkline,
+    summary_lines,
+)
+from src.template_match import find_all_templates, find_template
+from tests.test_template_match import _paste, _screen
+
+
+def test_records_hits_and_near_misses(tmp_path):
+    """Misses just below the threshold save the best-scoring crop."""
+    reset_telemetry(tmp_path)
+    try:
+        frame = _screen()
+        _paste(frame, "modal_lrc.png", 400, 300)
+        # Cover part of the icon: it now scores ~0.76
+        frame[330:370, 420:500] = 240
+
+        assert find_template(frame, "modal_lrc.png", 0.5) is not None
+        assert find_template(frame, "modal_lrc.png", 0.99) is None
+        assert find_all_templates(frame, "modal_lrc.png", 0.99) == []
+
+        st = get_telemetry()["modal_lrc.png"]
+        s = st.summary()
+        assert (s["lookups"], s["found"], s["near_misses"]) == (3, 1, 0)
+        assert 0.5 < s["best_miss"] < 0.89
+        assert s["avg_area"] == 1280 * 720
+        assert sum(s["histogram"]) == 3
+
+        # Within the margin: near-miss with a saved crop
+        conf = s["best_miss"]
+        assert find_template(frame, "modal_lrc.png", conf + 0.05) is None
+        assert get_telemetry()["modal_lrc.png"].near_misses == 1
+        crops = list(tmp_path.glob("modal_lrc_*.png"))
+        assert len(crops) == 1
+        crop = cv2.imread(str(crops[0]))
+        assert crop.shape[0] > 100 and crop.shape[1] > 100
+        assert "modal_lrc.png: 1/4 found" in summary_lines()[0]
+    finally:
+        reset_telemetry()
+
+
+def test_sparkline_scales_to_peak():
+    assert sparkline([0, 1, 4, 8]) == " ▁▄█"
+    assert sparkline([0, 0]) == "  "
@@ -2,14 +2,18 @@
 
 import os
 import tempfile
-from pathlib import Path
+import threading
+import time
+from types import SimpleNamespace
 
 import pytest
 
+from src import orchestrator
+from src.events import PrintEvents
 from src.orchestrator import (
     _duration_display_to_folder,
-    _folder_has_files,
     _sanitize,
+    _wait_for_downloads_complete,
     prepare_project,
 )
 
@@ -30,24 +34,6 @@ def test_duration_display_to_folder():
     assert _duration_display_to_folder("invalid") == "00m00s"
 
 
-def test_folder_has_files():
-    """Test folder_has_files detection."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Empty folder
-        assert not _folder_has_files(tmpdir)
-
-        # Add a song file
-        Path(tmpdir, "test.mp3").touch()
-        assert _folder_has_files(tmpdir)
-
-        # Clean up
-        os.remove(os.path.join(tmpdir, "test.mp3"))
-
-        # Add non-song file
-        Path(tmpdir, "readme.txt").touch()
-        assert not _folder_has_files(tmpdir)
-
-
 def test_prepare_project():
     """Test prepare_project creates correct folder structure."""
     songs = [
@@ -58,8 +44,11 @@ def test_prepare_project():
     with tempfile.TemporaryDirectory() as tmpdir:
         original_tunee_dir = os.path.join(os.path.expanduser("~"), "Downloads", "tunee")
         import src.orchestrator as orch
+        from src import manifest
 
+        original_manifest_file = manifest.MANIFEST_FILE
         orch.TUNEE_DIR = tmpdir
+        manifest.MANIFEST_FILE = os.path.join(tmpdir, "manifest.sqlite")
 
         try:
             result = prepare_project(songs)
@@ -75,3 +64,19 @@ def test_prepare_project():
             assert os.path.exists(os.path.join(tmpdir, result[1]["folder"]))
         finally:
             orch.TUNEE_DIR = original_tunee_dir
+            manifest.MANIFEST_FILE = original_manifest_file
+
+
+def test_wait_for_downloads_waits_for_clicked_formats_to_show_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(orchestrator, "DL_DIR", str(tmp_path))
+    (tmp_path / "song.mp3").write_bytes(b"mp3")
+    lyrics = tmp_path / "song.lrc"
+    # The LRC download starts only after the MP3 already finished
+    timer = threading.Timer(0.5, lambda: lyrics.write_bytes(b"lrc"))
+    timer.start()
+    # inotify saw no temp file yet: nothing pending, nothing direct
+    tracker = SimpleNamespace(tracking=True, in_progress=False, direct=[])
+    t0 = time.monotonic()
+    _wait_for_downloads_complete(PrintEvents(), set(), tracker, expected=2)
+    timer.join()
+    assert lyrics.exists() and time.monotonic() - t0 >= 0.5
@@ -0,0 +1,148 @@
+"""Test session recording and replay through the capture backend."""
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_replay import replay
+from benchmarks.synthetic import compose, make_background
+from src import grabber, recording, screenshot
+from src.frame import ScreenFrame
+from src.recording import (
+    Recorder,
+    Replayer,
+    ReplayFinished,
+    note_click,
+    note_frame,
+)
+
+
+class Screen(screenshot.CaptureBackend):
+    """Fake display: BGR frames of an image, a different one per grab."""
+
+    def __init__(self, images):
+        self.images = list(images)
+        self.count = 0
+
+    def grab(self, region, gray, purpose=screenshot.MATCH):
+        img = self.images[self.count % len(self.images)]
+        self.count += 1
+        if region is not None:
+            x0, y0, x1, y1 = region
+            img = img[y0:y1, x0:x1]
+        return img.mean(axis=2).astype(np.uint8) if gray else img.copy()
+
+
+@pytest.fixture
+def session_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(recording, "get_screen_size", lambda: (64, 48))
+    monkeypatch.setattr(recording, "get_monitor_offset", lambda: (0, 0))
+    yield tmp_path / "session.zip"
+    screenshot.set_capture_backend(None)
+
+
+def test_replay_serves_the_recorded_frames_in_order(session_path):
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (48, 64, 3), np.uint8) for _ in range(3)]
+    recorder = Recorder(session_path, Screen(images))
+    screenshot.set_capture_backend(recorder)
+    live = [
+        screenshot.take_screenshot_bgr(),
+        screenshot.take_screenshot_gray(region=(8, 4, 40, 20)),
+    ]
+    note_click(20, 10, "Play button")
+    note_click(1, 1, "ignored: one click per frame")
+    live.append(screenshot.take_screenshot_bgr())
+    recording.stop_recording()
+    assert isinstance(screenshot.get_capture_backend(), Screen)
+
+    replayer = Replayer(session_path)
+    assert replayer.monitor == {"size": (64, 48), "offset": (0, 0)}
+    assert [f.click for f in replayer.frames] == [None, (20, 10), None]
+    assert replayer.frames[1].region == (8, 4, 40, 20)
+    screenshot.set_capture_backend(replayer)
+    assert np.array_equal(screenshot.take_screenshot_bgr(), live[0])
+    assert np.array_equal(screenshot.take_screenshot_gray(), live[1])
+    # A region asked of a full recorded frame is cropped from it
+    crop = screenshot.take_screenshot_gray(region=(0, 0, 10, 5))
+    assert crop.shape == (5, 10)
+    with pytest.raises(ReplayFinished):
+        screenshot.take_screenshot_bgr()
+
+
+def test_bench_replay_reproduces_recorded_clicks(session_path):
+    rng = np.random.default_rng(1)
+    frame, centers = compose(
+        make_background(640, 480, rng), [("three_dots.png", 300, 200)], rng
+    )
+    recorder = Recorder(session_path, Screen([frame]))
+    recorder.grab(None, gray=False)
+    recorder.click(*centers[0], "Three-dots menu")
+    recorder.grab((200, 150, 500, 350), gray=True)
+    recorder.click(centers[0][0] + 40, centers[0][1], "somewhere else")
+    recorder.close()
+
+    result = replay(Replayer(session_path), repeat=1, pyramid=False, prior=False)
+    assert result["frames"] == 2 and result["clicks"] == 2
+    assert [r["explained"] for r in result["rows"]] == [True, False]
+    assert "three_dots.png" in result["rows"][1]["found"]  # region-relative frame
+
+
+def test_settle_and_grabber_samples_stay_out_of_the_session(session_path):
+    rng = np.random.default_rng(2)
+    images = [rng.integers(0, 255, (48, 64, 3), np.uint8) for _ in range(4)]
+    screenshot.set_capture_backend(Recorder(session_path, Screen(images)))
+    first = screenshot.take_screenshot_bgr()
+    for _ in range(3):
+        screenshot.take_screenshot_gray(purpose=screenshot.SAMPLE)
+    note_click(20, 10, "Play button")  # belongs to the matched frame
+    recording.stop_recording()
+
+    replayer = Replayer(session_path)
+    assert [f.click for f in replayer.frames] == [(20, 10)]
+    screenshot.set_capture_backend(replayer)
+    # Samples show the screen as last matched and do not advance the replay
+    sample = screenshot.take_screenshot_bgr(purpose=screenshot.SAMPLE)
+    assert np.array_equal(sample, first)
+    assert np.array_equal(screenshot.take_screenshot_bgr(), first)
+    sample = screenshot.take_screenshot_bgr(purpose=screenshot.SAMPLE)
+    assert np.array_equal(sample, first)
+    with pytest.raises(ReplayFinished):
+        screenshot.take_screenshot_bgr()
+
+
+def test_grabber_frames_are_recorded_when_matched(session_path, monkeypatch):
+    img = np.arange(48 * 64, dtype=np.uint8).reshape(48, 64)
+    g = grabber.FrameGrabber(rate_hz=100, capture=img.copy)
+    monkeypatch.setattr(grabber, "_grabber", g)
+    recorder = recording.start_recording(session_path)
+    g.start()
+    try:
+        grabber.latest_frame(purpose=screenshot.SAMPLE)  # settle detection
+        frame = grabber.latest_frame()
+        note_click(3, 4, "found it")
+    finally:
+        g.stop()
+        recording.stop_recording()
+    assert [(f.gray, f.click) for f in recorder.frames] == [(True, (3, 4))]
+    assert np.array_equal(Replayer(session_path).load(0), frame.image)
+
+
+def test_every_download_icon_click_gets_its_own_frame(session_path):
+    rng = np.random.default_rng(3)
+    frame, centers = compose(
+        make_background(640, 480, rng),
+        [("download_button.png", 500, y) for y in (60, 180, 300)],
+        rng,
+    )
+    screenshot.set_capture_backend(Recorder(session_path, Screen([frame])))
+    icon_list = ScreenFrame.capture(gray=True)
+    for i, (x, y) in enumerate(centers):
+        if i:
+            note_frame(icon_list)  # as run_task does for songs 2..n
+        note_click(x, y, f"Song #{i + 1} download icon")
+    recording.stop_recording()
+
+    replayer = Replayer(session_path)
+    assert [f.click for f in replayer.frames] == [tuple(c) for c in centers]
+    result = replay(replayer, repeat=1, pyramid=False, prior=False)
+    assert result["clicks_explained"] == result["clicks"] == 3
@@ -0,0 +1,282 @@
+"""Test the per-thread capture session and the monitor geometry cache."""
+
+import sys
+import textwrap
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import ClassVar
+
+import numpy as np
+import pytest
+
+from src import screenshot
+from src.frame import ScreenFrame
+
+ROOT = Path(__file__).parent.parent
+
+
+class FakeShot:
+    segments: ClassVar[dict] = {}  # one buffer per size, like an XShm segment
+
+    def __init__(self, mon):
+        self.width, self.height = mon["width"], mon["height"]
+        self.size = (self.width, self.height)
+        if self.size not in self.segments:
+            self.segments[self.size] = bytearray(self.width * self.height * 4)
+        self.raw = self.segments[self.size]
+
+
+class FakeMSS:
+    """Stands in for mss.mss(); counts handles and monitor queries."""
+
+    opened = 0
+    queries = 0
+    layout: ClassVar[list[dict]] = [
+        {"left": 0, "top": 0, "width": 64, "height": 32},
+        {"left": 0, "top": 0, "width": 32, "height": 32},
+        {"left": 32, "top": 0, "width": 32, "height": 16},
+    ]
+
+    def __init__(self):
+        FakeMSS.opened += 1
+        self.closed = False
+
+    @property
+    def monitors(self):
+        FakeMSS.queries += 1
+        return [dict(m) for m in self.layout]
+
+    def grab(self, mon):
+        assert not self.closed
+        self.grabbed = dict(mon)
+        return FakeShot(mon)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_mss(monkeypatch):
+    monkeypatch.delenv("DISPLAY", raising=False)  # no RandR watcher
+    monkeypatch.setattr(screenshot, "_is_wayland", False)
+    monkeypatch.setattr(screenshot, "_open_mss", FakeMSS)
+    monkeypatch.setattr(FakeMSS, "opened", 0)
+    monkeypatch.setattr(FakeMSS, "queries", 0)
+    monkeypatch.setattr(FakeMSS, "layout", FakeMSS.layout)
+    screenshot.close_session()
+    screenshot.invalidate_geometry()
+    screenshot.set_monitor(2)
+    yield FakeMSS
+    screenshot.close_session()
+    screenshot.invalidate_geometry()
+    screenshot.set_monitor(1)
+
+
+def test_session_and_geometry_are_reused(fake_mss):
+    for _ in range(5):
+        assert screenshot.get_monitor_offset() == (32, 0)
+        assert screenshot.get_screen_size() == (32, 16)
+        assert screenshot.take_screenshot_bgr().shape == (16, 32, 3)
+    assert (fake_mss.opened, fake_mss.queries) == (1, 1)
+
+    # A screen change reopens the handle and re-reads the layout once
+    fake_mss.layout = [dict(m) for m in fake_mss.layout]
+    fake_mss.layout[2]["width"] = 48
+    screenshot.invalidate_geometry()
+    assert screenshot.get_screen_size() == (48, 16)
+    assert screenshot.take_screenshot_bgr().shape == (16, 48, 3)
+    assert (fake_mss.opened, fake_mss.queries) == (2, 2)
+
+
+def test_each_thread_gets_its_own_session(fake_mss):
+    main = screenshot.capture_session().sct()
+    other = []
+
+    def grab():
+        other.append(screenshot.capture_session().sct())
+        assert isinstance(screenshot.take_screenshot_bgr(), np.ndarray)
+        screenshot.close_session()
+
+    t = threading.Thread(target=grab)
+    t.start()
+    t.join()
+    assert other[0] is not main and other[0].closed
+    assert not main.closed and fake_mss.opened == 2
+
+
+def test_region_capture_grabs_only_the_rectangle(fake_mss):
+    sct = screenshot.capture_session().sct()
+    bgr = screenshot.take_screenshot_bgr(region=(4, 2, 20, 12))
+    assert bgr.shape == (10, 16, 3)
+    # Monitor-relative region, grabbed at the monitor's desktop offset
+    assert sct.grabbed == {"left": 36, "top": 2, "width": 16, "height": 10}
+
+    gray = screenshot.take_screenshot_gray(region=(20, 10, 99, 99))
+    assert gray.shape == (6, 12) and gray.dtype == np.uint8
+    with pytest.raises(ValueError):
+        screenshot.take_screenshot_gray(region=(40, 0, 50, 10))
+
+
+def test_wayland_region_is_cropped_from_the_portal_image(monkeypatch):
+    monkeypatch.setattr(screenshot, "_is_wayland", True)
+    monkeypatch.setattr(screenshot, "_get_screen_size_wayland", lambda: (40, 30))
+    img = np.zeros((30, 40, 3), np.uint8)
+    img[10, 5] = (255, 0, 0)  # red in RGB
+    monkeypatch.setattr(screenshot, "_capture_portal", lambda: img)
+    screenshot.invalidate_geometry()
+    try:
+        bgr = screenshot.take_screenshot_bgr(region=(5, 10, 15, 20))
+        assert bgr.shape == (10, 10, 3)
+        assert tuple(bgr[0, 0]) == (0, 0, 255)
+        assert screenshot.take_screenshot_gray(region=(5, 10, 15, 20))[0, 0] == 76
+    finally:
+        screenshot.invalidate_geometry()
+
+
+def test_pooled_buffers_are_recycled_only_when_released(fake_mss):
+    a = screenshot.take_screenshot_gray()
+    a_ptr = a.ctypes.data
+    view = a[2:4]
+    del a
+    b = screenshot.take_screenshot_gray()
+    assert b.ctypes.data != a_ptr  # a view still holds the first buffer
+    del view
+    c = screenshot.take_screenshot_gray()
+    assert c.ctypes.data == a_ptr and not np.shares_memory(b, c)
+
+
+def test_vlm_screenshot_is_encoded_once_per_screen(fake_mss, monkeypatch):
+    fake_mss.layout = [dict(m) for m in fake_mss.layout]
+    fake_mss.layout[2].update(width=200, height=100)
+    screenshot.invalidate_geometry()
+    monkeypatch.setattr(screenshot, "_vlm_cache", None)
+    encoded = []
+    encode = screenshot._encode_vlm
+    monkeypatch.setattr(
+        screenshot, "_encode_vlm", lambda *a: encoded.append(1) or encode(*a)
+    )
+    screenshot.set_vlm_encoding("jpeg", 70, max_size=(120, 60), patch_grid=True)
+    try:
+        b64, size = screenshot.take_screenshot()
+        # Fits 120x60, snapped down to the 28px patch grid
+        assert size == (112, 56) == screenshot.get_image_size(b64)
+        assert screenshot.take_screenshot() == (b64, size) and len(encoded) == 1
+
+        FakeShot.segments[(200, 100)][:4] = b"\xff\xff\xff\xff"  # screen changed
+        screenshot.take_screenshot()
+        assert len(encoded) == 2
+
+        screenshot.set_vlm_encoding("png")
+        b64, size = screenshot.take_screenshot()
+        # By default the plain fit, as before: no resize needed here
+        assert len(encoded) == 3 and size == (200, 100)
+        assert screenshot._vlm_size(1920, 1080) == (1920, 1080)
+        assert screenshot._vlm_size(3840, 2160) == (1920, 1080)
+        assert screenshot.base64.b64decode(b64)[:4] == b"\x89PNG"
+        with pytest.raises(ValueError):
+            screenshot.set_vlm_encoding("gif")
+    finally:
+        screenshot.set_vlm_encoding()
+
+
+def test_steady_state_capture_allocates_no_frames(fake_mss, monkeypatch):
+    w, h = 3840, 2160
+    monkeypatch.setattr(
+        FakeMSS, "layout", [{"left": 0, "top": 0, "width": w, "height": h}] * 3
+    )
+    screenshot.invalidate_geometry()
+
+    def capture_loop(n):
+        for _ in range(n):
+            frame = ScreenFrame.capture(gray=True)
+            assert frame.gray.shape == (h, w)
+            bgr = screenshot.take_screenshot_bgr()
+            assert bgr.shape == (h, w, 3)
+
+    capture_loop(3)  # warm up pools, geometry and the fake segment
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        capture_loop(20)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # One 4K gray frame alone is 8 MB; the loop must not allocate any
+    assert peak - base < 256 * 1024
+    assert current - base < 64 * 1024
+
+
+# Serves frames through the real helper protocol code, without the portal:
+# a padded-stride RGBA gradient whose blue channel counts the grabs
+FAKE_HELPER = """
+import sys
+sys.path.insert(0, {root!r})
+from src._portal_helper import serve
+
+W, H, STRIDE = {w}, {h}, {stride}
+count = 0
+
+def grab():
+    global count
+    count += 1
+    rows = bytearray()
+    for y in range(H):
+        row = bytearray(STRIDE)
+        for x in range(W):
+            row[4 * x : 4 * x + 4] = bytes((x % 256, y % 256, count % 256, 255))
+        rows += row
+    return W, H, STRIDE, 4, bytes(rows)
+
+serve(grab, int(sys.argv[2]))
+"""
+
+
+@pytest.fixture
+def fake_helper(tmp_path, monkeypatch):
+    def start(w=40, h=30, stride=168):
+        script = tmp_path / "fake_helper.py"
+        script.write_text(
+            textwrap.dedent(FAKE_HELPER.format(root=str(ROOT), w=w, h=h, stride=stride))
+        )
+        monkeypatch.setattr(screenshot, "_HELPER_CMD", [sys.executable, str(script)])
+        screenshot._stop_helper()
+
+    monkeypatch.setattr(screenshot, "_is_wayland", True)
+    monkeypatch.setattr(screenshot, "_get_screen_size_wayland", lambda: (40, 30))
+    screenshot.invalidate_geometry()
+    yield start
+    screenshot._stop_helper()
+    screenshot.invalidate_geometry()
+
+
+def test_portal_frames_arrive_through_shared_memory(fake_helper):
+    fake_helper()
+    bgr = screenshot.take_screenshot_bgr()
+    assert bgr.shape == (30, 40, 3)
+    assert tuple(bgr[7, 5]) == (1, 7, 5)  # B = grab count, G = y, R = x
+    assert tuple(screenshot.take_screenshot_bgr()[7, 5]) == (2, 7, 5)
+
+    gray = screenshot.take_screenshot_gray(region=(10, 20, 30, 25))
+    assert gray.shape == (5, 20)
+    x = np.arange(10, 30)
+    expected = np.round(0.299 * x + 0.587 * 20 + 0.114 * 3)  # third grab: B = 3
+    assert np.abs(gray[0] - expected).max() <= 1
+
+    # Same helper process and memfd throughout
+    proc = screenshot._helper_proc
+    screenshot.take_screenshot_gray()
+    assert screenshot._helper_proc is proc and proc.poll() is None
+
+
+def test_shared_segment_grows_and_dead_helper_restarts(fake_helper):
+    fake_helper(w=8, h=4, stride=32)
+    assert screenshot.take_screenshot_bgr().shape == (4, 8, 3)
+
+    fake_helper(w=64, h=48, stride=256)
+    screenshot._helper_proc = None  # forget the old one; a new helper starts
+    assert screenshot.take_screenshot_bgr().shape == (48, 64, 3)
+
+    screenshot._helper_proc.kill()
+    screenshot._helper_proc.wait()
+    assert screenshot.take_screenshot_bgr().shape == (48, 64, 3)
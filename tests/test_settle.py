@@ -0,0 +1,86 @@
+"""Test screen-settle detection."""
+
+import time
+
+import numpy as np
+import pytest
+
+from src import screenshot, settle
+from src.settle import changed_fraction, wait_until_settled
+
+
+class Screen:
+    """Fake gray capture that keeps changing until `settle_at` seconds."""
+
+    def __init__(self, settle_at: float):
+        self.t0 = time.monotonic()
+        self.settle_at = settle_at
+        self.regions = []
+        self.purposes = set()
+
+    def __call__(self, region=None, purpose=None):
+        self.regions.append(region)
+        self.purposes.add(purpose)
+        img = np.full((240, 320), 200, np.uint8)
+        if time.monotonic() - self.t0 < self.settle_at:
+            x = int((time.monotonic() - self.t0) * 2000) % 280
+            img[100:140, x : x + 40] = 0  # a moving box
+        return img
+
+
+@pytest.fixture
+def screen(monkeypatch):
+    def install(settle_at):
+        fake = Screen(settle_at)
+        monkeypatch.setattr(screenshot, "take_screenshot_gray", fake)
+        return fake
+
+    return install
+
+
+def test_returns_soon_after_the_screen_stops_changing(screen):
+    fake = screen(settle_at=0.3)
+    t0 = time.monotonic()
+    assert wait_until_settled((0, 0, 320, 240), timeout=3.0)
+    elapsed = time.monotonic() - t0
+    assert 0.3 + settle.STABLE_FOR <= elapsed < 1.5
+    assert fake.regions[0] == (0, 0, 320, 240)
+    assert fake.purposes == {screenshot.SAMPLE}  # never recorded or replayed
+
+
+def test_keeps_the_timeout_as_hard_bound(screen):
+    screen(settle_at=60)
+    t0 = time.monotonic()
+    assert not wait_until_settled(timeout=0.6)
+    assert 0.6 <= time.monotonic() - t0 < 0.9
+
+
+def test_capture_failure_degrades_to_a_plain_sleep(monkeypatch, capsys):
+    def broken(region=None, purpose=None):
+        raise OSError("no display")
+
+    monkeypatch.setattr(screenshot, "take_screenshot_gray", broken)
+    monkeypatch.setattr(settle, "_warned", False)
+    t0 = time.monotonic()
+    assert not wait_until_settled(timeout=0.3)
+    assert time.monotonic() - t0 >= 0.3
+    assert not wait_until_settled(timeout=0.2)
+    assert capsys.readouterr().out.count("[WARN]") == 1
+
+
+def test_programming_errors_are_not_swallowed(monkeypatch):
+    def broken(region=None, purpose=None):
+        raise TypeError("bad region")
+
+    monkeypatch.setattr(screenshot, "take_screenshot_gray", broken)
+    with pytest.raises(TypeError):
+        wait_until_settled(timeout=0.3)
+
+
+def test_changed_fraction_ignores_small_noise():
+    a = np.full((30, 40), 100, np.uint8)
+    b = a + 5  # below PIXEL_DELTA
+    assert changed_fraction(a, b) == 0.0
+    b[:3] = 200
+    assert changed_fraction(a, b) == pytest.approx(0.1)
+    assert changed_fraction(a, a[:10]) == 1.0
@@ -0,0 +1,53 @@
+"""Test the precomputed template bundle."""
+
+import os
+import shutil
+
+import cv2
+import numpy as np
+
+from src.template_bundle import TEMPLATES_DIR, load_bundle, rescale
+
+
+def _copy_templates(tmp_path, names=("download_button.png", "modal_mp3.png")):
+    src = tmp_path / "templates"
+    src.mkdir()
+    for name in names:
+        shutil.copy(TEMPLATES_DIR / name, src / name)
+    return src
+
+
+def test_bundle_matches_png(tmp_path):
+    """Bundled variants equal the PNG loaded and resized on the fly."""
+    src = _copy_templates(tmp_path)
+    bundle = load_bundle(tmp_path / "t.bundle", src)
+    raw = cv2.imread(str(src / "modal_mp3.png"), cv2.IMREAD_GRAYSCALE)
+
+    assert bundle.path == tmp_path / "t.bundle"
+    assert np.array_equal(bundle.get("modal_mp3.png"), raw)
+    scaled = rescale(raw, 1.25)
+    assert np.array_equal(bundle.get("modal_mp3.png", 1.25), scaled)
+    assert np.array_equal(bundle.get("modal_mp3.png", 1.25, 1), cv2.pyrDown(scaled))
+    assert bundle.get("modal_mp3.png", 1.33) is None
+
+    stats = bundle.stats("modal_mp3.png")
+    assert abs(stats.mean - raw.mean()) < 1e-6
+    assert abs(stats.norm - np.linalg.norm(raw - raw.mean())) < 1e-3
+
+
+def test_bundle_rebuilds_on_change(tmp_path):
+    """A changed or invalid PNG triggers a rebuild and is reported."""
+    src = _copy_templates(tmp_path)
+    path = tmp_path / "t.bundle"
+    load_bundle(path, src)
+    mtime = path.stat().st_mtime_ns
+
+    assert load_bundle(path, src).path == path
+    assert path.stat().st_mtime_ns == mtime
+
+    cv2.imwrite(str(src / "flat.png"), np.full((20, 20), 128, np.uint8))
+    os.utime(src / "download_button.png", ns=(0, 0))
+    bundle = load_bundle(path, src)
+    assert bundle.errors["flat.png"] == "uniform (no contrast)"
+    assert bundle.get("flat.png") is None
+    assert bundle.get("download_button.png") is not None
@@ -0,0 +1,285 @@
+"""Test template matching on synthetic screenshots."""
+
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+import pytest
+
+from src import template_match
+from src.frame import ScreenFrame
+from src.template_match import (
+    _correlate,
+    _load,
+    calibrate_scale,
+    choose_backend,
+    find_all_templates,
+    find_button_in_row,
+    find_many,
+    find_template,
+    get_prior_stats,
+    get_scale,
+    reset_priors,
+    resolve_modal,
+    set_backend,
+    set_scale,
+)
+
+
+def _screen(width=1280, height=720, seed=0):
+    """Noisy light-gray BGR frame with a few boxes as distractors."""
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), 240, np.uint8)
+    for _ in range(20):
+        x, y = rng.integers(0, width - 100), rng.integers(0, height - 50)
+        cv2.rectangle(
+            frame, (int(x), int(y)), (int(x) + 90, int(y) + 40), (200,) * 3, -1
+        )
+    noise = rng.normal(0, 2, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def _paste(frame, name, x, y):
+    tmpl = _load(name)
+    th, tw = tmpl.shape[:2]
+    frame[y : y + th, x : x + tw] = cv2.cvtColor(tmpl, cv2.COLOR_GRAY2BGR)
+    return x + tw // 2, y + th // 2
+
+
+@pytest.mark.parametrize(
+    "name", ["download_button.png", "modal_mp3.png", "three_dots.png", "modal.png"]
+)
+def test_pyramid_matches_full_search(name):
+    """Pyramid mode returns the same center as the full-resolution search."""
+    frame = _screen()
+    center = _paste(frame, name, 301, 117)
+
+    assert find_template(frame, name, threshold=0.7) == center
+    assert find_template(frame, name, threshold=0.7, pyramid=True) == center
+
+
+def test_pyramid_miss_returns_none():
+    """No template on screen → None in both modes."""
+    frame = _screen()
+    assert find_template(frame, "modal_mp3.png", threshold=0.7) is None
+    assert find_template(frame, "modal_mp3.png", threshold=0.7, pyramid=True) is None
+
+
+def test_find_all_templates_pyramid():
+    """All pasted icons are found, identically with and without pyramid."""
+    frame = _screen()
+    centers = {_paste(frame, "download_button.png", 900, y) for y in (40, 200, 360)}
+
+    full = find_all_templates(frame, "download_button.png", threshold=0.7)
+    pyr = find_all_templates(frame, "download_button.png", threshold=0.7, pyramid=True)
+
+    assert {(x, y) for x, y, _ in full} == centers
+    assert sorted((x, y) for x, y, _ in pyr) == sorted((x, y) for x, y, _ in full)
+
+
+def test_find_button_in_row_offset():
+    """Button position is the row icon center plus the horizontal offset."""
+    frame = _screen()
+    cx, cy = _paste(frame, "modal_raw.png", 100, 300)
+    assert find_button_in_row(frame, "modal_raw.png", 0.7, button_offset_x=400) == (
+        cx + 400,
+        cy,
+    )
+
+
+def test_screen_frame_shares_preprocessing():
+    """A ScreenFrame converts once and gives the same results as a raw array."""
+    frame_bgr = _screen()
+    center = _paste(frame_bgr, "modal_lrc.png", 640, 400)
+    frame = ScreenFrame(frame_bgr)
+
+    assert find_template(frame, "modal_lrc.png", 0.7) == center
+    gray = frame.gray
+    assert find_template(frame, "modal_lrc.png", 0.7, pyramid=True) == center
+    assert frame.gray is gray
+    assert frame.pyramid(1) is frame.pyramid(1)
+    assert frame.pyramid(2).shape == (180, 320)
+
+
+@pytest.mark.parametrize("name", ["modal.png", "download_button.png"])
+def test_fft_backend_matches_spatial(name):
+    """FFT and spatial correlation agree on every non-flat window."""
+    frame = _screen()
+    center = _paste(frame, name, 300, 120)
+    frame = ScreenFrame(frame)
+    try:
+        set_backend("spatial")
+        assert choose_backend((720, 1280), (516, 558)) == "spatial"
+        spatial = _correlate(frame, name)
+        spatial_hit = find_template(frame, name, 0.8)
+        set_backend("fft")
+        fft = _correlate(frame, name)
+        fft_hit = find_template(frame, name, 0.8)
+        fft_pyr = find_template(frame, name, 0.8, pyramid=True)
+    finally:
+        set_backend("auto")
+
+    assert fft.shape == spatial.shape
+    strong = np.abs(spatial) > 0.3
+    assert np.abs(fft - spatial)[strong].max() < 1e-3
+    assert spatial_hit == fft_hit == fft_pyr == center
+
+
+def test_find_many_one_frame():
+    """find_many locates every modal row from a single frame."""
+    frame = _screen()
+    expected = {
+        "modal_mp3.png": _paste(frame, "modal_mp3.png", 200, 50),
+        "modal_raw.png": _paste(frame, "modal_raw.png", 200, 200),
+        "modal_lrc.png": _paste(frame, "modal_lrc.png", 200, 350),
+        "cert_menu_item.png": None,
+    }
+
+    assert find_many(frame, expected, threshold=0.7) == expected
+    assert find_many(ScreenFrame(frame), expected, 0.7, pyramid=True) == expected
+
+
+def test_find_many_computes_spectra_before_the_fan_out(monkeypatch):
+    """Template spectra are made on the calling thread and kept in a bounded LRU."""
+    frame = _screen()
+    names = ["modal_mp3.png", "modal_raw.png", "modal_lrc.png"]
+    for i, name in enumerate(names):
+        _paste(frame, name, 200, 50 + 150 * i)
+    threads = []
+    spectrum = template_match._template_spectrum
+    monkeypatch.setattr(template_match, "SPEC_CACHE_SIZE", 3)
+    monkeypatch.setattr(template_match, "_spec_cache", OrderedDict())
+    monkeypatch.setattr(
+        template_match,
+        "_template_spectrum",
+        lambda *a: threads.append(threading.current_thread()) or spectrum(*a),
+    )
+    try:
+        set_backend("fft")
+        hits = find_many(ScreenFrame(frame), names, threshold=0.7)
+        assert all(hits.values())
+        assert threads == [threading.main_thread()] * 3
+        find_template(frame, "download_button.png", 0.7)
+    finally:
+        set_backend("auto")
+
+    assert list(template_match._spec_cache) == [
+        (name, 0, (720, 1280)) for name in names[1:] + ["download_button.png"]
+    ]
+
+
+def test_find_all_templates_one_hit_per_icon_on_blurry_frame():
+    """Peak extraction + NMS keep one hit per icon even at a low threshold."""
+    frame = _screen()
+    centers = {_paste(frame, "download_button.png", x, 300) for x in (100, 400, 700)}
+    blurry = cv2.GaussianBlur(frame, (9, 9), 3)
+
+    found = find_all_templates(blurry, "download_button.png", threshold=0.5)
+
+    assert len(found) == 3
+    for cx, cy in centers:
+        assert any(abs(cx - x) <= 2 and abs(cy - y) <= 2 for x, y, _ in found)
+    assert [c for _, _, c in found] == sorted((c for _, _, c in found), reverse=True)
+
+
+def test_prior_searches_last_location_first():
+    """Second lookup hits the remembered ROI; a moved element falls back."""
+    reset_priors()
+    frame = _screen()
+    center = _paste(frame, "modal_mp3.png", 500, 300)
+
+    assert find_template(frame, "modal_mp3.png", 0.7, prior=True) == center
+    assert find_template(frame, "modal_mp3.png", 0.7, prior=True) == center
+
+    moved = _screen()
+    moved_center = _paste(moved, "modal_mp3.png", 50, 20)
+    assert find_template(moved, "modal_mp3.png", 0.7, prior=True) == moved_center
+
+    st = get_prior_stats()["modal_mp3.png"]
+    assert (st.cold, st.hits, st.misses) == (1, 1, 1)
+    reset_priors()
+    assert get_prior_stats() == {}
+
+
+def test_prior_margin_follows_scale():
+    """The ROI margin around a remembered box grows with the session scale."""
+    reset_priors()
+    template_match._prior_observe("modal_mp3.png", (400, 300, 500, 340))
+    try:
+        assert template_match._prior_roi("modal_mp3.png", 1600, 900, False) == (
+            352,
+            252,
+            548,
+            388,
+        )
+        set_scale(2.0)
+        template_match._prior_observe("modal_mp3.png", (400, 300, 500, 340))
+        assert template_match._prior_roi("modal_mp3.png", 1600, 900, False) == (
+            304,
+            204,
+            596,
+            436,
+        )
+    finally:
+        set_scale(1.0)
+        reset_priors()
+
+
+def test_resolve_modal_from_modal_geometry():
+    """With the modal visible, all four buttons come from its geometry."""
+    frame = _screen(1600, 900)
+    cx, cy = _paste(frame, "modal.png", 400, 200)
+    mh, mw = _load("modal.png").shape[:2]
+    left, top = cx - mw // 2, cy - mh // 2
+
+    points = resolve_modal(frame, threshold=0.7)
+
+    assert set(points) == {"mp3", "raw", "video", "lrc"}
+    assert {x for x, _ in points.values()} == {left + 453}
+    assert [points[f][1] - top for f in ("mp3", "raw", "video", "lrc")] == [
+        131,
+        231,
+        331,
+        431,
+    ]
+
+
+def test_resolve_modal_skips_rows_without_their_icon():
+    """A row whose icon is missing from the real modal is not clicked blindly."""
+    frame = _screen(1600, 900)
+    cx, cy = _paste(frame, "modal.png", 400, 200)
+    mh, mw = _load("modal.png").shape[:2]
+    left, top = cx - mw // 2, cy - mh // 2
+    # Blank the VIDEO icon (modal.png x 34-107, y 287-370) with the row color
+    frame[top + 287 : top + 371, left + 34 : left + 108] = 245
+
+    points = resolve_modal(frame, threshold=0.7)
+
+    assert set(points) == {"mp3", "raw", "lrc"}
+    assert points["lrc"] == (left + 453, top + 431)
+
+
+def test_resolve_modal_falls_back_to_row_icons():
+    """Without a modal match, found row icons are offset to the button column."""
+    frame = _screen()
+    mx, my = _paste(frame, "modal_mp3.png", 60, 100)
+    points = resolve_modal(frame, threshold=0.9)
+    assert points == {"mp3": (mx + 555, my)}
+
+
+def test_calibrate_scale_detects_zoom():
+    """A zoomed download icon is found after calibration rescales templates."""
+    frame = _screen()
+    icon = cv2.resize(_load("download_button.png"), None, fx=1.3, fy=1.3)
+    frame[200 : 200 + icon.shape[0], 500 : 500 + icon.shape[1]] = icon[..., None]
+
+    try:
+        scale = calibrate_scale(frame, threshold=0.8)
+        assert scale == pytest.approx(1.3, abs=0.03)
+        assert get_scale() == scale
+        x, y = find_template(frame, "download_button.png", 0.8)
+        assert abs(x - (500 + icon.shape[1] // 2)) <= 2
+        assert abs(y - (200 + icon.shape[0] // 2)) <= 2
+    finally:
+        set_scale(1.0)
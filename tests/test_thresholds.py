@@ -0,0 +1,112 @@
+"""Test per-template threshold calibration."""
+
+import json
+
+import pytest
+
+from src import thresholds
+from src.match_telemetry import Probe
+from src.template_match import find_template
+from src.thresholds import (
+    MIN_SAMPLES,
+    collect,
+    derive_threshold,
+    finish_calibration,
+    reload_thresholds,
+    start_calibration,
+    threshold_for,
+)
+from tests.test_template_match import _paste, _screen
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    """Point the threshold table at a temporary file."""
+    path = tmp_path / "thresholds.json"
+    monkeypatch.setattr(thresholds, "THRESHOLDS_FILE", path)
+    reload_thresholds()
+    yield path
+    finish_calibration(tmp_path / "discard.json")
+    reload_thresholds()
+
+
+def test_derive_threshold_prefers_the_background_side_gap():
+    hits = [0.92, 0.95, 0.97, 0.93, 0.96]
+    background = [0.41, 0.55, 0.62, 0.48, 0.5]
+    threshold = derive_threshold(hits, background)
+    # Anywhere in (0.62, 0.92] is free of errors; 2/3 of the way up
+    assert 0.62 < threshold <= 0.92
+    assert threshold == pytest.approx(0.83, abs=0.011)
+
+    # Overlapping classes: misclicks cost more, so lean toward hits
+    overlap = derive_threshold([0.7, 0.75, 0.8, 0.85, 0.9], [0.6, 0.65, 0.72] * 2)
+    assert overlap > 0.72
+
+    assert derive_threshold(hits[: MIN_SAMPLES - 1], background) is None
+
+
+def test_calibration_round_trip_keeps_overrides(table):
+    table.write_text(json.dumps({"three_dots.png": {"override": 0.66}}))
+    reload_thresholds()
+    assert threshold_for("three_dots.png") == 0.66
+    assert threshold_for("modal_lrc.png", 0.7) == 0.7
+
+    start_calibration()
+    for _ in range(MIN_SAMPLES):
+        collect("three_dots.png", [0.95], 0.5)
+        collect("play_button.png", [0.9], 0.6)
+    collect("modal_lrc.png", [0.9], 0.3)  # too few samples
+    results = finish_calibration(table)
+
+    assert sorted(results) == ["play_button.png", "three_dots.png"]
+    saved = json.loads(table.read_text())
+    assert saved["three_dots.png"]["override"] == 0.66
+    assert saved["three_dots.png"]["hits"] == MIN_SAMPLES
+    assert threshold_for("three_dots.png") == 0.66
+    assert threshold_for("play_button.png") == results["play_button.png"].threshold
+    assert threshold_for("modal_lrc.png", 0.7) == 0.7
+
+
+def test_lookups_collect_hits_and_background(table):
+    frame = _screen()
+    _paste(frame, "modal_lrc.png", 400, 300)
+
+    start_calibration()
+    for _ in range(MIN_SAMPLES):
+        assert find_template(frame, "modal_lrc.png", 0.8) is not None
+    assert find_template(frame, "modal_mp3.png", 0.99) is None
+    hits, background = thresholds._samples["modal_lrc.png"]
+    assert len(hits) == len(background) == MIN_SAMPLES
+    assert min(hits) > 0.99 and max(background) < 0.8
+    # A miss only counts as background
+    assert thresholds._samples["modal_mp3.png"][0] == []
+
+    cal = finish_calibration(table)["modal_lrc.png"]
+    assert cal.background_high < cal.threshold < cal.hit_low
+    assert not thresholds.calibrating()
+
+
+def test_misses_retried_successfully_are_not_background(table, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(thresholds.time, "monotonic", lambda: now[0])
+    start_calibration()
+    collect("play_button.png", [], 0.78)  # still fading in
+    now[0] += 2
+    collect("play_button.png", [0.97], 0.4)  # the retry hits
+    collect("play_button.png", [], 0.35)  # real absence: no hit follows
+    now[0] += thresholds.RETRY_WINDOW + 1
+    collect("three_dots.png", [], 0.3)
+    collect("three_dots.png", [], 0.2)  # pending until the run ends
+    collect("play_button.png", [0.96], 0.45)  # too late to be a retry
+
+    assert thresholds._samples["play_button.png"] == ([0.97, 0.96], [0.4, 0.35, 0.45])
+    assert [b for _, b in thresholds._pending["three_dots.png"]] == [0.3, 0.2]
+
+
+def test_a_hit_masks_only_its_own_area(table):
+    start_calibration()
+    probe = Probe("modal_lrc.png", 0.8)
+    probe.calibration([], 0.79)  # prior ROI that clipped the target
+    probe.calibration([0.99], 0.41)
+    probe.finish(True)
+    assert thresholds._samples["modal_lrc.png"] == ([0.99], [0.41])